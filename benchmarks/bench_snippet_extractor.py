@@ -0,0 +1,136 @@
+"""
+Scaling benchmark for the snippet extraction fetch_case_document runs.
+
+Builds synthetic judgments of increasing length (numbered paragraphs of
+filler words with keyword hits) and times, with the default per-case token
+budget, the two paths of ``judgment_snippets``:
+
+- ``paragraphs``: whole-paragraph selection (extract_paragraph_snippets),
+  the path taken for every judgment whose body splits into paragraphs;
+- ``windows``: the word-window fallback (pack_snippets, ±150 words) over
+  the judgment text.
+
+Two hit profiles are measured:
+
+- ``spread``: a hit every 200 words across the whole judgment;
+- ``clustered``: a hit every 10 words in the final tenth, the worst case for
+  a per-hit scan of the word list (heavily discussed authorities usually
+  sit late in a judgment).
+
+Near-linear scaling shows up as a roughly constant time per 1k words.
+
+    python -m benchmarks.bench_snippet_extractor
+    python -m benchmarks.bench_snippet_extractor --sizes 100000 200000 400000 --path windows
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List
+
+from src.tools.judgment_parser import Judgment, JudgmentParagraph
+from src.tools.judgment_segments import extract_paragraph_snippets, segment_judgment
+from src.tools.snippet_packer import default_snippet_token_budget, pack_snippets
+
+KEYWORD_SET = '"liquidated damages" penalty clause'
+FILLER = (
+    "the court held that contract party agreement breach claimant defendant "
+    "evidence tribunal appeal judgment order costs statement witness section"
+).split()
+HITS = ["liquidated damages", "penalty", "clause"]
+
+
+PROFILES = ("spread", "clustered")
+PATHS = ("paragraphs", "windows")
+
+
+def _is_hit(i: int, n_words: int, profile: str) -> bool:
+    if profile == "clustered":
+        return i > 0.9 * n_words and i % 10 == 0
+    return i % 200 == 100
+
+
+def synthetic_judgment(n_words: int, profile: str = "spread", seed: int = 0) -> str:
+    """Numbered paragraphs of 100 words with keyword hits placed per ``profile``."""
+    rng = random.Random(seed)
+    paragraphs: List[str] = []
+    words: List[str] = []
+    for i in range(n_words):
+        words.append(rng.choice(HITS) if _is_hit(i, n_words, profile) else rng.choice(FILLER))
+        if len(words) == 100:
+            paragraphs.append(f"{len(paragraphs) + 1}. " + " ".join(words))
+            words = []
+    if words:
+        paragraphs.append(f"{len(paragraphs) + 1}. " + " ".join(words))
+    return "\n\n".join(paragraphs)
+
+
+def synthetic_judgment_record(n_words: int, profile: str = "spread", seed: int = 0) -> Judgment:
+    """The same judgment as a parsed Judgment record."""
+    paragraphs = []
+    for block in synthetic_judgment(n_words, profile, seed).split("\n\n"):
+        number, text = block.split(" ", 1)
+        paragraphs.append(JudgmentParagraph(number, text))
+    return Judgment(url="https://caselaw.nationalarchives.gov.uk/ewhc/ch/2025/1", paragraphs=paragraphs)
+
+
+def pack_windows(judgment: Judgment, keyword_set: str, token_budget: int) -> str:
+    """The word-window fallback of judgment_snippets."""
+    return pack_snippets(judgment.body_text, keyword_set, token_budget, words_before=150, words_after=150)
+
+
+def select_paragraphs(judgment: Judgment, keyword_set: str, token_budget: int) -> str:
+    """The whole-paragraph path of judgment_snippets."""
+    return extract_paragraph_snippets(segment_judgment(judgment), keyword_set, token_budget)
+
+
+EXTRACTORS: Dict[str, Callable[[Judgment, str, int], str]] = {
+    "paragraphs": select_paragraphs,
+    "windows": pack_windows,
+}
+
+
+def time_extraction(judgment: Judgment, path: str = "paragraphs", repeat: int = 3) -> float:
+    """Best-of-``repeat`` wall time for one extraction, in seconds."""
+    extract = EXTRACTORS[path]
+    token_budget = default_snippet_token_budget()
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        extract(judgment, KEYWORD_SET, token_budget)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(sizes: List[int], profile: str = "spread", repeat: int = 3, path: str = "paragraphs") -> List[dict]:
+    rows = []
+    for size in sizes:
+        seconds = time_extraction(synthetic_judgment_record(size, profile), path, repeat)
+        rows.append({"words": size, "seconds": seconds, "us_per_1k_words": seconds / size * 1e9})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25_000, 50_000, 100_000, 200_000, 400_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--path", choices=PATHS, nargs="+", default=list(PATHS))
+    args = parser.parse_args()
+
+    for path in args.path:
+        for profile in PROFILES:
+            rows = run(args.sizes, profile, args.repeat, path)
+            print(f"\n[{path}, {profile}]")
+            print(f"{'words':>10} {'seconds':>10} {'us/1k words':>12}")
+            for row in rows:
+                print(f"{row['words']:>10} {row['seconds']:>10.4f} {row['us_per_1k_words']:>12.1f}")
+
+            growth = rows[-1]["seconds"] / rows[0]["seconds"]
+            size_growth = rows[-1]["words"] / rows[0]["words"]
+            print(f"{size_growth:.0f}x words -> {growth:.1f}x time")
+
+
+if __name__ == "__main__":
+    main()
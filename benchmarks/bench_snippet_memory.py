@@ -0,0 +1,107 @@
+"""
+Peak-allocation benchmark for the word-window snippet path.
+
+Measures, with tracemalloc, the peak memory allocated while packing
+snippets from synthetic judgments (see bench_snippet_extractor) the way
+fetch_case_document's ``judgment_snippets`` falls back to word windows
+(pack_snippets, ±150 words, the default per-case token budget). It runs
+once with the current span-based offsets and assembly, and once with the
+previous versions patched back in:
+
+- word offsets as a list of int objects (about 36 bytes per word instead of 8);
+- each snippet sliced, stripped, wrapped in ellipses and formatted as
+  separate strings before the final join.
+
+The judgment text itself is allocated before measuring starts, so the
+peaks are the extraction's own working memory.
+
+    python -m benchmarks.bench_snippet_memory
+    python -m benchmarks.bench_snippet_memory --sizes 100000 400000 --profile clustered
+"""
+
+from __future__ import annotations
+
+import argparse
+import tracemalloc
+from typing import Callable, List, Tuple
+from unittest import mock
+
+from benchmarks.bench_snippet_extractor import KEYWORD_SET, PROFILES, synthetic_judgment
+from src.tools import snippet_extractor, snippet_packer
+from src.tools.snippet_packer import default_snippet_token_budget, pack_snippets
+
+
+def _list_word_offsets(text: str) -> List[int]:
+    return [match.start() for match in snippet_extractor._WORD_RE.finditer(text)]
+
+
+def _concatenating_format_snippets(body: str, word_positions: List[int], word_ranges: List[Tuple[int, int]]) -> str:
+    total_words = len(word_positions)
+    snippets = []
+    for i, (start_word_idx, end_word_idx) in enumerate(word_ranges, 1):
+        start_char = word_positions[start_word_idx]
+        end_char = word_positions[end_word_idx] if end_word_idx < total_words else len(body)
+        snippet = body[start_char:end_char].strip()
+        if start_word_idx > 0:
+            snippet = '... ' + snippet
+        if end_word_idx < total_words:
+            snippet = snippet + ' ...'
+        snippets.append(f"[SNIPPET {i}]\n{snippet}")
+    return "\n\n".join(snippets)
+
+
+def peak_bytes(func: Callable[[], object]) -> int:
+    """Peak bytes allocated while running func (its result included)."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _extract(text: str) -> str:
+    return pack_snippets(text, KEYWORD_SET, default_snippet_token_budget(), words_before=150, words_after=150)
+
+
+def baseline_peak_bytes(text: str) -> int:
+    """Peak bytes of the same extraction with the previous offsets and assembly."""
+    with mock.patch.object(snippet_packer, "word_offsets", _list_word_offsets), \
+            mock.patch.object(snippet_packer, "format_snippets", _concatenating_format_snippets):
+        return peak_bytes(lambda: _extract(text))
+
+
+def run(sizes: List[int], profile: str = "spread") -> List[dict]:
+    rows = []
+    for size in sizes:
+        text = synthetic_judgment(size, profile)
+        peak = peak_bytes(lambda: _extract(text))
+        baseline = baseline_peak_bytes(text)
+        rows.append({
+            "words": size,
+            "text_chars": len(text),
+            "baseline_peak": baseline,
+            "peak": peak,
+            "reduction": baseline / peak,
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25_000, 100_000, 400_000])
+    parser.add_argument("--profile", choices=PROFILES, nargs="+", default=list(PROFILES))
+    args = parser.parse_args()
+
+    for profile in args.profile:
+        print(f"\n[{profile}]")
+        print(f"{'words':>10} {'text MB':>9} {'before MB':>10} {'after MB':>9} {'reduction':>10}")
+        for row in run(args.sizes, profile):
+            print(
+                f"{row['words']:>10} {row['text_chars'] / 1e6:>9.2f} {row['baseline_peak'] / 1e6:>10.2f} "
+                f"{row['peak'] / 1e6:>9.2f} {row['reduction']:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -32,6 +32,10 @@ class CaseLawState(TypedDict, total=False):
     suggestion: str
     # history of searched keywords
     seen_keywords: set[str]
+    # where judgments come from: "live" (National Archives) or "corpus" (offline index)
+    case_law_source: str
+    # token budget for the judgment snippets packed per case
+    snippet_token_budget: int
 
     keywords: List[str]
     cases: List[dict]
@@ -52,7 +56,7 @@ class CaseLawState(TypedDict, total=False):
 
     # Precedent analysis
     controlling_precedents: List[dict]  # The highest authority case(s)
-    precedent_analysis: str  # LLM analysis of case relationships (agreement/distinction)
+    precedent_analysis: str  # Analysis of case relationships (citation graph and LLM)
     ranked_cases: List[dict]  # All cases ranked by authority
 
     solved: bool
@@ -2,19 +2,135 @@
 Analyze Precedents Node
 
 This node ranks cases by court hierarchy, identifies controlling precedents,
-and uses LLM analysis to determine case relationships (agreement/distinction).
+and determines case relationships (agreement/distinction).
+
+Where the citation graph records that one retrieved case followed or
+overruled another, with no conflicting treatment, that part of the analysis
+is written from the graph. Only the cases the graph leaves unresolved go to
+the LLM, with the graph's findings as context.
 """
 
-import json
-from typing import List, Dict
+import asyncio
+import os
+from typing import List, Dict, Tuple
 
 from src.case_law.case_law_state import CaseLawState
-from src.tools.court_hierarchy import (
-    rank_cases_by_authority,
-    identify_controlling_precedents,
-)
+from src.tools.citation_graph import CitationEdge, Treatment, citation_key, get_citation_graph
+from src.tools.precedent_index import PrecedentIndex
 from src.utils.pull_prompt import pull_prompt_async
 
+PRECEDENT_ANALYSIS_MAX_CASES_ENV_KEY = "CASE_LAW_PRECEDENT_ANALYSIS_MAX_CASES"
+DEFAULT_PRECEDENT_ANALYSIS_MAX_CASES = 15
+
+# Authorities outside the retrieved cases mentioned in the analysis
+MAX_CITED_AUTHORITIES = 3
+
+_TREATMENT_ORDER = list(Treatment)
+
+# Treatments the analysis is written from without the LLM
+RESOLVING_TREATMENTS = (Treatment.FOLLOWED, Treatment.OVERRULED)
+
+
+def search_relevance(case_metadata: List[Dict]) -> List[float]:
+    """
+    Relevance of each case from its search rank: 1 for the first result of
+    its keyword set, 1/2 for the second, and so on.
+    """
+    seen_per_keyword_set: Dict[str, int] = {}
+    relevances = []
+    for case in case_metadata:
+        keyword_set = case.get("keyword_set", "")
+        rank = seen_per_keyword_set.get(keyword_set, 0)
+        seen_per_keyword_set[keyword_set] = rank + 1
+        relevances.append(1 / (1 + rank))
+    return relevances
+
+
+def build_precedent_index(case_metadata: List[Dict]) -> PrecedentIndex:
+    index = PrecedentIndex()
+    index.extend(case_metadata, search_relevance(case_metadata))
+    return index
+
+
+def merge_relationships(edges: List[CitationEdge]) -> List[Dict]:
+    """
+    One relationship per (citing, cited) pair: the strongest treatment
+    (overruled > doubted > distinguished > followed > cited), every
+    paragraph the citation appears in, in the order of the edges, and
+    whether it is 'confirmed': followed or overruled with no other
+    treatment than a bare citation recorded for the pair.
+    """
+    merged: Dict[Tuple[str, str], Dict] = {}
+    treatments: Dict[Tuple[str, str], set] = {}
+    for edge in edges:
+        pair = (edge.citing, edge.cited)
+        relationship = merged.setdefault(pair, {
+            "citing": edge.citing,
+            "cited": edge.cited,
+            "treatment": edge.treatment,
+            "paragraphs": [],
+        })
+        if _TREATMENT_ORDER.index(edge.treatment) < _TREATMENT_ORDER.index(relationship["treatment"]):
+            relationship["treatment"] = edge.treatment
+        if edge.paragraph and edge.paragraph not in relationship["paragraphs"]:
+            relationship["paragraphs"].append(edge.paragraph)
+        treatments.setdefault(pair, set()).add(edge.treatment)
+    for pair, relationship in merged.items():
+        relationship["confirmed"] = (
+            relationship["treatment"] in RESOLVING_TREATMENTS
+            and treatments[pair] - {Treatment.CITED} == {relationship["treatment"]}
+        )
+    return list(merged.values())
+
+
+def citation_context(cases: List[Dict]) -> Dict[str, List]:
+    """
+    What the citation graph knows about a set of cases.
+
+    Returns:
+        Dict with 'relationships' between the cases (see merge_relationships),
+        'overrulings' of any of them by a judgment outside the set, and
+        'authorities': the cases outside the set they cite most often
+    """
+    context: Dict[str, List] = {"relationships": [], "overrulings": [], "authorities": []}
+    graph = get_citation_graph()
+    if graph is None:
+        return context
+
+    citations = [case.get("citation", "") for case in cases]
+    keys = {key for key in map(citation_key, citations) if key is not None}
+    relationships = merge_relationships(graph.relationships(citations))
+    context["relationships"] = relationships
+
+    within = {(rel["citing"], rel["cited"]) for rel in relationships}
+    context["overrulings"] = merge_relationships([
+        edge
+        for citation in citations
+        for edge in graph.overruled_by(citation)
+        if (edge.citing, edge.cited) not in within
+    ])
+
+    context["authorities"] = [
+        authority
+        for authority in graph.most_cited(citing=citations, limit=MAX_CITED_AUTHORITIES + len(keys))
+        if citation_key(authority["citation"]) not in keys
+    ][:MAX_CITED_AUTHORITIES]
+    return context
+
+
+def resolve_from_graph(cases: List[Dict], context: Dict[str, List]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Split the cases into those the citation graph resolves and the rest.
+
+    Returns:
+        (confirmed relationships between the cases, cases in none of them),
+        the cases in their given order
+    """
+    resolved = [rel for rel in context["relationships"] if rel["confirmed"]]
+    keys = {citation_key(rel[side]) for rel in resolved for side in ("citing", "cited")}
+    unresolved = [case for case in cases if citation_key(case.get("citation", "")) not in keys]
+    return resolved, unresolved
+
 
 async def analyze_precedents(state: CaseLawState) -> CaseLawState:
     """
@@ -23,7 +139,8 @@ async def analyze_precedents(state: CaseLawState) -> CaseLawState:
     This node:
     1. Ranks cases by UK court hierarchy
     2. Identifies controlling precedent(s)
-    3. Uses LLM to analyze case agreements and distinctions
+    3. Writes the relationships the citation graph confirms, and uses the
+       LLM to analyze the cases it leaves unresolved
     4. Returns precedent analysis for use in recommendations
     """
     case_metadata: List[Dict] = state.get("case_metadata", [])
@@ -41,32 +158,48 @@ async def analyze_precedents(state: CaseLawState) -> CaseLawState:
 
     # Step 1: Rank cases by court hierarchy
     print(f"[analyze_precedents] Ranking {len(case_metadata)} cases by authority")
-    ranked_cases = rank_cases_by_authority(case_metadata)
+    index = build_precedent_index(case_metadata)
+    ranked_cases = index.ranked()
 
     # Step 2: Identify controlling precedent(s)
-    controlling_precedents = identify_controlling_precedents(ranked_cases)
+    controlling_precedents = index.controlling()
     print(f"[analyze_precedents] Identified {len(controlling_precedents)} controlling precedent(s)")
 
-    # Step 3: Format cases for LLM analysis
-    formatted_cases = format_cases_for_analysis(ranked_cases)
+    # Step 3: Format the best cases (authority, recency, relevance) for LLM analysis
+    max_cases = int(os.getenv(PRECEDENT_ANALYSIS_MAX_CASES_ENV_KEY) or DEFAULT_PRECEDENT_ANALYSIS_MAX_CASES)
+    analysis_cases = sorted(index.top_k(max_cases), key=index.authority_rank)
+
+    # Step 4: Look up how the judgments cite each other
+    context = await asyncio.to_thread(citation_context, analysis_cases)
 
-    # Step 4: Use LLM to analyze case relationships
-    precedent_prompt = await pull_prompt_async(
-        "case_law_precedent_analysis",
-        include_model=True
+    # Step 5: Write the relationships the graph confirms
+    resolved, unresolved_cases = resolve_from_graph(analysis_cases, context)
+    sections = [describe_relationships(analysis_cases, resolved)] if resolved else []
+    print(
+        f"[analyze_precedents] Citation graph resolved {len(analysis_cases) - len(unresolved_cases)} "
+        f"of {len(analysis_cases)} case(s)"
     )
 
-    result = await precedent_prompt.ainvoke({
-        "legal_issue": legal_issue,
-        "ranked_cases": formatted_cases
-    })
+    # Step 6: Use LLM to analyze the remaining cases, with the citations as context
+    if unresolved_cases:
+        precedent_prompt = await pull_prompt_async(
+            "case_law_precedent_analysis",
+            include_model=True
+        )
+
+        result = await precedent_prompt.ainvoke({
+            "legal_issue": legal_issue,
+            "ranked_cases": format_cases_for_analysis(unresolved_cases),
+            "citation_relationships": format_citation_relationships(analysis_cases, context)
+        })
 
-    # Extract the text content from the LLM response
-    if hasattr(result, 'content'):
-        precedent_analysis = result.content
-    else:
-        precedent_analysis = str(result)
+        # Extract the text content from the LLM response
+        if hasattr(result, 'content'):
+            sections.append(result.content)
+        else:
+            sections.append(str(result))
 
+    precedent_analysis = "\n\n".join(sections)
     print("[analyze_precedents] Precedent analysis completed")
     print(f"[analyze_precedents] Analysis preview: {precedent_analysis[:200]}...")
 
@@ -107,3 +240,60 @@ def format_cases_for_analysis(ranked_cases: List[Dict]) -> str:
         )
 
     return "\n".join(lines)
+
+
+def _case_reference(citation: str, cases: List[Dict]) -> str:
+    """"Name [citation]" for a retrieved case, the bare citation otherwise."""
+    key = citation_key(citation)
+    for case in cases:
+        if citation_key(case.get("citation", "")) == key and case.get("name"):
+            return f"{case['name']} {citation}"
+    return citation
+
+
+def _at(paragraphs: List[str]) -> str:
+    if not paragraphs:
+        return ""
+    if len(paragraphs) == 1:
+        return f" at {paragraphs[0]}"
+    return f" at {', '.join(paragraphs[:-1])} and {paragraphs[-1]}"
+
+
+def describe_relationships(cases: List[Dict], relationships: List[Dict]) -> str:
+    """
+    The confirmed relationships as analysis text.
+
+    Returns:
+        Sentences such as "Brown v Green Ltd [2023] EWCA Civ 456 was followed
+        in Smith v Jones [2024] EWHC 123 (Comm) at [4]."
+    """
+    return " ".join(
+        f"{_case_reference(rel['cited'], cases)} was {rel['treatment'].value} "
+        f"in {_case_reference(rel['citing'], cases)}{_at(rel['paragraphs'])}."
+        for rel in relationships
+    )
+
+
+def format_citation_relationships(cases: List[Dict], context: Dict[str, List]) -> str:
+    """
+    Format the citation graph findings for the LLM, one line each.
+
+    Args:
+        cases: The cases under analysis
+        context: Output of citation_context
+
+    Returns:
+        Lines such as "- [2024] EWHC 123 (Comm) followed [2023] EWCA Civ 456 at [4]"
+    """
+    lines = []
+    for rel in context["relationships"] + context["overrulings"]:
+        lines.append(
+            f"- {_case_reference(rel['citing'], cases)} {rel['treatment'].value} "
+            f"{_case_reference(rel['cited'], cases)}{_at(rel['paragraphs'])}"
+        )
+    for authority in context["authorities"]:
+        lines.append(
+            f"- {authority['citation']} is cited in {authority['cited_by']} of the retrieved judgments"
+        )
+    return "\n".join(lines) if lines else "No citations between these cases were found."
+
@@ -1,53 +1,137 @@
+import asyncio
+
 from src.case_law.case_law_state import CaseLawState, CaseMetadata
-from src.tools.case_law_search import get_case_judgment
-from src.tools.snippet_extractor import extract_keyword_snippets
+from src.tools.case_law_corpus import CORPUS_SOURCE, get_case_law_corpus, resolve_case_law_source
+from src.tools.case_law_search import aload_judgment, load_judgment
+from src.tools.citation_graph import get_citation_graph
+from src.tools.judgment_segments import judgment_snippets
+from src.tools.snippet_extractor import aextract_snippets_batch, extract_snippets_batch
+from src.tools.snippet_packer import default_snippet_token_budget
 
 
-def fetch_case_document(
-    state: CaseLawState
-) -> CaseLawState:
-    cases = state["cases"]
+def _case_metadata(case_entry: dict) -> CaseMetadata:
+    # Preserve case metadata alongside snippets
+    return CaseMetadata(
+        name=case_entry.get("name", "Unknown Case"),
+        citation=case_entry.get("citation", "N/A"),
+        court=case_entry.get("court", "N/A"),
+        date=case_entry.get("date", "N/A"),
+        url=case_entry["url"],
+        keyword_set=case_entry["keyword_set"]
+    )
 
-    visited_urls = set()
+
+def _snippet_token_budget(state: CaseLawState) -> int:
+    return state.get("snippet_token_budget") or default_snippet_token_budget()
+
+
+def _fetched(cases: list, judgments: list) -> list:
+    # Cases whose judgment could be retrieved, paired with it, in search order
+    return [
+        (case_entry, judgment)
+        for case_entry, judgment in zip(cases, judgments)
+        if judgment is not None
+    ]
+
+
+def _index_citations(fetched: list) -> None:
+    # Grow the citation graph with every judgment read, for analyze_precedents:
+    # the graph is looked up once per run and written in one transaction
+    graph = get_citation_graph()
+    if graph is not None and fetched:
+      graph.add_judgments(judgment for _, judgment in fetched)
+
+
+def _snippet_batch(fetched: list) -> list:
+    return [(judgment, case_entry["keyword_set"]) for case_entry, judgment in fetched]
+
+
+def _case_documents(fetched: list, snippets: list) -> CaseLawState:
     fetched_documents = []
     case_metadata_list = []
 
+    # Every fetched case is kept, even with no snippet text, so that it
+    # still reaches precedent analysis and the citation context
+    for (case_entry, _), case_snippets in zip(fetched, snippets):
+      fetched_documents.append(case_snippets)
+      case_metadata_list.append(_case_metadata(case_entry))
+
+    return {
+        "fetched_case_documents": fetched_documents,
+        "case_metadata": case_metadata_list
+    }
+
+
+def _unique_cases(cases: list) -> list:
+    visited_urls = set()
+    unique = []
+
     for case_entry in cases:
       case_url = case_entry["url"]
-      keyword_set = case_entry["keyword_set"]
 
       if case_url in visited_urls:
         continue
 
       visited_urls.add(case_url)
-      judgment = get_case_judgment.invoke({"case_uri": case_url})
+      unique.append(case_entry)
 
-      if judgment is None:
-        continue
+    return unique
 
-      snippets = extract_keyword_snippets(
-          judgment_text=judgment,
-          keyword_set=keyword_set,
-          words_before=500,
-          words_after=500,
-          max_snippets=20
-      )
-
-      fetched_documents.append(snippets)
-
-      # Preserve case metadata alongside snippets
-      metadata = CaseMetadata(
-          name=case_entry.get("name", "Unknown Case"),
-          citation=case_entry.get("citation", "N/A"),
-          court=case_entry.get("court", "N/A"),
-          date=case_entry.get("date", "N/A"),
-          url=case_url,
-          keyword_set=keyword_set
-      )
-      case_metadata_list.append(metadata)
 
-    return {
-        "fetched_case_documents": fetched_documents,
-        "case_metadata": case_metadata_list
-    }
+def _corpus_judgment(case_uri: str):
+    judgment = get_case_law_corpus().get_judgment(case_uri)
+    if judgment is None:
+      print(f"Case not found in the offline corpus: {case_uri}")
+    return judgment
+
+
+def fetch_case_document(
+    state: CaseLawState
+) -> CaseLawState:
+    cases = _unique_cases(state["cases"])
+    use_corpus = resolve_case_law_source(state.get("case_law_source")) == CORPUS_SOURCE
+    load = _corpus_judgment if use_corpus else load_judgment
+
+    fetched = _fetched(cases, [load(case_entry["url"]) for case_entry in cases])
+    _index_citations(fetched)
+
+    # Snippet extraction is CPU-bound; the batch is spread over the shared snippet executor
+    snippets = extract_snippets_batch(
+        _snippet_batch(fetched),
+        extractor=judgment_snippets,
+        token_budget=_snippet_token_budget(state)
+    )
+
+    return _case_documents(fetched, snippets)
+
+
+async def afetch_case_document(
+    state: CaseLawState
+) -> CaseLawState:
+    """
+    Async variant of fetch_case_document: judgments are downloaded concurrently
+    (bounded by the per-host limit in the shared HTTP client) and kept in
+    search order. Snippets are extracted off the event loop.
+    """
+    cases = _unique_cases(state["cases"])
+
+    if resolve_case_law_source(state.get("case_law_source")) == CORPUS_SOURCE:
+      judgments = await asyncio.gather(*[
+          asyncio.to_thread(_corpus_judgment, case_entry["url"])
+          for case_entry in cases
+      ])
+    else:
+      judgments = await asyncio.gather(*[
+          aload_judgment(case_entry["url"])
+          for case_entry in cases
+      ])
+
+    fetched = _fetched(cases, judgments)
+    await asyncio.to_thread(_index_citations, fetched)
+    snippets = await aextract_snippets_batch(
+        _snippet_batch(fetched),
+        extractor=judgment_snippets,
+        token_budget=_snippet_token_budget(state)
+    )
 
+    return _case_documents(fetched, snippets)
@@ -1,4 +1,5 @@
 from src.case_law.case_law_state import CaseLawState, Issue
+from src.tools.snippet_packer import default_snippet_token_budget
 
 def initialize_state(state: CaseLawState) -> CaseLawState:
     """
@@ -49,6 +50,9 @@ def initialize_state(state: CaseLawState) -> CaseLawState:
         
     if "micro_verdicts" not in state or state.get("micro_verdicts") is None:
         updates["micro_verdicts"] = []
+
+    if "snippet_token_budget" not in state or state.get("snippet_token_budget") is None:
+        updates["snippet_token_budget"] = default_snippet_token_budget()
     
     return updates
 
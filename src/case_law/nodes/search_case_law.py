@@ -1,25 +1,84 @@
+import asyncio
+
 from src.case_law.case_law_state import CaseLawState
-from src.tools.case_law_search import search_case_law
+from src.tools.case_law_corpus import CORPUS_SOURCE, get_case_law_corpus, resolve_case_law_source
+from src.tools.case_law_search import asearch_case_law, search_case_law
+from src.tools.case_law_stream import astream_case_law, stream_case_law, stream_settings
+
+
+def _to_case(keyword_set: str, court_judgment: dict) -> dict:
+  return {
+    "keyword_set": keyword_set,
+    'name': court_judgment["name"],
+    'citation': court_judgment["citation"],
+    'court': court_judgment["court"],
+    'date': court_judgment["date"],
+    'url': court_judgment["url"]
+  }
+
+
+def _uses_corpus(state: CaseLawState) -> bool:
+  return resolve_case_law_source(state.get("case_law_source")) == CORPUS_SOURCE
+
+
+def _search_page(state: CaseLawState):
+  if _uses_corpus(state):
+    return get_case_law_corpus().search
+
+  def search_page(query: str, page: int, results_per_page: int) -> list:
+    return search_case_law.invoke({"query": query, "page": page, "results_per_page": results_per_page})
+
+  return search_page
+
+
+def _asearch_page(state: CaseLawState):
+  if _uses_corpus(state):
+    corpus = get_case_law_corpus()
+
+    async def corpus_page(query: str, page: int, results_per_page: int) -> list:
+      return await asyncio.to_thread(corpus.search, query, page, results_per_page)
+
+    return corpus_page
+
+  async def search_page(query: str, page: int, results_per_page: int) -> list:
+    return await asearch_case_law.ainvoke({"query": query, "page": page, "results_per_page": results_per_page})
+
+  return search_page
 
 
 def search_caselaw(state: CaseLawState) -> CaseLawState:
+  """
+  Collect cases for each keyword set, paging through results until enough
+  cases from sufficiently senior courts are found (see case_law_stream).
+  """
   keywords = state["keywords"]
+  search_page = _search_page(state)
+  settings = stream_settings()
   all_cases = []
 
   for keyword_set in keywords:
-    results = search_case_law.invoke({"query": keyword_set, "page": 1, "results_per_page": 3})
-
-    for idx, court_judgment in enumerate(results):
-      if idx >= 3:
-        break
-
-      all_cases.append({
-        "keyword_set": keyword_set,
-        'name': court_judgment["name"],
-        'citation': court_judgment["citation"],
-        'court': court_judgment["court"],
-        'date': court_judgment["date"],
-        'url': court_judgment["url"]
-      })
+    for court_judgment in stream_case_law(keyword_set, search_page, **settings):
+      all_cases.append(_to_case(keyword_set, court_judgment))
+
+  return {"cases": all_cases}
+
+
+async def asearch_caselaw(state: CaseLawState) -> CaseLawState:
+  """Async variant of search_caselaw: all keyword searches run concurrently."""
+  keywords = state["keywords"]
+  search_page = _asearch_page(state)
+  settings = stream_settings()
+
+  async def collect(keyword_set: str) -> list:
+    return [
+      _to_case(keyword_set, court_judgment)
+      async for court_judgment in astream_case_law(keyword_set, search_page, **settings)
+    ]
+
+  search_results = await asyncio.gather(*[collect(keyword_set) for keyword_set in keywords])
+
+  all_cases = []
+  for cases in search_results:
+    all_cases.extend(cases)
 
   return {"cases": all_cases}
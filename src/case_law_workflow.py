@@ -1,13 +1,14 @@
 from typing import Any, Dict, Optional
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
 from src.case_law.case_law_state import CaseLawState
 from src.case_law.nodes.initialize_state import initialize_state
 from src.case_law.nodes.generate_keywords import generate_keywords
 from src.case_law.nodes.load_court_issue import load_court_issue
-from src.case_law.nodes.search_case_law import search_caselaw
-from src.case_law.nodes.fetch_case_document import fetch_case_document
+from src.case_law.nodes.search_case_law import asearch_caselaw, search_caselaw
+from src.case_law.nodes.fetch_case_document import afetch_case_document, fetch_case_document
 from src.case_law.nodes.analyze_precedents import analyze_precedents
 from src.case_law.nodes.judgement_focus import judgement_focus
 from src.case_law.nodes.create_issue_guidelines import create_issue_guidelines
@@ -23,8 +24,10 @@ workflow.add_node("load_court_issue", load_court_issue)
 
 # Pipeline A: Keyword-based case law search
 workflow.add_node("generate_keywords", generate_keywords)
-workflow.add_node("search_caselaw", search_caselaw)
-workflow.add_node("fetch_case_document", fetch_case_document)
+# Sync and async bodies: graph.invoke runs the sync ones, graph.ainvoke the
+# concurrent ones
+workflow.add_node("search_caselaw", RunnableLambda(search_caselaw, afunc=asearch_caselaw))
+workflow.add_node("fetch_case_document", RunnableLambda(fetch_case_document, afunc=afetch_case_document))
 workflow.add_node("analyze_precedents", analyze_precedents)
 
 # Pipeline B: Judgement focus analysis (runs in parallel)
@@ -6,7 +6,9 @@ os.environ["GLOBAL_MODEL"] = GLOBAL_MODEL
 
 from src.case_law_workflow import graph
 
-result = graph.invoke({"issue_index": 0})
+# Guarded: snippet extraction workers re-import the main module
+if __name__ == "__main__":
+    result = graph.invoke({"issue_index": 0})
 
-print(result["output_text"])
+    print(result["output_text"])
 
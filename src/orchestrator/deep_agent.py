@@ -17,6 +17,7 @@ from src.documents.documents_state import DocumentsState
 from src.documents_workflow import graph as documents_graph
 from src.judgement.judgement_state import JudgementState
 from src.judgement_workflow import graph as judgement_graph
+from src.tools.fetch_registry import fetch_registry_scope
 from src.utils.pull_prompt import pull_prompt_async
 from src.utils.json_sanitize import load_json_file
 from src.utils.prompt_output import coerce_prompt_output
@@ -60,6 +61,7 @@ class CourtIssueDeepAgent:
         statement_of_claim_path: str | Path | None = None,
         statement_of_defence_path: str | Path | None = None,
         events_path: str | Path | None = None,
+        case_law_source: str | None = None,
     ):
         self.issues_path = Path(issues_path) if issues_path else DEFAULT_ISSUES_PATH
         self.statement_of_claim_path = (
@@ -73,6 +75,8 @@ class CourtIssueDeepAgent:
             else DEFAULT_STATEMENT_OF_DEFENCE_PATH
         )
         self.events_path = Path(events_path) if events_path else DEFAULT_AGENT_EVENTS_PATH
+        # "live" or "corpus"; None leaves the choice to CASE_LAW_SOURCE
+        self.case_law_source = case_law_source
         self._router_prompt_name = "orchestrator_issue_router"
         self.router_prompt: Optional[Runnable] = None
         self._event_log_lock: Optional[asyncio.Lock] = None
@@ -92,13 +96,16 @@ class CourtIssueDeepAgent:
         await self._ensure_router_prompt_async()
         issues = self._load_issues()
 
-        # Process all issues in parallel
+        # Process all issues in parallel; judgment downloads are shared across
+        # issues and iterations for the whole run
         print(f"[orchestrator] Starting parallel processing of {len(issues)} issues")
-        tasks = [
-            self._process_single_issue_async(issue, idx)
-            for idx, issue in enumerate(issues)
-        ]
-        resolved = await asyncio.gather(*tasks)
+        with fetch_registry_scope() as fetch_registry:
+            tasks = [
+                self._process_single_issue_async(issue, idx)
+                for idx, issue in enumerate(issues)
+            ]
+            resolved = await asyncio.gather(*tasks)
+        print(f"[orchestrator] Judgment fetches: {fetch_registry.stats()}")
 
         # Verify all issues have been attempted before calling judgement
         all_issues_attempted = all(
@@ -254,6 +261,8 @@ class CourtIssueDeepAgent:
             "suggestion": sug,
             "seen_keywords": seen,
         }
+        if self.case_law_source:
+            case_state["case_law_source"] = self.case_law_source
         result = await case_law_graph.ainvoke(case_state)
 
         state["recommendation"] = result["recommendation"]
@@ -420,12 +429,14 @@ def orchestrator_deep_agent_factory(config: RunnableConfig) -> Runnable:
     statement_of_claim_path_val = configurable.get("statement_of_claim_path")
     statement_of_defence_path_val = configurable.get("statement_of_defence_path")
     events_path_val = configurable.get("events_path")
+    case_law_source_val = configurable.get("case_law_source")
 
     agent = CourtIssueDeepAgent(
         issues_path=issues_path_val,
         statement_of_claim_path=statement_of_claim_path_val,
         statement_of_defence_path=statement_of_defence_path_val,
         events_path=events_path_val,
+        case_law_source=case_law_source_val,
     )
     return _build_orchestrator_graph(agent)
 
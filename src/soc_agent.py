@@ -7,7 +7,6 @@ load_dotenv()
 
 from langchain.agents import create_agent
 from langchain_core.runnables import Runnable, RunnableConfig
-from langchain_openai import ChatOpenAI
 
 from src.tools.document_store import (
     get_all_document_details,
@@ -16,6 +15,7 @@ from src.tools.document_store import (
     write_court_issues_json,
 )
 from src.tools.soc_issue_table import make_generate_soc_issue_table
+from src.utils.prompts import get_model
 from src.utils.pull_prompt import pull_prompt_async
 
 generate_soc_issue_table = make_generate_soc_issue_table()
@@ -50,7 +50,8 @@ async def _ensure_soc_agent_loaded() -> Runnable:
             return _soc_agent
 
         soc_system_prompt = await pull_prompt_async("soc_system_prompt")
-        orchestrator_model = ChatOpenAI(model=MODEL_NAME)
+        # The model's default temperature, on the shared LLM connection pool
+        orchestrator_model = get_model(temperature=None, model=MODEL_NAME)
         _soc_agent = create_agent(
             model=orchestrator_model,
             tools=[
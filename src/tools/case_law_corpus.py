@@ -0,0 +1,269 @@
+"""
+Offline case law corpus with a SQLite FTS5 full-text index.
+
+Saved judgment pages (HTML) and Akoma Ntoso feeds (XML) are parsed into
+``Judgment`` records and stored in a local SQLite database alongside an FTS5
+inverted index over name, citation and body text. ``CaseLawCorpus.search``
+has the same signature and result shape as the live ``search_case_law`` tool
+and ranks matches with BM25, so the case law workflow can run entirely
+offline (set ``case_law_source`` to "corpus" in the workflow state, or
+``CASE_LAW_SOURCE=corpus``).
+
+Build a corpus from a directory of saved judgments:
+
+    python -m src.tools.case_law_corpus build path/to/judgments
+
+Files are keyed by their path relative to that directory, e.g.
+``ewca/civ/2023/456.xml`` -> ``/ewca/civ/2023/456``. Flat file names use
+underscores instead (``ewca_civ_2023_456.html``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.tools.http_client import build_case_law_url
+from src.tools.judgment_cache import normalize_case_uri
+from src.tools.judgment_parser import Judgment, parse_judgment_html, parse_judgment_xml
+from src.tools.snippet_extractor import parse_keywords
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CORPUS_PATH = PROJECT_ROOT / "dataset" / "case_law_corpus" / "corpus.sqlite3"
+
+CORPUS_PATH_ENV_KEY = "CASE_LAW_CORPUS_PATH"
+CASE_LAW_SOURCE_ENV_KEY = "CASE_LAW_SOURCE"
+
+LIVE_SOURCE = "live"
+CORPUS_SOURCE = "corpus"
+
+SUPPORTED_SUFFIXES = {".html", ".htm", ".xml"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS judgments (
+    uri TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    citation TEXT NOT NULL,
+    court TEXT NOT NULL,
+    date TEXT NOT NULL,
+    url TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS judgments_fts USING fts5(
+    uri UNINDEXED,
+    name,
+    citation,
+    body,
+    tokenize = 'porter unicode61'
+);
+"""
+
+# BM25 column weights for (uri, name, citation, body)
+_BM25_WEIGHTS = "0.0, 10.0, 5.0, 1.0"
+
+
+def resolve_case_law_source(requested: Optional[str] = None) -> str:
+    """
+    Case law source for a run: the requested one, else ``CASE_LAW_SOURCE``,
+    else "live".
+    """
+    source = (requested or os.getenv(CASE_LAW_SOURCE_ENV_KEY) or LIVE_SOURCE).lower()
+    if source not in (LIVE_SOURCE, CORPUS_SOURCE):
+        raise ValueError(
+            f"Unsupported case law source '{source}'. Supported sources: {[LIVE_SOURCE, CORPUS_SOURCE]}"
+        )
+    return source
+
+
+def to_fts_query(query: str) -> str:
+    """
+    Translate a keyword set into an FTS5 query. Quoted phrases stay phrases,
+    every term is quoted so punctuation cannot break the FTS syntax, and
+    terms are OR-ed so BM25 ranks partial matches below full ones.
+    """
+    terms = parse_keywords(query)
+    return " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def uri_from_path(path: Path, root: Path) -> str:
+    relative = path.relative_to(root).with_suffix("")
+    parts = relative.parts
+    if len(parts) == 1:
+        parts = tuple(parts[0].removeprefix("judgment_").split("_"))
+    return normalize_case_uri("/".join(parts))
+
+
+class CaseLawCorpus:
+    """Local judgment store answering ``search_case_law``-style queries."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def add_judgment(self, judgment: Judgment, uri: Optional[str] = None) -> str:
+        """Insert or replace a judgment and its index entry; returns its URI."""
+        uri = normalize_case_uri(uri or judgment.url)
+        body = "\n\n".join(paragraph.text for paragraph in judgment.paragraphs)
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM judgments_fts WHERE uri = ?", (uri,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO judgments (uri, name, citation, court, date, url, record) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    uri,
+                    judgment.name,
+                    judgment.citation,
+                    judgment.court,
+                    judgment.date,
+                    judgment.url,
+                    json.dumps(judgment.to_dict()),
+                ),
+            )
+            self._conn.execute(
+                "INSERT INTO judgments_fts (uri, name, citation, body) VALUES (?, ?, ?, ?)",
+                (uri, judgment.name, judgment.citation, body),
+            )
+        return uri
+
+    def ingest_file(self, path: str | Path, uri: str) -> str:
+        """Parse a saved judgment page (.html) or Akoma Ntoso feed (.xml) and add it."""
+        path = Path(path)
+        url = build_case_law_url(normalize_case_uri(uri))
+        if path.suffix.lower() == ".xml":
+            judgment = parse_judgment_xml(path.read_bytes(), url)
+        else:
+            judgment = parse_judgment_html(path.read_text(encoding="utf-8"), url)
+        return self.add_judgment(judgment, uri)
+
+    def ingest_directory(self, root: str | Path) -> int:
+        """Ingest every saved judgment under ``root``; returns the number added."""
+        root = Path(root)
+        count = 0
+        for path in sorted(root.rglob("*")):
+            if path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES:
+                self.ingest_file(path, uri_from_path(path, root))
+                count += 1
+        return count
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+    def search(
+        self,
+        query: str,
+        page: int = 1,
+        results_per_page: int = 10,
+        order: str = "relevance",
+    ) -> List[Dict[str, str]]:
+        """
+        Search the corpus; same arguments and result shape as ``search_case_law``.
+
+        Returns:
+            List of dicts with 'name', 'citation', 'court', 'date' and 'url'
+        """
+        fts_query = to_fts_query(query)
+        if not fts_query:
+            return []
+
+        order_by = "j.date DESC" if order == "date" else f"bm25(judgments_fts, {_BM25_WEIGHTS})"
+        offset = max(0, page - 1) * results_per_page
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT j.name, j.citation, j.court, j.date, j.url "
+                "FROM judgments_fts JOIN judgments j ON j.uri = judgments_fts.uri "
+                f"WHERE judgments_fts MATCH ? ORDER BY {order_by} LIMIT ? OFFSET ?",
+                (fts_query, results_per_page, offset),
+            ).fetchall()
+
+        return [
+            {"name": name, "citation": citation, "court": court, "date": date, "url": url}
+            for name, citation, court, date, url in rows
+        ]
+
+    def get_judgment(self, case_uri: str) -> Optional[Judgment]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record FROM judgments WHERE uri = ?",
+                (normalize_case_uri(case_uri),),
+            ).fetchone()
+        return Judgment.from_dict(json.loads(row[0])) if row else None
+
+    def iter_judgments(self, batch_size: int = 200) -> Iterator[Judgment]:
+        """Every judgment in the corpus, read ``batch_size`` records at a time."""
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, record FROM judgments WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            for _, record in rows:
+                yield Judgment.from_dict(json.loads(record))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM judgments").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_corpus: Optional[CaseLawCorpus] = None
+_corpus_lock = threading.Lock()
+
+
+def get_case_law_corpus() -> CaseLawCorpus:
+    """Get the shared corpus at ``CASE_LAW_CORPUS_PATH`` (or the default location)."""
+    global _corpus
+
+    if _corpus is None:
+        with _corpus_lock:
+            if _corpus is None:
+                _corpus = CaseLawCorpus(os.getenv(CORPUS_PATH_ENV_KEY) or DEFAULT_CORPUS_PATH)
+
+    return _corpus
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the offline case law corpus")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    build = subcommands.add_parser("build", help="Ingest saved judgment HTML/XML files")
+    build.add_argument("source_dir", type=Path)
+
+    search = subcommands.add_parser("search", help="Query the corpus")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=10)
+
+    args = parser.parse_args()
+    corpus = get_case_law_corpus()
+
+    if args.command == "build":
+        count = corpus.ingest_directory(args.source_dir)
+        print(f"Ingested {count} judgments into {corpus.path} ({len(corpus)} total)")
+    else:
+        for result in corpus.search(args.query, results_per_page=args.limit):
+            print(f"{result['citation']}  {result['name']}  ({result['court']})  {result['url']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,36 @@
-import requests
+import asyncio
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, Optional, Tuple
+
+import httpx
 from langchain_core.tools import tool
-from bs4 import BeautifulSoup
+
+from src.tools.html_backend import make_soup
+from src.tools.http_client import (
+    CASE_LAW_BASE_URL,
+    ahttp_get,
+    build_case_law_url,
+    http_get,
+)
+from src.tools.fetch_registry import current_fetch_registry
+from src.tools.judgment_cache import get_judgment_cache, normalize_case_uri
+from src.tools.judgment_parser import Judgment, JudgmentXmlParser, parse_judgment_html, parse_judgment_xml
+from src.tools.search_cache import get_search_cache
+
+SEARCH_URL = f"{CASE_LAW_BASE_URL}/search"
+
+
+def _search_params(query: str, page: int, results_per_page: int) -> dict:
+    return {
+        "query": query,
+        "page": page,
+        "per_page": results_per_page,
+        "order": "relevance"  # Can also be "date"
+    }
+
 
 @tool
 def search_case_law(query: str, page: int = 1, results_per_page: int = 10) -> list:
@@ -17,28 +47,55 @@ def search_case_law(query: str, page: int = 1, results_per_page: int = 10) -> li
         - text: Formatted string with search results
         - cases: List of dicts with 'url' and 'result' (metadata) for each case
     """
-    base_url = "https://caselaw.nationalarchives.gov.uk/search"
+    params = _search_params(query, page, results_per_page)
+    cache = get_search_cache()
     
-    params = {
-        "query": query,
-        "page": page,
-        "per_page": results_per_page,
-        "order": "relevance"  # Can also be "date"
-    }
+    if cache is not None:
+        cached = cache.get(query, page, results_per_page, params["order"])
+        if cached is not None:
+            return cached
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; ResolutionAI/1.0)",
-        "Accept": "text/html"
-    }
+    response = http_get(SEARCH_URL, params=params)
+    response.raise_for_status()
     
-    response = requests.get(base_url, params=params, headers=headers, timeout=30)
+    results = _parse_html_results(response.text, query)
+    if cache is not None:
+        cache.put(query, page, results_per_page, params["order"], results)
+    return results
+
+
+@tool
+async def asearch_case_law(query: str, page: int = 1, results_per_page: int = 10) -> list:
+    """
+    Async version of search_case_law; runs on the shared async client.
+    
+    Args:
+        query: Search keywords or terms (e.g., "contract breach", "negligence")
+        page: Page number for pagination (default: 1)
+        results_per_page: Number of results per page (default: 10, max: 50)
+    
+    Returns:
+        List of dicts with 'name', 'citation', 'court', 'date' and 'url' for each case
+    """
+    params = _search_params(query, page, results_per_page)
+    cache = get_search_cache()
+    
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, query, page, results_per_page, params["order"])
+        if cached is not None:
+            return cached
+    
+    response = await ahttp_get(SEARCH_URL, params=params)
     response.raise_for_status()
     
-    return _parse_html_results(response.text, query)
+    results = _parse_html_results(response.text, query)
+    if cache is not None:
+        await asyncio.to_thread(cache.put, query, page, results_per_page, params["order"], results)
+    return results
 
 
-def _parse_html_results(html: str, query: str) -> list:
-    soup = BeautifulSoup(html, 'html.parser')
+def _parse_html_results(html: str, query: str, parser: Optional[str] = None) -> list:
+    soup = make_soup(html, parser)
 
     results = []
     
@@ -77,7 +134,7 @@ def _parse_html_results(html: str, query: str) -> list:
       # Remove query parameter from URL for cleaner display
       if '?' in href:
           href = href.split('?')[0]
-      url = f"https://caselaw.nationalarchives.gov.uk{href}" if href.startswith('/') else href
+      url = f"{CASE_LAW_BASE_URL}{href}" if href.startswith('/') else href
       
       # Extract court/tribunal name from the subtitle div
       subtitle_div = main_div.find('div', class_='judgments-table__subtitle')
@@ -100,57 +157,365 @@ def _parse_html_results(html: str, query: str) -> list:
     return results
     
 
-@tool
-def get_case_law_details(case_uri: str) -> str:
+JUDGMENT_CACHE_FORMAT = "judgment/v1"
+
+# "xml" fetches the Akoma Ntoso feed (falling back to HTML), "html" scrapes the page
+JUDGMENT_SOURCE_ENV_KEY = "CASE_LAW_JUDGMENT_SOURCE"
+XML_HEADERS = {"Accept": "application/xml"}
+
+
+def _load_cached_judgment(cached) -> Optional[Judgment]:
+    # Entries written by older cache formats are treated as misses.
+    if cached is None or cached.metadata.get("format") != JUDGMENT_CACHE_FORMAT:
+        return None
+    return Judgment.from_dict(json.loads(cached.text))
+
+
+def iter_cached_judgments() -> Iterator[Judgment]:
+    """Every judgment in the judgment cache (nothing when caching is disabled)."""
+    cache = get_judgment_cache()
+    if cache is None:
+        return
+    for cached in cache.iter_entries():
+        judgment = _load_cached_judgment(cached)
+        if judgment is not None:
+            yield judgment
+
+
+def _store_judgment(cache, judgment: Judgment, fetch_seconds: float, validators: Dict[str, str]) -> None:
+    cache.put(
+        judgment.url,
+        json.dumps(judgment.to_dict()),
+        {"format": JUDGMENT_CACHE_FORMAT, "url": judgment.url, **validators},
+        fetch_seconds,
+    )
+
+
+def _validators(response: httpx.Response, request_url: str) -> Dict[str, str]:
+    # Remember which document the validators belong to (XML feed or HTML page)
+    validators = {"source_url": request_url}
+    if response.headers.get("ETag"):
+        validators["etag"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        validators["last_modified"] = response.headers["Last-Modified"]
+    return validators
+
+
+def _conditional_headers(cached, request_url: str) -> Dict[str, str]:
+    if cached is None or cached.metadata.get("source_url") != request_url:
+        return {}
+    headers = {}
+    if cached.metadata.get("etag"):
+        headers["If-None-Match"] = cached.metadata["etag"]
+    if cached.metadata.get("last_modified"):
+        headers["If-Modified-Since"] = cached.metadata["last_modified"]
+    return headers
+
+
+def _mark_validated_and_served(cache, url: str) -> None:
+    cache.mark_validated(url)
+    cache.mark_served(url)
+
+
+def judgment_source() -> str:
+    """Preferred judgment source: "xml" (Akoma Ntoso, default) or "html"."""
+    source = os.getenv(JUDGMENT_SOURCE_ENV_KEY, "xml").lower()
+    return source if source in ("xml", "html") else "xml"
+
+
+def _xml_url(url: str) -> str:
+    return f"{url.rstrip('/')}/data.xml"
+
+
+# A download yields the parsed judgment and its validators, or None when a
+# conditional request was answered with 304 Not Modified.
+Download = Optional[Tuple[Judgment, Dict[str, str]]]
+
+
+def _download_judgment(url: str, cached=None) -> Download:
+    if judgment_source() == "xml":
+        xml_url = _xml_url(url)
+        try:
+            # Parsed as it downloads, without holding the whole document
+            response = http_get(xml_url, headers={**XML_HEADERS, **_conditional_headers(cached, xml_url)}, stream=True)
+            try:
+                if response.status_code == 304:
+                    return None
+                response.raise_for_status()
+                judgment = parse_judgment_xml(response.iter_bytes(), url)
+            finally:
+                response.close()
+            if judgment.paragraphs:
+                return judgment, _validators(response, xml_url)
+            print(f"[case_law_search] XML for {url} has no judgment text, falling back to HTML")
+        except (httpx.HTTPError, ET.ParseError) as e:
+            print(f"[case_law_search] XML unavailable for {url} ({e}), falling back to HTML")
+    
+    response = http_get(url, headers=_conditional_headers(cached, url))
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+    return parse_judgment_html(response.text, url), _validators(response, url)
+
+
+async def _adownload_judgment(url: str, cached=None) -> Download:
+    if judgment_source() == "xml":
+        xml_url = _xml_url(url)
+        try:
+            response = await ahttp_get(
+                xml_url, headers={**XML_HEADERS, **_conditional_headers(cached, xml_url)}, stream=True
+            )
+            try:
+                if response.status_code == 304:
+                    return None
+                response.raise_for_status()
+                parser = JudgmentXmlParser(url)
+                async for chunk in response.aiter_bytes():
+                    parser.feed(chunk)
+                judgment = parser.close()
+            finally:
+                await response.aclose()
+            if judgment.paragraphs:
+                return judgment, _validators(response, xml_url)
+            print(f"[case_law_search] XML for {url} has no judgment text, falling back to HTML")
+        except (httpx.HTTPError, ET.ParseError) as e:
+            print(f"[case_law_search] XML unavailable for {url} ({e}), falling back to HTML")
+    
+    response = await ahttp_get(url, headers=_conditional_headers(cached, url))
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+    return parse_judgment_html(response.text, url), _validators(response, url)
+
+
+def fetch_judgment(case_uri: str) -> Judgment:
     """
-    Retrieve full details of a specific case by its URI.
+    Download and parse a judgment once, reading through the judgment cache.
     
     Args:
-        case_uri: The URI path of the case (e.g., "/ewhc/ch/2025/3107")
+        case_uri: The URI path of the case (e.g., "/ewhc/ch/2025/3107") or full URL
     
     Returns:
-        Full text and metadata of the judgment/decision.
+        The parsed Judgment record.
+    
+    Raises:
+        httpx.HTTPError: if the page cannot be downloaded.
     """
+    registry = current_fetch_registry()
+    if registry is None:
+        return _fetch_judgment(case_uri)
+    
+    key = normalize_case_uri(case_uri)
+    judgment = registry.lookup(key)
+    if judgment is None:
+        judgment = _fetch_judgment(case_uri)
+        registry.record(key, judgment)
+    return judgment
+
+
+def _fetch_judgment(case_uri: str) -> Judgment:
+    url = build_case_law_url(case_uri)
+    cache = get_judgment_cache()
+    cached, judgment = None, None
+    
+    if cache is not None:
+        cached = cache.get(url)
+        judgment = _load_cached_judgment(cached)
+        if judgment is not None and not cached.stale:
+            return judgment
+    
+    started = time.perf_counter()
+    try:
+        download = _download_judgment(url, cached if judgment is not None else None)
+    except httpx.HTTPError as e:
+        if judgment is None:
+            raise
+        print(f"[case_law_search] Revalidation failed for {url} ({e}), using cached copy")
+        cache.mark_served(url)
+        return judgment
+    fetch_seconds = time.perf_counter() - started
+    
+    if download is None:
+        _mark_validated_and_served(cache, url)
+        return judgment
+    
+    judgment, validators = download
+    if cache is not None:
+        _store_judgment(cache, judgment, fetch_seconds, validators)
+    return judgment
+
+
+async def afetch_judgment(case_uri: str) -> Judgment:
+    """
+    Async version of fetch_judgment; runs on the shared async client.
     
-    # Ensure URI starts with /
-    if not case_uri.startswith('/'):
-        case_uri = f"/{case_uri}"
+    Inside a fetch_registry_scope, concurrent calls for the same judgment share
+    a single download and later calls reuse its parsed result.
+    """
+    registry = current_fetch_registry()
+    if registry is None:
+        return await _afetch_judgment(case_uri)
+    return await registry.get_or_fetch(
+        normalize_case_uri(case_uri), lambda: _afetch_judgment(case_uri)
+    )
+
+
+async def _afetch_judgment(case_uri: str) -> Judgment:
+    url = build_case_law_url(case_uri)
+    cache = get_judgment_cache()
+    cached, judgment = None, None
+    
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, url)
+        judgment = _load_cached_judgment(cached)
+        if judgment is not None and not cached.stale:
+            return judgment
+    
+    started = time.perf_counter()
+    try:
+        download = await _adownload_judgment(url, cached if judgment is not None else None)
+    except httpx.HTTPError as e:
+        if judgment is None:
+            raise
+        print(f"[case_law_search] Revalidation failed for {url} ({e}), using cached copy")
+        await asyncio.to_thread(cache.mark_served, url)
+        return judgment
+    fetch_seconds = time.perf_counter() - started
+    
+    if download is None:
+        await asyncio.to_thread(_mark_validated_and_served, cache, url)
+        return judgment
+    
+    judgment, validators = download
+    if cache is not None:
+        await asyncio.to_thread(_store_judgment, cache, judgment, fetch_seconds, validators)
+    return judgment
+
+
+async def arevalidate_judgment(cached) -> bool:
+    """
+    Revalidate one cache entry with a conditional GET.
     
-    url = f"https://caselaw.nationalarchives.gov.uk{case_uri}"
+    Args:
+        cached: A CachedJudgment, e.g. from JudgmentCache.stale_entries()
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; ResolutionAI/1.0)",
-        "Accept": "text/html"
-    }
+    Returns:
+        True if the server sent a new version (now cached), False on 304.
     
-    response = requests.get(url, headers=headers, timeout=30)
-    response.raise_for_status()
+    Raises:
+        httpx.HTTPError: if the request fails.
+    """
+    cache = get_judgment_cache()
+    url = build_case_law_url(cached.uri)
     
-    soup = BeautifulSoup(response.text, 'html.parser')
+    started = time.perf_counter()
+    download = await _adownload_judgment(url, cached)
+    fetch_seconds = time.perf_counter() - started
     
-    # Extract case name
-    case_name = soup.find('h1')
-    case_name_text = case_name.get_text(strip=True) if case_name else "Unknown Case"
+    if download is None:
+        await asyncio.to_thread(cache.mark_validated, url)
+        return False
     
-    # Extract citation
-    citation = soup.find('span', class_='neutral-citation')
-    citation_text = citation.get_text(strip=True) if citation else "N/A"
+    judgment, validators = download
+    await asyncio.to_thread(_store_judgment, cache, judgment, fetch_seconds, validators)
+    return True
+
+
+def load_judgment(case_uri: str) -> Optional[Judgment]:
+    """fetch_judgment that reports request failures and returns None instead of raising."""
+    try:
+      return fetch_judgment(case_uri)
+    except httpx.TimeoutException:
+      print("The request timed out.")
+      return None
+    except httpx.HTTPError as e:
+      print(f"Request failed: {e}") 
+      return None
+
+
+async def aload_judgment(case_uri: str) -> Optional[Judgment]:
+    """Async version of load_judgment."""
+    try:
+      return await afetch_judgment(case_uri)
+    except httpx.TimeoutException:
+      print("The request timed out.")
+      return None
+    except httpx.HTTPError as e:
+      print(f"Request failed: {e}") 
+      return None
+
+
+def format_case_judgment(judgment: Judgment) -> str:
+    """Full judgment view: header metadata followed by the paragraph text."""
+    output_parts = [
+        f"Case: {judgment.name}",
+        f"Citation: {judgment.citation}",
+        f"Court: {judgment.court}",
+        f"Date: {judgment.date}",
+        f"URL: {judgment.url}",
+        "=" * 80,
+        "",
+        judgment.body_text
+    ]
     
-    # Extract judgment text
-    judgment_body = soup.find('div', class_='judgment-body') or soup.find('main')
-    judgment_text = judgment_body.get_text(strip=True, separator='\n\n') if judgment_body else "Unable to extract judgment text"
+    return "\n".join(output_parts)
+
+
+def format_case_details(judgment: Judgment) -> str:
+    """Summary view: name, citation and the first 5000 characters of the judgment."""
+    judgment_text = judgment.body_text
     
     output = [
-        f"Case: {case_name_text}",
-        f"Citation: {citation_text}",
-        f"URL: {url}",
+        f"Case: {judgment.name}",
+        f"Citation: {judgment.citation}",
+        f"URL: {judgment.url}",
         "=" * 80,
         "",
         judgment_text[:5000] + "..." if len(judgment_text) > 5000 else judgment_text
     ]
     
     return "\n".join(output)
-            
+
+
+def format_case_metadata(judgment: Judgment) -> str:
+    """Metadata view: header fields, judges and parties without the judgment text."""
+    judges = judgment.judges or ["N/A"]
+    
+    output = [
+        f"Case Name: {judgment.name}",
+        f"Citation: {judgment.citation}",
+        f"Case Number: {judgment.case_number}",
+        f"Court: {judgment.court}",
+        f"Date: {judgment.date}",
+        f"URL: {judgment.url}",
+        "",
+        "Judge(s):",
+    ]
+    
+    for judge in judges:
+        output.append(f"  - {judge}")
+    
+    if judgment.parties:
+        output.append("")
+        output.append("Parties:")
+        for i, party in enumerate(judgment.parties, 1):
+            output.append(f"  {i}. {party}")
+    
+    return "\n".join(output)
+
+
+@tool
+def get_case_law_details(case_uri: str) -> str:
+    """
+    Retrieve full details of a specific case by its URI.
+    
+    Args:
+        case_uri: The URI path of the case (e.g., "/ewhc/ch/2025/3107")
+    
+    Returns:
+        Full text and metadata of the judgment/decision.
+    """
+    return format_case_details(fetch_judgment(case_uri))
 
 
 @tool
@@ -163,92 +528,28 @@ def get_case_judgment(case_uri: str) -> str:
     Returns:
         Complete judgment text with basic formatting preserved.
     """
-    if case_uri.startswith('http'):
-        url = case_uri
-    else:
-        # Ensure URI starts with /
-        if not case_uri.startswith('/'):
-            case_uri = f"/{case_uri}"
-        url = f"https://caselaw.nationalarchives.gov.uk{case_uri}"
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; ResolutionAI/1.0)",
-        "Accept": "text/html"
-    }
-    
-    try:
-      response = requests.get(url, headers=headers, timeout=30)
-      response.raise_for_status()   # optional: raises for 4xx/5xx
-    except requests.exceptions.Timeout:
-      print("The request timed out.")
-      return None
-    except requests.exceptions.RequestException as e:
-      print(f"Request failed: {e}") 
+    judgment = load_judgment(case_uri)
+    if judgment is None:
       return None
     
-    soup = BeautifulSoup(response.text, 'html.parser')
-    
-    # Extract case name
-    case_name = soup.find('h1')
-    case_name_text = case_name.get_text(strip=True) if case_name else "Unknown Case"
-    
-    # Extract citation
-    citation_elem = soup.find('span', class_='ncn-nowrap')
-    citation_text = citation_elem.get_text(strip=True) if citation_elem else "N/A"
-    
-    # Extract court from header paragraphs  
-    court_text = "N/A"
-    # Find all paragraphs in the first section
-    all_paras = soup.find_all('p', limit=20)
-    court_parts = []
-    for para in all_paras:
-        text = para.get_text(strip=True)
-        # Look for court indicators in the text
-        if ('COURT' in text or 'TRIBUNAL' in text) and len(text) < 150:
-            court_parts.append(text)
-        # Stop after we've found some court info and hit "Before" or "Between"
-        if court_parts and ('Before' in text or 'Between' in text):
-            break
-    
-    if court_parts:
-        court_text = ' - '.join(court_parts[:3])  # Take max first 3 lines
-    
-    # Extract date
-    date_text = "N/A"
-    date_div = soup.find('div', class_='judgment-header__date')
-    if date_div:
-        date_text = date_div.get_text(strip=True).replace('Date:', '').strip()
-    
-    # Extract judgment text - preserve paragraph structure
-    judgment_body = soup.find('section', class_='judgment-body')
-    if not judgment_body:
-        judgment_body = soup.find('div', class_='judgment-body')
-    
-    if judgment_body:
-        # Get text with paragraph breaks preserved
-        paragraphs = []
-        for para in judgment_body.find_all(['p', 'div', 'h2', 'h3', 'h4']):
-            text = para.get_text(strip=True)
-            if text:
-                paragraphs.append(text)
-        
-        judgment_text = '\n\n'.join(paragraphs)
-    else:
-        judgment_text = "Unable to extract judgment text"
+    return format_case_judgment(judgment)
+
+
+@tool
+async def aget_case_judgment(case_uri: str) -> str:
+    """
+    Async version of get_case_judgment; runs on the shared async client.
     
-    output_parts = [
-        f"Case: {case_name_text}",
-        f"Citation: {citation_text}",
-        f"Court: {court_text}",
-        f"Date: {date_text}",
-        f"URL: {url}",
-        "=" * 80,
-        "",
-        judgment_text
-    ]
-            
-    return "\n".join(output_parts)
-        
+    Args:
+        case_uri: The URI path of the case (e.g., "/ewhc/ch/2025/3107") or full URL
+    Returns:
+        Complete judgment text with basic formatting preserved.
+    """
+    judgment = await aload_judgment(case_uri)
+    if judgment is None:
+      return None
+    
+    return format_case_judgment(judgment)
 
 
 @tool
@@ -262,109 +563,4 @@ def get_case_metadata(case_uri: str) -> str:
     Returns:
         Case metadata including name, citation, court, date, judges, and parties.
     """
-    # Ensure URI starts with /
-    if not case_uri.startswith('/'):
-        case_uri = f"/{case_uri}"
-    
-    url = f"https://caselaw.nationalarchives.gov.uk{case_uri}"
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; ResolutionAI/1.0)",
-        "Accept": "text/html"
-    }
-    
-    response = requests.get(url, headers=headers, timeout=30)
-    response.raise_for_status()
-    
-    
-    soup = BeautifulSoup(response.text, 'html.parser')
-    
-    # Extract metadata
-    metadata = {}
-    
-    # Case name
-    case_name = soup.find('h1')
-    metadata['case_name'] = case_name.get_text(strip=True) if case_name else "Unknown"
-    
-    # Citation
-    citation_elem = soup.find('span', class_='ncn-nowrap')
-    metadata['citation'] = citation_elem.get_text(strip=True) if citation_elem else "N/A"
-    
-    # Case number
-    case_num_div = soup.find('div', class_='judgment-header__case-number')
-    metadata['case_number'] = case_num_div.get_text(strip=True).replace('Case No:', '').strip() if case_num_div else "N/A"
-    
-    # Court - extract from paragraphs
-    metadata['court'] = "N/A"
-    all_paras = soup.find_all('p', limit=20)
-    court_parts = []
-    for para in all_paras:
-        text = para.get_text(strip=True)
-        # Look for court indicators in the text
-        if ('COURT' in text or 'TRIBUNAL' in text) and len(text) < 150:
-            court_parts.append(text)
-        # Stop after we've found some court info and hit "Before" or "Between"
-        if court_parts and ('Before' in text or 'Between' in text):
-            break
-    
-    if court_parts:
-        metadata['court'] = ' - '.join(court_parts[:3])  # Take max first 3 lines
-    
-    # Date
-    date_div = soup.find('div', class_='judgment-header__date')
-    metadata['date'] = date_div.get_text(strip=True).replace('Date:', '').strip() if date_div else "N/A"
-    
-    # Judge - look for "Before:" section
-    metadata['judges'] = []
-    all_paras = soup.find_all('p', limit=30)
-    found_before = False
-    for para in all_paras:
-        text = para.get_text(strip=True)
-        if 'Before' in text and ':' in text:
-            found_before = True
-            continue
-        if found_before and text and 'Between' not in text:
-            metadata['judges'].append(text)
-            break
-    
-    if not metadata['judges']:
-        metadata['judges'] = ["N/A"]
-    
-    # Parties - extract from table or subsequent paragraphs
-    metadata['parties'] = []
-    # Look for the parties table
-    parties_table = soup.find('table', class_='pr-two-column')
-    if parties_table:
-        party_cells = parties_table.find_all('p')
-        for cell in party_cells:
-            text = cell.get_text(strip=True)
-            if text and text not in ['-', 'and', '-and-', '']:
-                metadata['parties'].append(text)
-    
-    if not metadata['parties']:
-        metadata['parties'] = ["N/A"]
-    
-    # Format output
-    output = [
-        f"Case Name: {metadata['case_name']}",
-        f"Citation: {metadata['citation']}",
-        f"Case Number: {metadata['case_number']}",
-        f"Court: {metadata['court']}",
-        f"Date: {metadata['date']}",
-        f"URL: {url}",
-        "",
-        "Judge(s):",
-    ]
-    
-    for judge in metadata['judges']:
-        output.append(f"  - {judge}")
-    
-    if metadata['parties'] != ["N/A"]:
-        output.append("")
-        output.append("Parties:")
-        for i, party in enumerate(metadata['parties'], 1):
-            output.append(f"  {i}. {party}")
-    
-    return "\n".join(output)
-        
-
+    return format_case_metadata(fetch_judgment(case_uri))
@@ -0,0 +1,160 @@
+"""
+Streaming, paginated case law search.
+
+``stream_case_law`` (and its async twin ``astream_case_law``) yields search
+results one at a time and only requests the next results page when the
+consumer asks for more. Results below ``min_court_level`` are held back, so
+a page of tribunal decisions does not use up the budget; the stream stops
+as soon as ``limit`` cases at or above that level have been yielded.
+
+If the pages run out first, the held-back cases are yielded as a backfill,
+highest court first, until ``limit`` is reached.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from src.tools.court_hierarchy import CourtLevel, identify_case_court_level
+
+SearchPage = Callable[[str, int, int], List[Dict]]
+AsyncSearchPage = Callable[[str, int, int], Awaitable[List[Dict]]]
+
+DEFAULT_PAGE_SIZE = 10
+DEFAULT_MAX_PAGES = 5
+
+CASES_PER_QUERY_ENV_KEY = "CASE_LAW_CASES_PER_QUERY"
+MIN_COURT_LEVEL_ENV_KEY = "CASE_LAW_MIN_COURT_LEVEL"
+MAX_SEARCH_PAGES_ENV_KEY = "CASE_LAW_MAX_SEARCH_PAGES"
+SEARCH_PAGE_SIZE_ENV_KEY = "CASE_LAW_SEARCH_PAGE_SIZE"
+
+
+def result_court_level(result: Dict) -> CourtLevel:
+    """Court level of a search result, from its neutral citation or else its court."""
+    return identify_case_court_level(result)
+
+
+class _CaseBudget:
+    """Tracks which results to yield now, which to hold back, and when to stop."""
+
+    def __init__(self, limit: int, min_court_level: CourtLevel):
+        self.limit = limit
+        self.min_court_level = min_court_level
+        self.accepted = 0
+        self.held_back: List[Dict] = []
+        self._seen_urls: set[str] = set()
+
+    @property
+    def done(self) -> bool:
+        return self.accepted >= self.limit
+
+    def offer(self, result: Dict) -> bool:
+        """Return True if the result should be yielded now."""
+        url = result.get("url")
+        if url in self._seen_urls:
+            return False
+        self._seen_urls.add(url)
+
+        if result_court_level(result) >= self.min_court_level:
+            self.accepted += 1
+            return True
+        self.held_back.append(result)
+        return False
+
+    def backfill(self) -> List[Dict]:
+        remaining = max(0, self.limit - self.accepted)
+        return sorted(self.held_back, key=result_court_level, reverse=True)[:remaining]
+
+
+def stream_case_law(
+    query: str,
+    search_page: SearchPage,
+    *,
+    limit: int = 3,
+    min_court_level: CourtLevel = CourtLevel.UNKNOWN,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    backfill: bool = True,
+) -> Iterator[Dict]:
+    """
+    Lazily yield search results for ``query`` until ``limit`` cases at or above
+    ``min_court_level`` have been found.
+
+    Args:
+        query: Search keywords
+        search_page: Fetches one page, called as ``search_page(query, page, page_size)``
+        limit: Number of cases to yield
+        min_court_level: Lowest court level that counts towards ``limit``
+        page_size: Results requested per page
+        max_pages: Upper bound on pages requested
+        backfill: Yield the best lower-level cases if the pages run out first
+    """
+    budget = _CaseBudget(limit, min_court_level)
+
+    for page in range(1, max_pages + 1):
+        results = search_page(query, page, page_size)
+        for result in results:
+            if budget.offer(result):
+                yield result
+                if budget.done:
+                    return
+        if len(results) < page_size:
+            break
+
+    if backfill:
+        yield from budget.backfill()
+
+
+async def astream_case_law(
+    query: str,
+    search_page: AsyncSearchPage,
+    *,
+    limit: int = 3,
+    min_court_level: CourtLevel = CourtLevel.UNKNOWN,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    backfill: bool = True,
+) -> AsyncIterator[Dict]:
+    """Async version of ``stream_case_law``; ``search_page`` is awaited per page."""
+    budget = _CaseBudget(limit, min_court_level)
+
+    for page in range(1, max_pages + 1):
+        results = await search_page(query, page, page_size)
+        for result in results:
+            if budget.offer(result):
+                yield result
+                if budget.done:
+                    return
+        if len(results) < page_size:
+            break
+
+    if backfill:
+        for result in budget.backfill():
+            yield result
+
+
+def parse_court_level(name: Optional[str], default: CourtLevel) -> CourtLevel:
+    """Parse a ``CourtLevel`` member name such as "HIGH_COURT" (case-insensitive)."""
+    if not name:
+        return default
+    try:
+        return CourtLevel[name.strip().upper()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown court level '{name}'. Supported levels: {list(CourtLevel.__members__)}"
+        ) from None
+
+
+def stream_settings() -> Dict[str, Any]:
+    """
+    Stream keyword arguments for the case law workflow: 3 cases per query at
+    High Court level or above, 10 results per page, at most 3 pages; each is
+    overridable through its ``CASE_LAW_*`` environment variable.
+    """
+    return {
+        "limit": int(os.getenv(CASES_PER_QUERY_ENV_KEY, "3")),
+        "min_court_level": parse_court_level(os.getenv(MIN_COURT_LEVEL_ENV_KEY), CourtLevel.HIGH_COURT),
+        "page_size": int(os.getenv(SEARCH_PAGE_SIZE_ENV_KEY, str(DEFAULT_PAGE_SIZE))),
+        "max_pages": int(os.getenv(MAX_SEARCH_PAGES_ENV_KEY, "3")),
+    }
@@ -0,0 +1,420 @@
+"""
+Persistent citation graph of UK judgments.
+
+Judgments cite each other by neutral citation ("[2015] UKSC 67 at [13]").
+``extract_citations`` finds every neutral citation in a judgment's numbered
+paragraphs with the court_hierarchy regex and classifies how the judgment
+treats the cited case from the wording of the sentence around it:
+
+- ``overruled``: "overruled", "overruling";
+- ``doubted``: "doubted", "disapproved", "not followed", "declined to follow";
+- ``distinguished``: "distinguished", "distinguishable";
+- ``followed``: "followed", "applied", "approved", "adopted", "the same approach";
+- ``cited``: anything else.
+
+The earlier entry wins when a sentence matches several ("not followed" is
+doubted, not followed). A trigger counts only when none of the three words
+before it negates or qualifies it ("not bound to follow", "cannot be
+distinguished", "should be overruled"), and a sentence reporting a party's
+argument or submission is only ever ``cited``. This is a wording heuristic,
+not a reading of the judgment: treat the labels as leads, not holdings.
+
+``CitationGraph`` keeps one node per case (keyed by its upper-cased canonical
+citation) and one edge per (citing case, cited case, paragraph, treatment) in
+SQLite, so the graph grows across runs with every judgment fetched from the
+live service or the offline corpus. ``python -m src.tools.citation_graph build``
+backfills it from the corpus and the judgment cache.
+
+Configuration (environment variables):
+
+- ``CASE_LAW_CITATION_GRAPH_PATH``: SQLite file (default: ``dataset/case_law_cache/citation_graph.sqlite3``)
+- ``CASE_LAW_CACHE_DISABLED``: set to ``1`` to bypass all case law caches
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.tools.court_hierarchy import CourtLevel, NeutralCitation, find_neutral_citations, parse_neutral_citation
+from src.tools.judgment_cache import judgment_cache_enabled
+from src.tools.judgment_parser import Judgment
+from src.tools.judgment_segments import segment_judgment
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CITATION_GRAPH_PATH = PROJECT_ROOT / "dataset" / "case_law_cache" / "citation_graph.sqlite3"
+
+CITATION_GRAPH_PATH_ENV_KEY = "CASE_LAW_CITATION_GRAPH_PATH"
+
+
+class Treatment(str, Enum):
+    """How a judgment treats a case it cites, strongest first."""
+    OVERRULED = "overruled"
+    DOUBTED = "doubted"
+    DISTINGUISHED = "distinguished"
+    FOLLOWED = "followed"
+    CITED = "cited"
+
+
+_TREATMENT_PATTERNS = [
+    (Treatment.OVERRULED, re.compile(r"\boverrul(?:e|ed|es|ing)\b", re.IGNORECASE)),
+    (Treatment.DOUBTED, re.compile(
+        r"\b(?:doubt(?:ed|ing)|disapprov(?:e|ed|ing)|wrongly decided"
+        r"|(?:not|declined? to|refused? to)\s+(?:be\s+)?follow(?:ed)?)\b",
+        re.IGNORECASE,
+    )),
+    (Treatment.DISTINGUISHED, re.compile(r"\bdistinguish(?:ed|able|ing)?\b", re.IGNORECASE)),
+    # Past tense only: "as follows", "bound to follow" and "the principles
+    # which apply" say nothing about how the case was treated
+    (Treatment.FOLLOWED, re.compile(
+        r"\b(?:followed|applied|approved|adopted|endorsed|(?:the )?same approach)\b",
+        re.IGNORECASE,
+    )),
+]
+
+# A party's case as reported by the court, not the court's own view
+_SUBMISSION_RE = re.compile(
+    r"\b(?:argu(?:e|es|ed|ing)|arguments?|submit(?:s|ted)?|submissions?|contend(?:s|ed|ing)?"
+    r"|contentions?|urg(?:e|es|ed)|invit(?:es|ed)\s+(?:us|the court))\b",
+    re.IGNORECASE,
+)
+
+# Words that turn a following trigger into a denial, condition or possibility
+_QUALIFIERS = frozenset({
+    "not", "never", "no", "nor", "neither", "cannot", "can't", "whether", "if",
+    "should", "would", "could", "may", "might", "must",
+})
+_QUALIFIER_WINDOW = 3
+_WORD_RE = re.compile(r"[\w']+")
+
+# Sentence ends: ". ", "; ", "? " or "! " (or end of paragraph)
+_SENTENCE_END_RE = re.compile(r"[.;!?](?=\s|$)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    citation TEXT PRIMARY KEY,
+    label TEXT NOT NULL,
+    name TEXT,
+    url TEXT,
+    court_level INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS citations (
+    citing TEXT NOT NULL,
+    cited TEXT NOT NULL,
+    paragraph TEXT NOT NULL DEFAULT '',
+    treatment TEXT NOT NULL,
+    PRIMARY KEY (citing, cited, paragraph, treatment)
+);
+CREATE INDEX IF NOT EXISTS citations_cited ON citations (cited);
+"""
+
+_EDGE_QUERY = """
+SELECT citing.label, cited.label, c.paragraph, c.treatment
+FROM citations c
+JOIN cases citing ON citing.citation = c.citing
+JOIN cases cited ON cited.citation = c.cited
+"""
+
+
+def citation_key(citation: str | NeutralCitation) -> Optional[str]:
+    """Graph key of a citation in any spacing or case, or None if it is not a neutral citation."""
+    if isinstance(citation, str):
+        citation = parse_neutral_citation(citation)
+    return str(citation).upper() if citation is not None else None
+
+
+def _qualified(sentence: str, start: int) -> bool:
+    preceding = _WORD_RE.findall(sentence[:start])[-_QUALIFIER_WINDOW:]
+    return any(word.lower() in _QUALIFIERS for word in preceding)
+
+
+def classify_treatment(sentence: str) -> Treatment:
+    """Treatment of a cited case from the wording of the sentence citing it."""
+    if _SUBMISSION_RE.search(sentence):
+        return Treatment.CITED
+    for treatment, pattern in _TREATMENT_PATTERNS:
+        if any(not _qualified(sentence, match.start()) for match in pattern.finditer(sentence)):
+            return treatment
+    return Treatment.CITED
+
+
+def _sentence_around(text: str, start: int, end: int) -> str:
+    sentence_start = 0
+    for match in _SENTENCE_END_RE.finditer(text, 0, start):
+        sentence_start = match.end()
+    match = _SENTENCE_END_RE.search(text, end)
+    return text[sentence_start:match.end() if match else len(text)]
+
+
+@dataclass(frozen=True)
+class CitationEdge:
+    citing: str  # Canonical citation of the citing judgment
+    cited: str  # Canonical citation of the cited case
+    paragraph: str  # Paragraph of the citing judgment, e.g. "[45]", or "" if unnumbered
+    treatment: Treatment
+
+
+def extract_citations(judgment: Judgment) -> List[CitationEdge]:
+    """
+    Neutral citations in a judgment's paragraphs, with their treatment.
+
+    Unnumbered paragraphs (e.g. a quotation or a second block of a numbered
+    paragraph) are attributed to the numbered paragraph before them.
+
+    Returns:
+        Edges in document order, or [] if the judgment has no parseable citation of its own
+    """
+    own = parse_neutral_citation(judgment.citation)
+    if own is None:
+        return []
+
+    edges = []
+    paragraph = ""
+    for segment in segment_judgment(judgment):
+        paragraph = segment.label or paragraph
+        for citation, start, end in find_neutral_citations(segment.text):
+            if citation == own:
+                continue
+            edges.append(CitationEdge(
+                citing=str(own),
+                cited=str(citation),
+                paragraph=paragraph,
+                treatment=classify_treatment(_sentence_around(segment.text, start, end)),
+            ))
+    return edges
+
+
+class CitationGraph:
+    """Cases and the citations between them, persisted in SQLite."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def add_judgment(self, judgment: Judgment) -> int:
+        """Index a judgment, replacing the edges from an earlier copy; returns its edge count."""
+        return self.add_judgments([judgment])
+
+    def add_judgments(self, judgments: Iterable[Judgment], batch_size: int = 500) -> int:
+        """Index many judgments, one transaction per batch; returns the total number of edges."""
+        total = 0
+        batch = []
+        for judgment in judgments:
+            own = parse_neutral_citation(judgment.citation)
+            if own is None:
+                continue
+            batch.append((own, judgment, extract_citations(judgment)))
+            if len(batch) >= batch_size:
+                total += self._write(batch)
+                batch = []
+        if batch:
+            total += self._write(batch)
+        return total
+
+    def _write(self, batch: List[tuple]) -> int:
+        edge_count = 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for own, judgment, edges in batch:
+                    citing = citation_key(own)
+                    self._conn.execute(
+                        "INSERT INTO cases (citation, label, name, url, court_level, year, indexed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (citation) DO UPDATE SET "
+                        "label = excluded.label, name = excluded.name, url = excluded.url, "
+                        "indexed_at = excluded.indexed_at",
+                        (citing, str(own), judgment.name, judgment.url, int(own.court_level), own.year, time.time()),
+                    )
+                    self._conn.execute("DELETE FROM citations WHERE citing = ?", (citing,))
+                    for edge in edges:
+                        cited = parse_neutral_citation(edge.cited)
+                        self._conn.execute(
+                            "INSERT OR IGNORE INTO cases (citation, label, court_level, year) VALUES (?, ?, ?, ?)",
+                            (citation_key(cited), edge.cited, int(cited.court_level), cited.year),
+                        )
+                        self._conn.execute(
+                            "INSERT OR IGNORE INTO citations (citing, cited, paragraph, treatment) "
+                            "VALUES (?, ?, ?, ?)",
+                            (citing, citation_key(cited), edge.paragraph, edge.treatment.value),
+                        )
+                    edge_count += len(edges)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return edge_count
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+    def citing_cases(self, citation: str, treatment: Optional[Treatment] = None) -> List[CitationEdge]:
+        """Edges from the judgments citing a case, newest citing judgment first."""
+        key = citation_key(citation)
+        if key is None:
+            return []
+
+        query = _EDGE_QUERY + "WHERE c.cited = ?"
+        params: List[Any] = [key]
+        if treatment is not None:
+            query += " AND c.treatment = ?"
+            params.append(treatment.value)
+        query += " ORDER BY citing.year DESC, citing.label, c.paragraph"
+        return self._edges(query, params)
+
+    def followed_by(self, citation: str) -> List[CitationEdge]:
+        """Later judgments that followed (applied, approved, adopted) a case."""
+        return self.citing_cases(citation, Treatment.FOLLOWED)
+
+    def overruled_by(self, citation: str) -> List[CitationEdge]:
+        """Later judgments that overruled a case."""
+        return self.citing_cases(citation, Treatment.OVERRULED)
+
+    def relationships(self, citations: Iterable[str]) -> List[CitationEdge]:
+        """Edges between the given cases, citing judgment oldest first."""
+        keys = sorted({key for key in map(citation_key, citations) if key is not None})
+        if not keys:
+            return []
+
+        placeholders = ", ".join("?" * len(keys))
+        return self._edges(
+            _EDGE_QUERY
+            + f"WHERE c.citing IN ({placeholders}) AND c.cited IN ({placeholders}) "
+            + "ORDER BY citing.year, citing.label, c.paragraph",
+            keys + keys,
+        )
+
+    def most_cited(self, citing: Optional[Iterable[str]] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        The authorities cited by the most judgments.
+
+        Args:
+            citing: Only count citations from these cases, e.g. the cases
+                found for one issue (default: every indexed judgment)
+            limit: Maximum number of authorities
+
+        Returns:
+            Dicts with 'citation', 'name' (None unless the case itself was
+            indexed), 'court_level' and 'cited_by' (number of citing judgments),
+            most cited first, then highest court, then newest
+        """
+        query = (
+            "SELECT cited.label, cited.name, cited.court_level, COUNT(DISTINCT c.citing) AS cited_by "
+            "FROM citations c JOIN cases cited ON cited.citation = c.cited "
+        )
+        params: List[Any] = []
+        if citing is not None:
+            keys = sorted({key for key in map(citation_key, citing) if key is not None})
+            if not keys:
+                return []
+            query += f"WHERE c.citing IN ({', '.join('?' * len(keys))}) "
+            params.extend(keys)
+        query += (
+            "GROUP BY c.cited ORDER BY cited_by DESC, cited.court_level DESC, cited.year DESC, cited.label "
+            "LIMIT ?"
+        )
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {"citation": label, "name": name, "court_level": CourtLevel(level), "cited_by": cited_by}
+            for label, name, level, cited_by in rows
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            cases, indexed = self._conn.execute(
+                "SELECT COUNT(*), COUNT(indexed_at) FROM cases"
+            ).fetchone()
+            edges = self._conn.execute("SELECT COUNT(*) FROM citations").fetchone()[0]
+        return {"cases": cases, "indexed_judgments": indexed, "citations": edges}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _edges(self, query: str, params: List[Any]) -> List[CitationEdge]:
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            CitationEdge(citing=citing, cited=cited, paragraph=paragraph, treatment=Treatment(treatment))
+            for citing, cited, paragraph, treatment in rows
+        ]
+
+
+_graph: Optional[CitationGraph] = None
+_graph_lock = threading.Lock()
+
+
+def get_citation_graph() -> Optional[CitationGraph]:
+    """Get the shared citation graph, or None when caching is disabled."""
+    global _graph
+
+    if not judgment_cache_enabled():
+        return None
+
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = CitationGraph(os.getenv(CITATION_GRAPH_PATH_ENV_KEY) or DEFAULT_CITATION_GRAPH_PATH)
+
+    return _graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the case law citation graph")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    subcommands.add_parser("build", help="Index every judgment in the offline corpus and the judgment cache")
+
+    cited = subcommands.add_parser("cited", help="Judgments citing a case")
+    cited.add_argument("citation")
+    cited.add_argument("--treatment", choices=[treatment.value for treatment in Treatment])
+
+    top = subcommands.add_parser("top", help="Most cited authorities")
+    top.add_argument("--limit", type=int, default=10)
+
+    args = parser.parse_args()
+    graph = CitationGraph(os.getenv(CITATION_GRAPH_PATH_ENV_KEY) or DEFAULT_CITATION_GRAPH_PATH)
+
+    if args.command == "build":
+        from src.tools.case_law_corpus import get_case_law_corpus
+        from src.tools.case_law_search import iter_cached_judgments
+
+        edges = graph.add_judgments(get_case_law_corpus().iter_judgments())
+        edges += graph.add_judgments(iter_cached_judgments())
+        stats = graph.stats()
+        print(
+            f"Indexed {edges} citations into {graph.path} "
+            f"({stats['indexed_judgments']} judgments, {stats['cases']} cases, {stats['citations']} citations total)"
+        )
+    elif args.command == "cited":
+        treatment = Treatment(args.treatment) if args.treatment else None
+        for edge in graph.citing_cases(args.citation, treatment):
+            print(f"{edge.citing} {edge.paragraph}  {edge.treatment.value}  {edge.cited}")
+    else:
+        for authority in graph.most_cited(limit=args.limit):
+            print(f"{authority['cited_by']:>5}  {authority['citation']}  {authority['name'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,17 @@ UK Court Hierarchy and Precedent Ranking System
 
 This module defines the UK court system hierarchy and provides functions
 to rank cases by their precedential authority based on the court level.
+
+A court level is read from a neutral citation when one is present
+("[2023] EWCA Civ 123" is the Court of Appeal), and otherwise from the court
+name with one precompiled regex over all known names. Lookups are memoized,
+since the same court strings recur across every search.
 """
 
-from typing import List, Dict, Optional
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, List, Dict, Optional, Tuple
 from enum import IntEnum
 
 
@@ -82,12 +90,109 @@ COURT_NAME_MAPPINGS = {
 }
 
 
+# Court codes of neutral citations and their hierarchy levels
+CITATION_COURT_CODES = {
+    "UKSC": CourtLevel.SUPREME_COURT,
+    "UKHL": CourtLevel.SUPREME_COURT,  # House of Lords, the Supreme Court's predecessor
+    "UKPC": CourtLevel.PRIVY_COUNCIL,
+    "EWCA": CourtLevel.COURT_OF_APPEAL_CIVIL,
+    "EWHC": CourtLevel.HIGH_COURT,
+    "EWCR": CourtLevel.CROWN_COURT,
+    "EWCC": CourtLevel.COUNTY_COURT,
+    "EWFC": CourtLevel.FAMILY_COURT,
+    "UKUT": CourtLevel.TRIBUNAL_UPPER,
+    "UKEAT": CourtLevel.TRIBUNAL_UPPER,
+    "EAT": CourtLevel.TRIBUNAL_UPPER,
+    "UKFTT": CourtLevel.TRIBUNAL_FIRST_TIER,
+}
+
+# One alternation over every court name, longest first so that e.g.
+# "court of appeal (criminal division)" wins over "court of appeal". Names
+# only match as whole words ("eat" does not match inside "great"), and the
+# leftmost name wins: headers name the deciding court before the court
+# appealed from.
+_COURT_NAME_RE = re.compile(
+    r"(?<![a-z0-9])(?:"
+    + "|".join(re.escape(name) for name in sorted(COURT_NAME_MAPPINGS, key=len, reverse=True))
+    + r")(?![a-z0-9])"
+)
+
+# "[2023] EWCA Civ 123", "[2024] EWHC 45 (Comm)", "[2022] UKUT 12 (IAC)"
+_NEUTRAL_CITATION_RE = re.compile(
+    r"\[(\d{4})\]\s+(" + "|".join(sorted(CITATION_COURT_CODES, key=len, reverse=True)) + r")"
+    r"(?:\s+(Civ|Crim))?\s+(\d+)(?:\s*\(([A-Za-z]+)\))?",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class NeutralCitation:
+    year: int
+    court: str  # Court code, e.g. "EWCA"
+    division: Optional[str]  # "Civ"/"Crim" for the Court of Appeal, "Comm", "KB", ... for the High Court
+    number: int
+
+    @property
+    def court_level(self) -> CourtLevel:
+        return CITATION_COURT_CODES[self.court]
+
+    def __str__(self) -> str:
+        """Canonical form, e.g. "[2023] EWCA Civ 123" or "[2024] EWHC 45 (Comm)"."""
+        if self.division in ("Civ", "Crim"):
+            return f"[{self.year}] {self.court} {self.division} {self.number}"
+        if self.division:
+            return f"[{self.year}] {self.court} {self.number} ({self.division})"
+        return f"[{self.year}] {self.court} {self.number}"
+
+
+def _citation_from_match(match: re.Match) -> NeutralCitation:
+    year, court, appeal_division, number, division = match.groups()
+    return NeutralCitation(
+        year=int(year),
+        court=court.upper(),
+        division=appeal_division.capitalize() if appeal_division else division,
+        number=int(number),
+    )
+
+
+@lru_cache(maxsize=4096)
+def parse_neutral_citation(text: str) -> Optional[NeutralCitation]:
+    """
+    Parse the first neutral citation in text.
+
+    Args:
+        text: A citation or any text containing one (e.g., "[2023] EWCA Civ 123")
+
+    Returns:
+        NeutralCitation, or None if text contains no recognised citation
+    """
+    match = _NEUTRAL_CITATION_RE.search(text or "")
+    return _citation_from_match(match) if match else None
+
+
+def find_neutral_citations(text: str) -> Iterator[Tuple[NeutralCitation, int, int]]:
+    """Every neutral citation in text, as (citation, start, end) in order of appearance."""
+    for match in _NEUTRAL_CITATION_RE.finditer(text):
+        yield _citation_from_match(match), match.start(), match.end()
+
+
+@lru_cache(maxsize=4096)
+def _identify_court_level(text: str) -> CourtLevel:
+    citation = parse_neutral_citation(text)
+    if citation is not None:
+        return citation.court_level
+
+    match = _COURT_NAME_RE.search(text.lower().replace("\u2019", "'"))
+    return COURT_NAME_MAPPINGS[match.group()] if match else CourtLevel.UNKNOWN
+
+
 def identify_court_level(court_name: str) -> CourtLevel:
     """
-    Identify the court level from a court name string.
+    Identify the court level from a court name string or neutral citation.
 
     Args:
-        court_name: The name or description of the court (e.g., "Court of Appeal")
+        court_name: The name or description of the court (e.g., "Court of Appeal"),
+            or a neutral citation (e.g., "[2023] EWCA Civ 123")
 
     Returns:
         CourtLevel enum value representing the court's precedential authority
@@ -95,14 +200,31 @@ def identify_court_level(court_name: str) -> CourtLevel:
     if not court_name or court_name == "N/A":
         return CourtLevel.UNKNOWN
 
-    court_lower = court_name.lower().strip()
-
-    # Check for exact or partial matches
-    for pattern, level in COURT_NAME_MAPPINGS.items():
-        if pattern in court_lower:
-            return level
-
-    return CourtLevel.UNKNOWN
+    return _identify_court_level(court_name.strip())
+
+
+def identify_case_court_level(case: Dict) -> CourtLevel:
+    """Court level of a case, from its neutral citation if it has one, else its court name."""
+    citation = parse_neutral_citation(case.get("citation", ""))
+    if citation is not None:
+        return citation.court_level
+    return identify_court_level(case.get("court", ""))
+
+
+COURT_DISPLAY_NAMES = {
+    CourtLevel.SUPREME_COURT: "UK Supreme Court",
+    CourtLevel.PRIVY_COUNCIL: "Privy Council",
+    CourtLevel.COURT_OF_APPEAL_CIVIL: "Court of Appeal",
+    CourtLevel.COURT_OF_APPEAL_CRIMINAL: "Court of Appeal",
+    CourtLevel.HIGH_COURT: "High Court",
+    CourtLevel.CROWN_COURT: "Crown Court",
+    CourtLevel.COUNTY_COURT: "County Court",
+    CourtLevel.FAMILY_COURT: "Family Court",
+    CourtLevel.TRIBUNAL_UPPER: "Upper Tribunal",
+    CourtLevel.TRIBUNAL_FIRST_TIER: "First-tier Tribunal",
+    CourtLevel.MAGISTRATES_COURT: "Magistrates' Court",
+    CourtLevel.UNKNOWN: "Unknown Court",
+}
 
 
 def get_court_display_name(court_level: CourtLevel) -> str:
@@ -115,21 +237,7 @@ def get_court_display_name(court_level: CourtLevel) -> str:
     Returns:
         Human-readable court name
     """
-    display_names = {
-        CourtLevel.SUPREME_COURT: "UK Supreme Court",
-        CourtLevel.PRIVY_COUNCIL: "Privy Council",
-        CourtLevel.COURT_OF_APPEAL_CIVIL: "Court of Appeal",
-        CourtLevel.COURT_OF_APPEAL_CRIMINAL: "Court of Appeal",
-        CourtLevel.HIGH_COURT: "High Court",
-        CourtLevel.CROWN_COURT: "Crown Court",
-        CourtLevel.COUNTY_COURT: "County Court",
-        CourtLevel.FAMILY_COURT: "Family Court",
-        CourtLevel.TRIBUNAL_UPPER: "Upper Tribunal",
-        CourtLevel.TRIBUNAL_FIRST_TIER: "First-tier Tribunal",
-        CourtLevel.MAGISTRATES_COURT: "Magistrates' Court",
-        CourtLevel.UNKNOWN: "Unknown Court",
-    }
-    return display_names.get(court_level, "Unknown Court")
+    return COURT_DISPLAY_NAMES.get(court_level, "Unknown Court")
 
 
 def rank_cases_by_authority(cases_metadata: List[Dict]) -> List[Dict]:
@@ -138,7 +246,7 @@ def rank_cases_by_authority(cases_metadata: List[Dict]) -> List[Dict]:
     Cases from higher courts are ranked first.
 
     Args:
-        cases_metadata: List of case metadata dicts with 'court' field
+        cases_metadata: List of case metadata dicts with 'court' and/or 'citation' fields
 
     Returns:
         List of cases sorted by precedential authority (highest first),
@@ -147,8 +255,7 @@ def rank_cases_by_authority(cases_metadata: List[Dict]) -> List[Dict]:
     ranked_cases = []
 
     for case in cases_metadata:
-        court_name = case.get("court", "")
-        court_level = identify_court_level(court_name)
+        court_level = identify_case_court_level(case)
 
         ranked_case = {
             **case,
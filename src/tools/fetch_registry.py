@@ -0,0 +1,113 @@
+"""
+Run-scoped registry of judgment fetches with single-flight coalescing.
+
+The orchestrator resolves issues in parallel and repeats the case law
+workflow for an issue across iterations, so the same judgment is often
+requested many times in one run. Inside ``fetch_registry_scope()`` every
+fetch goes through a shared ``FetchRegistry``:
+
+- the first request for a URI starts the download as a task of its own;
+- every request for that URI, the first included, awaits that task through
+  ``asyncio.shield``, so cancelling one caller leaves the download running
+  for the others;
+- later requests get the completed, parsed result straight away.
+
+Failed fetches are not remembered, so a later request retries. The scope is
+held in a context variable, which asyncio tasks inherit when they are
+created, so every issue task started within the scope shares the registry.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+_MISSING = object()
+
+
+class FetchRegistry:
+    """In-flight and completed fetches for one run, keyed by normalized URI."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._completed: Dict[str, Any] = {}
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._stats = {"fetches": 0, "completed_hits": 0, "coalesced": 0, "failures": 0}
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the result for ``key``, running ``fetch`` only if no other caller has."""
+        with self._lock:
+            result = self._completed.get(key, _MISSING)
+            if result is not _MISSING:
+                self._stats["completed_hits"] += 1
+                return result
+
+            task = self._in_flight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch(key, fetch))
+                # Callers re-raise a failure; mark it retrieved in case all were cancelled
+                task.add_done_callback(lambda done: done.cancelled() or done.exception())
+                self._in_flight[key] = task
+                self._stats["fetches"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        # Shielded so a cancelled caller does not cancel the shared fetch
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await fetch()
+        except BaseException:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                self._stats["failures"] += 1
+            raise
+
+        with self._lock:
+            self._completed[key] = result
+            self._in_flight.pop(key, None)
+        return result
+
+    def lookup(self, key: str) -> Any:
+        """Completed result for ``key`` or None (for synchronous callers)."""
+        with self._lock:
+            result = self._completed.get(key, _MISSING)
+            if result is _MISSING:
+                return None
+            self._stats["completed_hits"] += 1
+            return result
+
+    def record(self, key: str, result: Any) -> None:
+        """Store a result fetched outside ``get_or_fetch``."""
+        with self._lock:
+            self._completed[key] = result
+            self._stats["fetches"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "completed": len(self._completed), "in_flight": len(self._in_flight)}
+
+
+_current_registry: ContextVar[Optional[FetchRegistry]] = ContextVar("case_law_fetch_registry", default=None)
+
+
+def current_fetch_registry() -> Optional[FetchRegistry]:
+    return _current_registry.get()
+
+
+@contextmanager
+def fetch_registry_scope(registry: Optional[FetchRegistry] = None) -> Iterator[FetchRegistry]:
+    """
+    Share one registry across everything run inside the block. Nested scopes
+    reuse the outer registry unless one is passed explicitly.
+    """
+    registry = registry or current_fetch_registry() or FetchRegistry()
+    token = _current_registry.set(registry)
+    try:
+        yield registry
+    finally:
+        _current_registry.reset(token)
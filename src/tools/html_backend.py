@@ -0,0 +1,52 @@
+"""
+Pluggable HTML parser backend for case law pages.
+
+Search-result and judgment pages are parsed through ``make_soup`` so the
+BeautifulSoup tree builder can be swapped without touching the extraction
+code. The C-based ``lxml`` builder is used when it is installed; otherwise
+the pure-Python ``html.parser`` is the fallback.
+
+Set ``CASE_LAW_HTML_PARSER`` to ``lxml`` or ``html.parser`` to pin a backend.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+from functools import lru_cache
+
+from bs4 import BeautifulSoup
+
+HTML_PARSER_ENV_KEY = "CASE_LAW_HTML_PARSER"
+
+FAST_PARSER = "lxml"
+FALLBACK_PARSER = "html.parser"
+SUPPORTED_PARSERS = (FAST_PARSER, FALLBACK_PARSER)
+
+
+@lru_cache(maxsize=None)
+def parser_available(parser: str) -> bool:
+    if parser == FALLBACK_PARSER:
+        return True
+    return importlib.util.find_spec(parser) is not None
+
+
+def get_html_parser() -> str:
+    """Resolve the parser backend: the env override if usable, else the fastest installed."""
+    requested = os.getenv(HTML_PARSER_ENV_KEY)
+    if requested:
+        if requested not in SUPPORTED_PARSERS:
+            raise ValueError(
+                f"Unsupported HTML parser '{requested}'. Supported parsers: {list(SUPPORTED_PARSERS)}"
+            )
+        if parser_available(requested):
+            return requested
+        print(f"[html_backend] '{requested}' is not installed, falling back to '{FALLBACK_PARSER}'")
+        return FALLBACK_PARSER
+
+    return FAST_PARSER if parser_available(FAST_PARSER) else FALLBACK_PARSER
+
+
+def make_soup(html: str, parser: str | None = None) -> BeautifulSoup:
+    """Parse HTML with the given backend, or the configured one when omitted."""
+    return BeautifulSoup(html, parser or get_html_parser())
@@ -0,0 +1,402 @@
+"""
+Shared HTTP client for the UK National Archives case law service.
+
+Every case law tool routes its requests through a single process-wide
+``httpx.Client`` so searches and judgment downloads reuse pooled keep-alive
+connections instead of opening a fresh TCP+TLS handshake per call. HTTP/2 is
+negotiated automatically when the optional ``h2`` package is installed.
+
+Pool sizing is configurable through environment variables:
+
+- ``CASE_LAW_HTTP_MAX_CONNECTIONS``: total pooled connections (default: 20)
+- ``CASE_LAW_HTTP_MAX_KEEPALIVE``: idle keep-alive connections (default: 10)
+- ``CASE_LAW_HTTP_KEEPALIVE_EXPIRY``: seconds an idle connection lives (default: 30)
+- ``CASE_LAW_HTTP2``: set to ``0`` to force HTTP/1.1
+- ``CASE_LAW_HTTP_MAX_PER_HOST``: concurrent async requests per host (default: 8)
+
+Async callers use ``ahttp_get``, which shares the same pool settings and
+counters and caps in-flight requests per host with a semaphore.
+
+Both paths pass through a per-host token bucket and retry 429/5xx responses
+and transport errors with jittered exponential backoff, honouring
+``Retry-After``:
+
+- ``CASE_LAW_RATE_LIMIT_RPS``: sustained requests per second per host (default: 5)
+- ``CASE_LAW_RATE_LIMIT_BURST``: burst size (default: 10)
+- ``CASE_LAW_MAX_RETRIES``: retries per request (default: 3)
+- ``CASE_LAW_RETRY_BASE_DELAY`` / ``CASE_LAW_RETRY_MAX_DELAY``: backoff bounds in seconds (default: 0.5 / 30)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.tools.rate_limit import RetryPolicy, TokenBucket
+
+CASE_LAW_BASE_URL = "https://caselaw.nationalarchives.gov.uk"
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; ResolutionAI/1.0)",
+    "Accept": "text/html",
+}
+DEFAULT_TIMEOUT = 30.0
+
+MAX_CONNECTIONS_ENV_KEY = "CASE_LAW_HTTP_MAX_CONNECTIONS"
+MAX_KEEPALIVE_ENV_KEY = "CASE_LAW_HTTP_MAX_KEEPALIVE"
+KEEPALIVE_EXPIRY_ENV_KEY = "CASE_LAW_HTTP_KEEPALIVE_EXPIRY"
+HTTP2_ENV_KEY = "CASE_LAW_HTTP2"
+MAX_PER_HOST_ENV_KEY = "CASE_LAW_HTTP_MAX_PER_HOST"
+RATE_LIMIT_RPS_ENV_KEY = "CASE_LAW_RATE_LIMIT_RPS"
+RATE_LIMIT_BURST_ENV_KEY = "CASE_LAW_RATE_LIMIT_BURST"
+MAX_RETRIES_ENV_KEY = "CASE_LAW_MAX_RETRIES"
+RETRY_BASE_DELAY_ENV_KEY = "CASE_LAW_RETRY_BASE_DELAY"
+RETRY_MAX_DELAY_ENV_KEY = "CASE_LAW_RETRY_MAX_DELAY"
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_MAX_PER_HOST = 8
+DEFAULT_RATE_LIMIT_RPS = 5.0
+DEFAULT_RATE_LIMIT_BURST = 10
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BASE_DELAY = 0.5
+DEFAULT_RETRY_MAX_DELAY = 30.0
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+# Async clients and host semaphores are bound to the event loop that uses them.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_host_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Rate limiters are shared by sync and async callers across threads and loops.
+_rate_limiters: Dict[str, TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Any] = {}
+
+
+def _env_int(key: str, default: int) -> int:
+    value = os.getenv(key)
+    return int(value) if value else default
+
+
+def _env_float(key: str, default: float) -> float:
+    value = os.getenv(key)
+    return float(value) if value else default
+
+
+def http2_enabled() -> bool:
+    """HTTP/2 is used when not disabled by env and the ``h2`` package is importable."""
+    if os.getenv(HTTP2_ENV_KEY, "1").lower() in ("0", "false", "no"):
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_pool_limits() -> httpx.Limits:
+    """Build connection pool limits from the environment."""
+    return httpx.Limits(
+        max_connections=_env_int(MAX_CONNECTIONS_ENV_KEY, DEFAULT_MAX_CONNECTIONS),
+        max_keepalive_connections=_env_int(MAX_KEEPALIVE_ENV_KEY, DEFAULT_MAX_KEEPALIVE),
+        keepalive_expiry=_env_float(KEEPALIVE_EXPIRY_ENV_KEY, DEFAULT_KEEPALIVE_EXPIRY),
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """Get the shared, lazily created case law HTTP client."""
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    headers=DEFAULT_HEADERS,
+                    timeout=DEFAULT_TIMEOUT,
+                    limits=get_pool_limits(),
+                    http2=http2_enabled(),
+                    follow_redirects=True,
+                )
+
+    return _client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the shared async case law HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=DEFAULT_TIMEOUT,
+            limits=get_pool_limits(),
+            http2=http2_enabled(),
+            follow_redirects=True,
+        )
+        _async_clients[loop] = client
+
+    return client
+
+
+def get_max_per_host() -> int:
+    """Maximum number of concurrent async requests to a single host."""
+    return max(1, _env_int(MAX_PER_HOST_ENV_KEY, DEFAULT_MAX_PER_HOST))
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphores = _host_semaphores.setdefault(loop, {})
+    host = urlsplit(url).netloc
+    if host not in semaphores:
+        semaphores[host] = asyncio.Semaphore(get_max_per_host())
+    return semaphores[host]
+
+
+def get_rate_limiter(url: str) -> TokenBucket:
+    """Token bucket for the URL's host, created from the environment on first use."""
+    host = urlsplit(url).netloc
+    with _rate_limiters_lock:
+        if host not in _rate_limiters:
+            _rate_limiters[host] = TokenBucket(
+                rate=_env_float(RATE_LIMIT_RPS_ENV_KEY, DEFAULT_RATE_LIMIT_RPS),
+                burst=_env_int(RATE_LIMIT_BURST_ENV_KEY, DEFAULT_RATE_LIMIT_BURST),
+            )
+        return _rate_limiters[host]
+
+
+def get_retry_policy() -> RetryPolicy:
+    return RetryPolicy(
+        max_retries=_env_int(MAX_RETRIES_ENV_KEY, DEFAULT_MAX_RETRIES),
+        base_delay=_env_float(RETRY_BASE_DELAY_ENV_KEY, DEFAULT_RETRY_BASE_DELAY),
+        max_delay=_env_float(RETRY_MAX_DELAY_ENV_KEY, DEFAULT_RETRY_MAX_DELAY),
+    )
+
+
+def close_http_client() -> None:
+    """Close the shared client; the next call to ``get_http_client`` recreates it."""
+    global _client
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def build_case_law_url(case_uri: str) -> str:
+    """
+    Turn a case URI path (e.g. "/ewhc/ch/2025/3107") or full URL into a full URL.
+    """
+    if case_uri.startswith("http"):
+        return case_uri
+    if not case_uri.startswith("/"):
+        case_uri = f"/{case_uri}"
+    return f"{CASE_LAW_BASE_URL}{case_uri}"
+
+
+# ----------------------------------------------------------------------------
+# Connection reuse, throttling and retry counters
+# ----------------------------------------------------------------------------
+
+def reset_http_stats() -> None:
+    """Reset the request and connection counters."""
+    with _stats_lock:
+        _stats.clear()
+        _stats.update({
+            "requests": 0,
+            "connections_opened": 0,
+            "errors": 0,
+            "throttled": 0,
+            "throttle_wait_seconds": 0.0,
+            "retries": 0,
+            "retries_exhausted": 0,
+            "retry_statuses": {},
+            "http_versions": {},
+        })
+
+
+reset_http_stats()
+
+
+def get_http_stats() -> Dict[str, Any]:
+    """
+    Snapshot of the client counters.
+
+    ``connections_reused`` counts requests that were served over an already
+    open pooled connection rather than a fresh TCP connect. ``throttled``
+    counts requests delayed by the local rate limiter; ``retry_statuses``
+    counts retried responses by status code (transport errors as "error").
+    """
+    with _stats_lock:
+        snapshot = dict(_stats)
+        snapshot["http_versions"] = dict(_stats["http_versions"])
+        snapshot["retry_statuses"] = dict(_stats["retry_statuses"])
+    snapshot["connections_reused"] = max(
+        0, snapshot["requests"] - snapshot["connections_opened"]
+    )
+    return snapshot
+
+
+def _incr(key: str, amount: float = 1) -> None:
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def _record_throttle(waited: float) -> None:
+    if waited > 0:
+        with _stats_lock:
+            _stats["throttled"] += 1
+            _stats["throttle_wait_seconds"] += waited
+
+
+def _record_retry(reason: str) -> None:
+    with _stats_lock:
+        _stats["retries"] += 1
+        statuses = _stats["retry_statuses"]
+        statuses[reason] = statuses.get(reason, 0) + 1
+
+
+def _record_response(response: httpx.Response) -> None:
+    with _stats_lock:
+        versions = _stats["http_versions"]
+        versions[response.http_version] = versions.get(response.http_version, 0) + 1
+
+
+def _trace(event_name: str, info: Dict[str, Any]) -> None:
+    # httpcore only emits connect_tcp when the pool has to open a new socket.
+    if event_name == "connection.connect_tcp.complete":
+        _incr("connections_opened")
+
+
+async def _atrace(event_name: str, info: Dict[str, Any]) -> None:
+    _trace(event_name, info)
+
+
+def http_get(
+    url: str,
+    *,
+    params: Optional[Mapping[str, Any]] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    timeout: Optional[float] = None,
+    stream: bool = False,
+) -> httpx.Response:
+    """
+    Issue a GET through the shared pooled client.
+
+    Requests wait for the host's rate limiter and are retried on 429/5xx and
+    transport errors. The final response is returned as-is; callers decide
+    whether to ``raise_for_status()``. With ``stream=True`` its body is left
+    unread for the caller to iterate, and the caller must close it.
+    """
+    client = get_http_client()
+    limiter = get_rate_limiter(url)
+    policy = get_retry_policy()
+    attempt = 0
+
+    while True:
+        _record_throttle(limiter.acquire())
+        _incr("requests")
+        try:
+            request = client.build_request(
+                "GET",
+                url,
+                params=params,
+                headers=headers,
+                timeout=timeout if timeout is not None else DEFAULT_TIMEOUT,
+                extensions={"trace": _trace},
+            )
+            response = client.send(request, stream=stream)
+        except httpx.HTTPError as e:
+            _incr("errors")
+            if not policy.should_retry_error(e, attempt):
+                if attempt:
+                    _incr("retries_exhausted")
+                raise
+            _record_retry("error")
+            time.sleep(policy.delay_for(None, attempt))
+            attempt += 1
+            continue
+
+        _record_response(response)
+        if not policy.should_retry_response(response, attempt):
+            if attempt and response.status_code in policy.retry_statuses:
+                _incr("retries_exhausted")
+            return response
+
+        _record_retry(str(response.status_code))
+        response.close()
+        time.sleep(policy.delay_for(response, attempt))
+        attempt += 1
+
+
+async def ahttp_get(
+    url: str,
+    *,
+    params: Optional[Mapping[str, Any]] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    timeout: Optional[float] = None,
+    stream: bool = False,
+) -> httpx.Response:
+    """
+    Async counterpart of ``http_get``.
+
+    At most ``CASE_LAW_HTTP_MAX_PER_HOST`` requests per host are in flight at
+    once; further callers wait for a free slot. Backoff sleeps release the
+    slot so other requests can proceed.
+    """
+    client = get_async_http_client()
+    limiter = get_rate_limiter(url)
+    policy = get_retry_policy()
+    attempt = 0
+
+    while True:
+        async with _host_semaphore(url):
+            _record_throttle(await limiter.aacquire())
+            _incr("requests")
+            try:
+                request = client.build_request(
+                    "GET",
+                    url,
+                    params=params,
+                    headers=headers,
+                    timeout=timeout if timeout is not None else DEFAULT_TIMEOUT,
+                    extensions={"trace": _atrace},
+                )
+                response = await client.send(request, stream=stream)
+            except httpx.HTTPError as e:
+                _incr("errors")
+                if not policy.should_retry_error(e, attempt):
+                    if attempt:
+                        _incr("retries_exhausted")
+                    raise
+                response = None
+
+        if response is None:
+            _record_retry("error")
+            await asyncio.sleep(policy.delay_for(None, attempt))
+            attempt += 1
+            continue
+
+        _record_response(response)
+        if not policy.should_retry_response(response, attempt):
+            if attempt and response.status_code in policy.retry_statuses:
+                _incr("retries_exhausted")
+            return response
+
+        _record_retry(str(response.status_code))
+        await response.aclose()
+        await asyncio.sleep(policy.delay_for(response, attempt))
+        attempt += 1
@@ -0,0 +1,446 @@
+"""
+Persistent on-disk cache for parsed case law judgments.
+
+Parsed judgments are stored content-addressed: the text is compressed and
+written once under ``blobs/<sha256>``, and a SQLite index maps each
+normalized case URI to its blob plus metadata. Entries expire after a TTL
+and the least recently used entries are evicted once the blobs exceed the
+size cap.
+
+Entries not validated against the server for ``CASE_LAW_CACHE_REVALIDATE_DAYS``
+are stale: they are still returned, but callers should revalidate them with a
+conditional GET using the ``etag``/``last_modified`` validators kept in the
+entry metadata. A 304 answer renews the entry via ``mark_validated``, which
+also restarts its TTL.
+
+A lookup counts as a hit (and its original download time as network time
+saved) only when the cached copy is served. A stale entry counts as a miss
+until the caller reports with ``mark_served`` that it served it after all
+(304, or a failed revalidation); a stale entry replaced by a new download
+stays a miss.
+
+Configuration (environment variables):
+
+- ``CASE_LAW_CACHE_DIR``: cache location (default: ``dataset/case_law_cache/judgments``)
+- ``CASE_LAW_CACHE_TTL_DAYS``: entry lifetime in days since last validation (default: 30)
+- ``CASE_LAW_CACHE_REVALIDATE_DAYS``: age after which entries are revalidated (default: 7)
+- ``CASE_LAW_CACHE_MAX_MB``: total compressed size cap (default: 512)
+- ``CASE_LAW_CACHE_DISABLED``: set to ``1`` to bypass the cache
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_DIR = PROJECT_ROOT / "dataset" / "case_law_cache" / "judgments"
+
+CACHE_DIR_ENV_KEY = "CASE_LAW_CACHE_DIR"
+CACHE_TTL_ENV_KEY = "CASE_LAW_CACHE_TTL_DAYS"
+CACHE_MAX_MB_ENV_KEY = "CASE_LAW_CACHE_MAX_MB"
+CACHE_REVALIDATE_ENV_KEY = "CASE_LAW_CACHE_REVALIDATE_DAYS"
+CACHE_DISABLED_ENV_KEY = "CASE_LAW_CACHE_DISABLED"
+
+DEFAULT_TTL_DAYS = 30.0
+DEFAULT_MAX_MB = 512.0
+DEFAULT_REVALIDATE_DAYS = 7.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS judgments (
+    uri TEXT PRIMARY KEY,
+    blob_hash TEXT NOT NULL,
+    blob_size INTEGER NOT NULL,
+    metadata TEXT NOT NULL,
+    fetch_seconds REAL NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    validated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS judgments_last_access ON judgments (last_access);
+CREATE INDEX IF NOT EXISTS judgments_validated_at ON judgments (validated_at);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+def normalize_case_uri(case_uri: str) -> str:
+    """
+    Normalize a case URI or URL to its path form, e.g.
+    "https://caselaw.nationalarchives.gov.uk/EWCA/Civ/2023/100?query=x" -> "/ewca/civ/2023/100".
+    """
+    path = urlsplit(case_uri.strip()).path if "://" in case_uri else case_uri.strip()
+    path = path.split("?")[0].split("#")[0].rstrip("/").lower()
+    if not path.startswith("/"):
+        path = f"/{path}"
+    return path
+
+
+@dataclass
+class CachedJudgment:
+    uri: str
+    text: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    fetch_seconds: float = 0.0
+    created_at: float = 0.0
+    validated_at: float = 0.0
+    stale: bool = False
+
+
+class JudgmentCache:
+    """Content-addressed judgment store with a SQLite index, TTL and LRU size cap."""
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        ttl_seconds: float,
+        max_bytes: int,
+        revalidate_seconds: Optional[float] = None,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.blob_dir = self.cache_dir / "blobs"
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = ttl_seconds if revalidate_seconds is None else revalidate_seconds
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.cache_dir / "index.sqlite3",
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._session: Dict[str, float] = {}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def get(self, case_uri: str) -> Optional[CachedJudgment]:
+        """
+        Return the cached judgment or None on a miss or expired entry. A
+        stale entry is returned but counted as a miss (see ``mark_served``).
+        """
+        uri = normalize_case_uri(case_uri)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blob_hash, metadata, fetch_seconds, created_at, validated_at "
+                "FROM judgments WHERE uri = ?",
+                (uri,),
+            ).fetchone()
+
+            if row is None:
+                self._bump("misses")
+                return None
+
+            blob_hash, metadata, fetch_seconds, created_at, validated_at = row
+            if now - validated_at > self.ttl_seconds:
+                self._bump("expired")
+                self._bump("misses")
+                return None
+
+            try:
+                text = self._read_blob(blob_hash)
+            except (OSError, zlib.error):
+                self._conn.execute("DELETE FROM judgments WHERE uri = ?", (uri,))
+                self._bump("misses")
+                return None
+
+            self._conn.execute(
+                "UPDATE judgments SET last_access = ? WHERE uri = ?", (now, uri)
+            )
+            stale = now - validated_at > self.revalidate_seconds
+            if stale:
+                self._bump("stale")
+                self._bump("misses")
+            else:
+                self._bump("hits")
+                self._bump("network_seconds_saved", fetch_seconds)
+
+        return CachedJudgment(
+            uri=uri,
+            text=text,
+            metadata=json.loads(metadata),
+            fetch_seconds=fetch_seconds,
+            created_at=created_at,
+            validated_at=validated_at,
+            stale=stale,
+        )
+
+    def put(
+        self,
+        case_uri: str,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        fetch_seconds: float = 0.0,
+    ) -> None:
+        """Store a parsed judgment and enforce the size cap."""
+        uri = normalize_case_uri(case_uri)
+        data = text.encode("utf-8")
+        blob_hash = hashlib.sha256(data).hexdigest()
+        now = time.time()
+
+        with self._lock:
+            blob_path = self._blob_path(blob_hash)
+            if not blob_path.exists():
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = blob_path.with_suffix(".tmp")
+                tmp_path.write_bytes(zlib.compress(data, 6))
+                tmp_path.replace(blob_path)
+
+            previous = self._conn.execute(
+                "SELECT blob_hash FROM judgments WHERE uri = ?", (uri,)
+            ).fetchone()
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO judgments "
+                "(uri, blob_hash, blob_size, metadata, fetch_seconds, created_at, last_access, validated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    uri,
+                    blob_hash,
+                    blob_path.stat().st_size,
+                    json.dumps(metadata or {}),
+                    fetch_seconds,
+                    now,
+                    now,
+                    now,
+                ),
+            )
+            if previous is not None and previous[0] != blob_hash:
+                self._drop_blob_if_unused(previous[0])
+            self._bump("stores")
+            self._evict()
+
+    def mark_validated(self, case_uri: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Record that the server confirmed the cached copy (HTTP 304);
+        ``metadata`` updates (e.g. a new ETag) are merged into the entry.
+        """
+        uri = normalize_case_uri(case_uri)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT metadata FROM judgments WHERE uri = ?", (uri,)
+            ).fetchone()
+            if row is None:
+                return
+
+            merged = {**json.loads(row[0]), **(metadata or {})}
+            self._conn.execute(
+                "UPDATE judgments SET metadata = ?, validated_at = ?, last_access = ? WHERE uri = ?",
+                (json.dumps(merged), now, now, uri),
+            )
+            self._bump("revalidated")
+
+    def mark_served(self, case_uri: str) -> None:
+        """
+        Record that a stale entry returned by ``get`` was served after all:
+        its lookup becomes a hit and its download time counts as saved.
+        """
+        uri = normalize_case_uri(case_uri)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetch_seconds FROM judgments WHERE uri = ?", (uri,)
+            ).fetchone()
+            if row is None:
+                return
+
+            self._bump("misses", -1)
+            self._bump("hits")
+            self._bump("network_seconds_saved", row[0])
+
+    def stale_entries(self, limit: Optional[int] = None) -> List[CachedJudgment]:
+        """
+        Entries due for revalidation, least recently validated first. Only
+        the URI and metadata (validators) are loaded, not the judgment text.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT uri, metadata, fetch_seconds, created_at, validated_at FROM judgments "
+                "WHERE validated_at < ? ORDER BY validated_at ASC LIMIT ?",
+                (time.time() - self.revalidate_seconds, -1 if limit is None else limit),
+            ).fetchall()
+
+        return [
+            CachedJudgment(
+                uri=uri,
+                text="",
+                metadata=json.loads(metadata),
+                fetch_seconds=fetch_seconds,
+                created_at=created_at,
+                validated_at=validated_at,
+                stale=True,
+            )
+            for uri, metadata, fetch_seconds, created_at, validated_at in rows
+        ]
+
+    def iter_entries(self) -> Iterator[CachedJudgment]:
+        """
+        Every unexpired entry with its text, for bulk reads such as index
+        builds. Unlike ``get`` this neither counts hits nor refreshes LRU order.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT uri, blob_hash, metadata, fetch_seconds, created_at, validated_at "
+                "FROM judgments WHERE validated_at >= ? ORDER BY uri",
+                (now - self.ttl_seconds,),
+            ).fetchall()
+
+        for uri, blob_hash, metadata, fetch_seconds, created_at, validated_at in rows:
+            try:
+                text = self._read_blob(blob_hash)
+            except (OSError, zlib.error):
+                continue
+            yield CachedJudgment(
+                uri=uri,
+                text=text,
+                metadata=json.loads(metadata),
+                fetch_seconds=fetch_seconds,
+                created_at=created_at,
+                validated_at=validated_at,
+                stale=now - validated_at > self.revalidate_seconds,
+            )
+
+    def invalidate(self, case_uri: str) -> None:
+        uri = normalize_case_uri(case_uri)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blob_hash FROM judgments WHERE uri = ?", (uri,)
+            ).fetchone()
+            self._conn.execute("DELETE FROM judgments WHERE uri = ?", (uri,))
+            if row is not None:
+                self._drop_blob_if_unused(row[0])
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss statistics for this process (``session``) and across all
+        runs (``lifetime``), plus current entry count and size on disk.
+        """
+        with self._lock:
+            lifetime = dict(self._conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(blob_size), 0) FROM judgments"
+            ).fetchone()
+            session = dict(self._session)
+
+        def _with_ratio(counters: Dict[str, float]) -> Dict[str, float]:
+            lookups = counters.get("hits", 0) + counters.get("misses", 0)
+            counters["hit_ratio"] = counters.get("hits", 0) / lookups if lookups else 0.0
+            return counters
+
+        return {
+            "session": _with_ratio(session),
+            "lifetime": _with_ratio(lifetime),
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Internal helpers (callers hold self._lock)
+    # ------------------------------------------------------------------
+    def _blob_path(self, blob_hash: str) -> Path:
+        return self.blob_dir / blob_hash[:2] / f"{blob_hash}.z"
+
+    def _read_blob(self, blob_hash: str) -> str:
+        return zlib.decompress(self._blob_path(blob_hash).read_bytes()).decode("utf-8")
+
+    def _drop_blob_if_unused(self, blob_hash: str) -> None:
+        in_use = self._conn.execute(
+            "SELECT 1 FROM judgments WHERE blob_hash = ? LIMIT 1", (blob_hash,)
+        ).fetchone()
+        if in_use is None:
+            self._blob_path(blob_hash).unlink(missing_ok=True)
+
+    def _bump(self, name: str, amount: float = 1) -> None:
+        self._session[name] = self._session.get(name, 0) + amount
+        self._conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def _evict(self) -> None:
+        # Drop expired entries first, then least recently used until under the cap.
+        expired = self._conn.execute(
+            "SELECT uri, blob_hash FROM judgments WHERE validated_at < ?",
+            (time.time() - self.ttl_seconds,),
+        ).fetchall()
+        for uri, blob_hash in expired:
+            self._conn.execute("DELETE FROM judgments WHERE uri = ?", (uri,))
+            self._drop_blob_if_unused(blob_hash)
+
+        # Shared blobs are counted per entry, which errs on the side of evicting.
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(blob_size), 0) FROM judgments"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for uri, blob_hash, blob_size in self._conn.execute(
+            "SELECT uri, blob_hash, blob_size FROM judgments ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM judgments WHERE uri = ?", (uri,))
+            self._drop_blob_if_unused(blob_hash)
+            total -= blob_size
+            self._bump("evictions")
+
+
+_cache: Optional[JudgmentCache] = None
+_cache_lock = threading.Lock()
+
+
+def judgment_cache_enabled() -> bool:
+    return os.getenv(CACHE_DISABLED_ENV_KEY, "0").lower() not in ("1", "true", "yes")
+
+
+def get_judgment_cache() -> Optional[JudgmentCache]:
+    """Get the shared judgment cache, or None when caching is disabled."""
+    global _cache
+
+    if not judgment_cache_enabled():
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                ttl_days = float(os.getenv(CACHE_TTL_ENV_KEY) or DEFAULT_TTL_DAYS)
+                max_mb = float(os.getenv(CACHE_MAX_MB_ENV_KEY) or DEFAULT_MAX_MB)
+                revalidate_days = float(os.getenv(CACHE_REVALIDATE_ENV_KEY) or DEFAULT_REVALIDATE_DAYS)
+                _cache = JudgmentCache(
+                    cache_dir=os.getenv(CACHE_DIR_ENV_KEY) or DEFAULT_CACHE_DIR,
+                    ttl_seconds=ttl_days * 24 * 60 * 60,
+                    max_bytes=int(max_mb * 1024 * 1024),
+                    revalidate_seconds=revalidate_days * 24 * 60 * 60,
+                )
+
+    return _cache
+
+
+def get_judgment_cache_stats() -> Dict[str, Any]:
+    """Hit/miss and network-time-saved statistics for the judgment cache."""
+    cache = get_judgment_cache()
+    return cache.stats() if cache is not None else {}
@@ -0,0 +1,328 @@
+"""
+Single-pass extraction of National Archives judgment pages.
+
+A judgment page is parsed once into a ``Judgment`` record holding the header
+metadata (name, citation, court, date, judges, parties) and the numbered
+paragraph list of the judgment body. The case law tools format their output
+from this record instead of re-parsing the page each.
+
+Judgments are also published as LegalDocML (Akoma Ntoso) XML; ``parse_judgment_xml``
+builds the same record from that feed with a streaming pull parser, which
+gives exact paragraph numbers, court codes and ISO dates. It can be fed the
+response body chunk by chunk, and keeps no more of the tree than the element
+being read.
+"""
+
+from __future__ import annotations
+
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from src.tools.html_backend import make_soup
+
+BLOCK_TAGS = ["p", "div", "h2", "h3", "h4"]
+
+# Leading paragraph numbers such as "12." or "(3)" when they are part of the text
+_LEADING_NUMBER_RE = re.compile(r"^(\d+\.(?!\d)|\(\d+\))")
+
+
+@dataclass
+class JudgmentParagraph:
+    number: Optional[str]
+    text: str
+
+    def render(self) -> str:
+        return f"{self.number} {self.text}" if self.number else self.text
+
+
+@dataclass
+class Judgment:
+    url: str
+    name: str = "Unknown Case"
+    citation: str = "N/A"
+    court: str = "N/A"
+    date: str = "N/A"
+    case_number: str = "N/A"
+    court_code: str = "N/A"
+    judges: List[str] = field(default_factory=list)
+    parties: List[str] = field(default_factory=list)
+    paragraphs: List[JudgmentParagraph] = field(default_factory=list)
+
+    @property
+    def body_text(self) -> str:
+        """Judgment body with one paragraph per block, separated by blank lines."""
+        if not self.paragraphs:
+            return "Unable to extract judgment text"
+        return "\n\n".join(paragraph.render() for paragraph in self.paragraphs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Judgment":
+        data = dict(data)
+        data["paragraphs"] = [JudgmentParagraph(**p) for p in data.get("paragraphs", [])]
+        return cls(**data)
+
+
+def _text(element) -> str:
+    return element.get_text(strip=True) if element else ""
+
+
+def _extract_court(header_texts: List[str]) -> str:
+    court_parts = []
+    for text in header_texts[:20]:
+        # Look for court indicators in the text
+        if ('COURT' in text or 'TRIBUNAL' in text) and len(text) < 150:
+            court_parts.append(text)
+        # Stop after we've found some court info and hit "Before" or "Between"
+        if court_parts and ('Before' in text or 'Between' in text):
+            break
+    return ' - '.join(court_parts[:3]) if court_parts else "N/A"  # Take max first 3 lines
+
+
+def _extract_judges(header_texts: List[str]) -> List[str]:
+    found_before = False
+    for text in header_texts[:30]:
+        if 'Before' in text and ':' in text:
+            found_before = True
+            continue
+        if found_before and text and 'Between' not in text:
+            return [text]
+    return []
+
+
+def _extract_parties(soup) -> List[str]:
+    parties = []
+    parties_table = soup.find('table', class_='pr-two-column')
+    if parties_table:
+        for cell in parties_table.find_all('p'):
+            text = cell.get_text(strip=True)
+            if text and text not in ['-', 'and', '-and-', '']:
+                parties.append(text)
+    return parties
+
+
+def _has_number_class(css_class: Optional[str]) -> bool:
+    return bool(css_class) and 'number' in css_class
+
+
+def _is_leaf_block(element) -> bool:
+    return element.find(BLOCK_TAGS) is None
+
+
+def _extract_paragraphs(body) -> List[JudgmentParagraph]:
+    paragraphs: List[JudgmentParagraph] = []
+    pending_number: Optional[str] = None
+
+    for element in body.find_all(BLOCK_TAGS + ["span"]):
+        if element.name == "span":
+            # A number marker sitting beside (not inside) a paragraph block
+            # labels the next paragraph.
+            if any(_has_number_class(css_class) for css_class in element.get('class') or []):
+                parent_block = element.find_parent(BLOCK_TAGS)
+                if parent_block is None or not _is_leaf_block(parent_block):
+                    pending_number = _text(element) or None
+            continue
+
+        # Only leaf blocks carry text of their own; containers would repeat it.
+        if not _is_leaf_block(element):
+            continue
+
+        text = element.get_text(strip=True)
+        if not text:
+            continue
+
+        marker = element.find('span', class_=_has_number_class)
+        number: Optional[str] = None
+        if marker is not None:
+            number = _text(marker) or None
+        elif pending_number is not None:
+            number = pending_number
+        else:
+            match = _LEADING_NUMBER_RE.match(text)
+            if match:
+                number = match.group(1)
+
+        if number and text.startswith(number):
+            text = text[len(number):].lstrip()
+        pending_number = None
+
+        if text:
+            paragraphs.append(JudgmentParagraph(number=number, text=text))
+
+    return paragraphs
+
+
+def parse_judgment_html(html: str, url: str, parser: Optional[str] = None) -> Judgment:
+    """
+    Parse a National Archives judgment page into a ``Judgment`` record.
+
+    Args:
+        html: The judgment page HTML
+        url: The page URL (kept on the record for citation output)
+        parser: HTML parser backend (default: the configured backend, see html_backend)
+
+    Returns:
+        Judgment with header metadata and numbered paragraphs
+    """
+    soup = make_soup(html, parser)
+
+    citation_elem = soup.find('span', class_='ncn-nowrap') or soup.find('span', class_='neutral-citation')
+    date_div = soup.find('div', class_='judgment-header__date')
+    case_num_div = soup.find('div', class_='judgment-header__case-number')
+
+    # Header paragraphs are scanned once for both court and judges
+    header_texts = [p.get_text(strip=True) for p in soup.find_all('p', limit=30)]
+
+    judgment_body = soup.find('section', class_='judgment-body') or soup.find('div', class_='judgment-body')
+
+    return Judgment(
+        url=url,
+        name=_text(soup.find('h1')) or "Unknown Case",
+        citation=_text(citation_elem) or "N/A",
+        court=_extract_court(header_texts),
+        date=_text(date_div).replace('Date:', '').strip() if date_div else "N/A",
+        case_number=_text(case_num_div).replace('Case No:', '').strip() if case_num_div else "N/A",
+        judges=_extract_judges(header_texts),
+        parties=_extract_parties(soup),
+        paragraphs=_extract_paragraphs(judgment_body) if judgment_body else [],
+    )
+
+
+# ----------------------------------------------------------------------------
+# Akoma Ntoso XML
+# ----------------------------------------------------------------------------
+
+AKN_NS = "http://docs.oasis-open.org/legaldocml/ns/akn/3.0"
+UK_NS = "https://caselaw.nationalarchives.gov.uk/akn"
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _xml_text(elem: ET.Element, skip: Optional[ET.Element] = None) -> str:
+    parts = []
+    for child in elem.iter():
+        if child is skip:
+            # Drop the skipped element's own text but keep its tail
+            parts.append(child.tail or "")
+            continue
+        parts.append(child.text or "")
+        if child is not elem:
+            parts.append(child.tail or "")
+    return _clean("".join(parts))
+
+
+class JudgmentXmlParser:
+    """
+    Incremental Akoma Ntoso parser: ``feed`` it the document in chunks as they
+    arrive, then ``close`` it for the ``Judgment`` record.
+
+    Only the element being read and its ancestors are kept: every body
+    element is detached from its parent once handled, so memory stays flat
+    however long the judgment is.
+    """
+
+    def __init__(self, url: str):
+        self.judgment = Judgment(url=url)
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._elements: List[ET.Element] = []
+        self._names: List[str] = []
+        self._court_types: List[str] = []
+        self._author_ref = ""
+        self._organizations: Dict[str, str] = {}
+
+    def feed(self, data: Union[bytes, str]) -> None:
+        self._parser.feed(data)
+        self._handle_events()
+
+    def close(self) -> Judgment:
+        """Finish parsing; raises ET.ParseError if the document is incomplete."""
+        self._parser.close()
+        self._handle_events()
+
+        judgment = self.judgment
+        court_name = " - ".join(self._court_types[:3]) or self._organizations.get(self._author_ref, "")
+        judgment.court = court_name or (judgment.court_code if judgment.court_code != "N/A" else "N/A")
+        return judgment
+
+    def _handle_events(self) -> None:
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._elements.append(elem)
+                self._names.append(_local(elem.tag))
+                continue
+
+            self._elements.pop()
+            self._handle_end(self._names.pop(), elem)
+            if "judgmentBody" in self._names and "paragraph" not in self._names:
+                # Read in full; nothing later refers back to it
+                self._elements[-1].remove(elem)
+
+    def _handle_end(self, name: str, elem: ET.Element) -> None:
+        judgment = self.judgment
+        stack = self._names
+        in_header = "header" in stack
+        in_body = "judgmentBody" in stack
+
+        if name == "FRBRname" and "FRBRWork" in stack:
+            judgment.name = elem.get("value") or judgment.name
+        elif name == "FRBRdate" and "FRBRWork" in stack and elem.get("name") == "judgment":
+            judgment.date = elem.get("date") or judgment.date
+        elif name == "FRBRauthor" and "FRBRWork" in stack:
+            self._author_ref = (elem.get("href") or "").lstrip("#")
+        elif name == "TLCOrganization":
+            self._organizations[elem.get("eId", "")] = elem.get("showAs", "")
+        elif elem.tag == f"{{{UK_NS}}}court":
+            judgment.court_code = _clean(elem.text or "") or judgment.court_code
+        elif elem.tag == f"{{{UK_NS}}}cite":
+            judgment.citation = _clean(elem.text or "") or judgment.citation
+        elif name == "neutralCitation" and judgment.citation == "N/A":
+            judgment.citation = _xml_text(elem) or judgment.citation
+        elif name == "docketNumber" and in_header:
+            judgment.case_number = _xml_text(elem).replace("Case No:", "").strip() or judgment.case_number
+        elif name == "courtType" and in_header:
+            self._court_types.append(_xml_text(elem))
+        elif name == "judge" and in_header:
+            judgment.judges.append(_xml_text(elem))
+        elif name == "party" and in_header:
+            judgment.parties.append(_xml_text(elem))
+        elif name == "paragraph" and in_body and "paragraph" not in stack:
+            num = elem.find(f"{{{AKN_NS}}}num")
+            number = _clean(num.text or "") if num is not None else None
+            text = _xml_text(elem, skip=num)
+            if text:
+                judgment.paragraphs.append(JudgmentParagraph(number=number or None, text=text))
+        elif name == "heading" and in_body and "paragraph" not in stack:
+            text = _xml_text(elem)
+            if text:
+                judgment.paragraphs.append(JudgmentParagraph(number=None, text=text))
+
+
+def parse_judgment_xml(source: Union[bytes, str, Iterable[bytes]], url: str) -> Judgment:
+    """
+    Stream-parse a National Archives Akoma Ntoso judgment into a ``Judgment`` record.
+
+    Args:
+        source: The ``data.xml`` document as bytes or text, or as an iterable
+            of byte chunks (e.g. ``response.iter_bytes()``) to parse as it is read
+        url: The judgment page URL (kept on the record for citation output)
+
+    Returns:
+        Judgment with header metadata and numbered paragraphs
+    """
+    parser = JudgmentXmlParser(url)
+    if isinstance(source, (bytes, str)):
+        parser.feed(source)
+    else:
+        for chunk in source:
+            parser.feed(chunk)
+    return parser.close()
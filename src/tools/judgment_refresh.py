@@ -0,0 +1,100 @@
+"""
+Background revalidation of cached judgments.
+
+The National Archives occasionally republishes corrected judgments. Cached
+entries older than ``CASE_LAW_CACHE_REVALIDATE_DAYS`` are revalidated with a
+conditional GET (``If-None-Match`` / ``If-Modified-Since``). An unchanged
+judgment costs a 304 with no body; a changed one is downloaded, re-parsed and
+replaces the cached copy.
+
+Run once from the command line:
+
+    python -m src.tools.judgment_refresh --limit 500
+
+or keep it running alongside a long-lived process with
+``start_background_refresh()``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+
+from src.tools.case_law_search import arevalidate_judgment
+from src.tools.judgment_cache import get_judgment_cache
+
+DEFAULT_REFRESH_INTERVAL_SECONDS = 6 * 60 * 60
+DEFAULT_REFRESH_CONCURRENCY = 4
+
+
+async def refresh_stale_judgments(
+    limit: Optional[int] = None,
+    concurrency: int = DEFAULT_REFRESH_CONCURRENCY,
+) -> Dict[str, int]:
+    """
+    Revalidate cached judgments that are due, least recently validated first.
+
+    Args:
+        limit: Maximum number of entries to check (default: all stale entries)
+        concurrency: Revalidation requests in flight at once
+
+    Returns:
+        Counts of entries checked, not_modified, updated and errors
+    """
+    stats = {"checked": 0, "not_modified": 0, "updated": 0, "errors": 0}
+    cache = get_judgment_cache()
+    if cache is None:
+        return stats
+
+    entries = await asyncio.to_thread(cache.stale_entries, limit)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def refresh(entry) -> None:
+        async with semaphore:
+            try:
+                updated = await arevalidate_judgment(entry)
+            except httpx.HTTPError as e:
+                print(f"[judgment_refresh] Could not revalidate {entry.uri}: {e}")
+                stats["errors"] += 1
+                return
+        stats["checked"] += 1
+        stats["updated" if updated else "not_modified"] += 1
+
+    await asyncio.gather(*[refresh(entry) for entry in entries])
+    return stats
+
+
+def start_background_refresh(
+    interval_seconds: float = DEFAULT_REFRESH_INTERVAL_SECONDS,
+    limit: Optional[int] = None,
+) -> asyncio.Task:
+    """
+    Revalidate stale entries every ``interval_seconds`` on the running event
+    loop. Cancel the returned task to stop.
+    """
+
+    async def run() -> None:
+        while True:
+            stats = await refresh_stale_judgments(limit=limit)
+            if stats["checked"] or stats["errors"]:
+                print(f"[judgment_refresh] {stats}")
+            await asyncio.sleep(interval_seconds)
+
+    return asyncio.create_task(run(), name="judgment-refresh")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Revalidate stale cached judgments")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_REFRESH_CONCURRENCY)
+    args = parser.parse_args()
+
+    stats = asyncio.run(refresh_stale_judgments(limit=args.limit, concurrency=args.concurrency))
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
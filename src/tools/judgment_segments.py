@@ -0,0 +1,207 @@
+"""
+Paragraph segmentation of judgments and paragraph-level snippet selection.
+
+Judgments are argued in numbered paragraphs, and courts cite them that way
+("at [45]"). ``segment_judgment`` turns the paragraph list built by
+judgment_parser into indexed ``Segment`` records, and ``ParagraphIndex`` is an
+inverted index from each keyword of a search to the paragraphs it occurs in.
+Snippet selection then only touches paragraphs with hits:
+
+- paragraphs are scored BM25-style with the paragraphs themselves as the
+  documents (same constants as snippet_ranking), so a term found in every
+  paragraph counts less than one found in a few;
+- the best paragraphs are taken whole, in score order, while they fit the
+  token budget, so no sentence is cut mid-argument;
+- chosen paragraphs are printed in document order, consecutive ones in one
+  [SNIPPET i] block, each labelled with its citable number, e.g. "[45]".
+"""
+
+from __future__ import annotations
+
+import math
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.tools.judgment_parser import Judgment
+from src.tools.keyword_matcher import get_keyword_matcher
+from src.tools.snippet_extractor import parse_keywords
+from src.tools.snippet_packer import SNIPPET_MARKER, TokenCounter, get_tokenizer, pack_snippets
+from src.tools.snippet_ranking import B, DIVERSITY_WEIGHT, K1, PHRASE_BOOST
+
+# (score, segment index)
+ScoredSegment = Tuple[float, int]
+
+
+@dataclass(frozen=True)
+class Segment:
+    index: int  # Position of the paragraph in the judgment
+    number: Optional[str]  # Paragraph number as printed ("12.", "(3)"), None for headings
+    text: str
+
+    @property
+    def label(self) -> Optional[str]:
+        """Citable paragraph reference such as "[45]", or None if unnumbered."""
+        if not self.number:
+            return None
+        return f"[{self.number.strip('()[]. ')}]"
+
+    def render(self) -> str:
+        return f"{self.label} {self.text}" if self.label else self.text
+
+
+def segment_judgment(judgment: Judgment) -> List[Segment]:
+    """Indexed paragraphs of a judgment, in document order."""
+    return [
+        Segment(index=i, number=paragraph.number, text=paragraph.text)
+        for i, paragraph in enumerate(judgment.paragraphs)
+    ]
+
+
+class ParagraphIndex:
+    """Inverted index from the keywords of one search to the paragraphs they occur in."""
+
+    def __init__(self, segments: Sequence[Segment], keywords: Sequence[str], whole_words: bool = False):
+        self.segments = segments
+        self.lengths = [len(segment.text.split()) for segment in segments]
+        self.avg_length = (sum(self.lengths) / len(self.lengths) if self.lengths else 0) or 1
+
+        # Keyword -> (segment index, term frequency) in document order
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        matcher = get_keyword_matcher(keywords, whole_words)
+        for segment in segments:
+            counts = Counter(keyword for _, _, keyword in matcher.find_all(segment.text))
+            for keyword, tf in counts.items():
+                self.postings[keyword].append((segment.index, tf))
+
+    def paragraphs_with(self, keyword: str) -> List[int]:
+        """Indices of the paragraphs containing keyword."""
+        return [index for index, _ in self.postings.get(keyword, ())]
+
+    def rank(self) -> List[ScoredSegment]:
+        """
+        Score every paragraph with at least one hit.
+
+        Returns:
+            (score, segment index) pairs, best first (earlier paragraphs win ties)
+        """
+        n_segments = len(self.segments)
+        n_terms = len(self.postings)
+        scores: Dict[int, float] = defaultdict(float)
+        distinct_terms: Counter = Counter()
+
+        for keyword, postings in self.postings.items():
+            df = len(postings)
+            idf = math.log(1 + (n_segments - df + 0.5) / (df + 0.5))
+            idf *= PHRASE_BOOST if " " in keyword.strip() else 1.0
+            for index, tf in postings:
+                norm = K1 * (1 - B + B * self.lengths[index] / self.avg_length)
+                scores[index] += idf * tf * (K1 + 1) / (tf + norm)
+                distinct_terms[index] += 1
+
+        ranked = [
+            (score * (1 + DIVERSITY_WEIGHT * distinct_terms[index] / n_terms), index)
+            for index, score in scores.items()
+        ]
+        ranked.sort(key=lambda scored: (-scored[0], scored[1]))
+        return ranked
+
+
+def format_paragraph_snippets(segments: Sequence[Segment], indices: Sequence[int]) -> str:
+    """Render chosen paragraphs as [SNIPPET i] blocks, one block per run of consecutive paragraphs."""
+    blocks: List[List[str]] = []
+    previous = None
+    for index in sorted(indices):
+        if previous is None or index != previous + 1:
+            blocks.append([])
+        blocks[-1].append(segments[index].render())
+        previous = index
+
+    return "\n\n".join(
+        f"[SNIPPET {i}]\n" + "\n\n".join(block) for i, block in enumerate(blocks, 1)
+    )
+
+
+def extract_paragraph_snippets(
+    segments: Sequence[Segment],
+    keyword_set: str,
+    token_budget: int,
+    tokenizer: Optional[TokenCounter] = None,
+    whole_words: bool = False,
+) -> str:
+    """
+    Fill ``token_budget`` tokens with the most relevant whole paragraphs of a judgment.
+
+    Args:
+        segments: The judgment paragraphs (see segment_judgment)
+        keyword_set: The search query with keywords (e.g., '"environmental matters" subsidiary')
+        token_budget: Maximum tokens of snippet text (including markers) for this case
+        tokenizer: Token counter (default: ``get_tokenizer()``)
+        whole_words: Only count keyword hits on word boundaries (default: False)
+
+    Returns:
+        [SNIPPET i] blocks of labelled paragraphs in document order, or "" if
+        no keyword occurs or no matching paragraph fits the budget
+    """
+    keywords = parse_keywords(keyword_set)
+    if not segments or not keywords or token_budget <= 0:
+        return ""
+
+    count_tokens = tokenizer or get_tokenizer()
+    marker_tokens = count_tokens(SNIPPET_MARKER)
+    index = ParagraphIndex(segments, keywords, whole_words)
+
+    chosen: List[int] = []
+    used = 0
+    for _, segment_index in index.rank():
+        if token_budget - used <= marker_tokens:
+            break
+        cost = count_tokens(segments[segment_index].render()) + marker_tokens
+        if used + cost > token_budget:
+            continue
+        chosen.append(segment_index)
+        used += cost
+
+    return format_paragraph_snippets(segments, chosen)
+
+
+def opening_paragraphs(
+    segments: Sequence[Segment],
+    token_budget: int,
+    tokenizer: Optional[TokenCounter] = None,
+) -> str:
+    """
+    The first paragraphs of a judgment (its headnote and introduction) that
+    fit ``token_budget`` tokens, as one [SNIPPET 1] block, or "" if none fits.
+    """
+    count_tokens = tokenizer or get_tokenizer()
+    used = count_tokens(SNIPPET_MARKER)
+    chosen: List[int] = []
+    for segment in segments:
+        used += count_tokens(segment.render())
+        if used > token_budget:
+            break
+        chosen.append(segment.index)
+    return format_paragraph_snippets(segments, chosen)
+
+
+def judgment_snippets(
+    judgment: Judgment,
+    keyword_set: str,
+    token_budget: int,
+    tokenizer: Optional[TokenCounter] = None,
+) -> str:
+    """
+    Snippets of one judgment for the case law prompts: whole paragraphs, or
+    word windows (see snippet_packer) when no matching paragraph fits, e.g.
+    a page whose body could not be split into paragraphs. A judgment with no
+    keyword hits is represented by its opening paragraphs.
+    """
+    segments = segment_judgment(judgment)
+    snippets = extract_paragraph_snippets(segments, keyword_set, token_budget, tokenizer)
+    if snippets:
+        return snippets
+    snippets = pack_snippets(
+        judgment.body_text, keyword_set, token_budget, tokenizer, words_before=150, words_after=150
+    )
+    return snippets or opening_paragraphs(segments, token_budget, tokenizer)
@@ -0,0 +1,129 @@
+"""
+Multi-pattern keyword matcher for judgment text.
+
+``KeywordMatcher`` finds every keyword and phrase hit and returns hits sorted
+by position. All terms are compiled into one regex alternation, longest
+first, so the C regex engine looks for the whole keyword set at once rather
+than one term per scan. Shorter terms that begin at the same position as a
+longer match are prefixes of it; these are precomputed per term, so one
+search step reports them all. This is not an automaton: each search resumes
+one character after the previous hit's start, so the text inside a hit is
+searched again. That is how terms nested inside a phrase (e.g. "contract" in
+"breach of contract") are found, at the cost of rescanning the hits.
+
+Matching is on the lowercased text. Where lowercasing changes the length of
+some characters (e.g. "İ"), the search runs on the same lowercased text and
+hit offsets are mapped back to the original, so the result does not depend
+on which characters happen to be elsewhere in the text.
+
+Repeated hits of one term never overlap themselves (no "aa" hits one
+character apart in "aaaa"), and ``whole_words=True`` only accepts hits that
+start and end on word boundaries.
+
+Matchers are cached per keyword set with ``get_keyword_matcher``, since the
+same sets are applied to every case a search returned.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+Hit = Tuple[int, int, str]
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """Compiled matcher for one keyword set (case-insensitive)."""
+
+    def __init__(self, keywords: Sequence[str], whole_words: bool = False):
+        self.whole_words = whole_words
+
+        # Lowercased term -> keyword as given (first spelling wins)
+        self._terms: Dict[str, str] = {}
+        for keyword in keywords:
+            term = keyword.lower()
+            if term and term not in self._terms:
+                self._terms[term] = keyword
+
+        # No capture groups: they would stop the regex engine's literal-prefix
+        # scanning and make every search several times slower.
+        self._ordered = sorted(self._terms, key=len, reverse=True)
+        self._alternation = "|".join(re.escape(term) for term in self._ordered)
+        self._pattern: Optional[Pattern[str]] = re.compile(self._alternation) if self._ordered else None
+
+        # Output links: every term that is a prefix of this one, longest first
+        self._outputs: Dict[str, List[str]] = {
+            term: [other for other in self._ordered if term.startswith(other)]
+            for term in self._ordered
+        }
+
+    def find_all(self, text: str) -> List[Hit]:
+        """
+        Find all keyword hits in text.
+
+        Returns:
+            List of (start_pos, end_pos, matched_keyword) sorted by start, then end
+        """
+        if self._pattern is None:
+            return []
+
+        haystack = text.lower()
+        # Original index of the character each lowercased one came from, when
+        # lowercasing changed some lengths and offsets would otherwise drift
+        owners = _owners(text) if len(haystack) != len(text) else None
+
+        hits: List[Hit] = []
+        last_end: Dict[str, int] = {}
+        search = self._pattern.search
+        pos = 0
+
+        while True:
+            match = search(haystack, pos)
+            if match is None:
+                break
+            pos = match.start() + 1
+
+            # Shortest first, so same-start hits come out sorted by end
+            for term in reversed(self._outputs[match.group()]):
+                start = match.start()
+                end = start + len(term)
+                if owners is not None:
+                    start, end = owners[start], owners[end - 1] + 1
+                if start < last_end.get(term, 0):
+                    continue
+                if self.whole_words and not self._on_word_boundaries(text, start, end):
+                    continue
+                last_end[term] = end
+                hits.append((start, end, self._terms[term]))
+
+        return hits
+
+    @staticmethod
+    def _on_word_boundaries(text: str, start: int, end: int) -> bool:
+        if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+            return False
+        if end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]):
+            return False
+        return True
+
+
+def _owners(text: str) -> List[int]:
+    owners: List[int] = []
+    for i, ch in enumerate(text):
+        owners.extend([i] * len(ch.lower()))
+    return owners
+
+
+@lru_cache(maxsize=256)
+def _cached_matcher(keywords: Tuple[str, ...], whole_words: bool) -> KeywordMatcher:
+    return KeywordMatcher(keywords, whole_words)
+
+
+def get_keyword_matcher(keywords: Sequence[str], whole_words: bool = False) -> KeywordMatcher:
+    """Compiled matcher for a keyword set, reused across calls with the same set."""
+    return _cached_matcher(tuple(keywords), whole_words)
@@ -0,0 +1,251 @@
+"""
+Precedent index for ranking large candidate pools.
+
+``PrecedentIndex`` holds each case once (keyed by neutral citation, else URL)
+and keeps it in three sorted orders, all maintained with binary-search
+inserts as cases stream in from search:
+
+- per court level, newest first, for the authority ranking and controlling
+  precedents;
+- by decision date, for date range queries;
+- by a combined score, for top-k queries.
+
+The combined score weighs
+
+- authority: the court level, normalised to 0..1;
+- recency: halves every ``recency_half_life_years`` from the decision date
+  (cases without a date get 0);
+- relevance: a 0..1 value supplied by the caller, e.g. from the search rank.
+
+Every score is fixed when the case is inserted, so ``top_k`` is a slice of
+an already sorted list. Inserting is O(log n) comparisons plus a list insert,
+so the index stays cheap as the pool grows from a handful of search results
+to thousands of cases from the offline corpus.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.tools.court_hierarchy import (
+    CourtLevel,
+    get_court_display_name,
+    identify_case_court_level,
+    parse_neutral_citation,
+)
+
+AUTHORITY_WEIGHT = 0.6
+RECENCY_WEIGHT = 0.2
+RELEVANCE_WEIGHT = 0.2
+RECENCY_HALF_LIFE_YEARS = 10.0
+
+_DATE_FORMATS = ("%Y-%m-%d", "%d %B %Y", "%d %b %Y", "%d/%m/%Y", "%B %d, %Y")
+_ORDINAL_SUFFIX_RE = re.compile(r"(?<=\d)(st|nd|rd|th)\b", re.IGNORECASE)
+
+
+def parse_case_date(text: Optional[str], citation: Optional[str] = None) -> Optional[date]:
+    """
+    Decision date of a case from its metadata.
+
+    Args:
+        text: The date as published (e.g., "2023-12-15", "15th December 2023")
+        citation: Neutral citation, whose year is used when the date is unknown
+
+    Returns:
+        The date, mid-year of the citation year as a fallback, or None
+    """
+    if text and text != "N/A":
+        cleaned = _ORDINAL_SUFFIX_RE.sub("", text.replace("Date:", "")).strip()
+        for fmt in _DATE_FORMATS:
+            try:
+                return datetime.strptime(cleaned, fmt).date()
+            except ValueError:
+                continue
+
+    parsed = parse_neutral_citation(citation) if citation else None
+    return date(parsed.year, 7, 1) if parsed else None
+
+
+def case_key(case: Dict) -> str:
+    """Identity of a case in the index: its neutral citation, else its URL or name."""
+    citation = parse_neutral_citation(case.get("citation") or "")
+    if citation is not None:
+        return str(citation).upper()
+    return case.get("url") or case.get("name", "")
+
+
+@dataclass
+class _Entry:
+    seq: int
+    case: Dict
+    level: CourtLevel
+    decided: Optional[date]
+    relevance: float
+    score: float = 0.0
+
+    @property
+    def date_ordinal(self) -> int:
+        return self.decided.toordinal() if self.decided else 0
+
+
+class PrecedentIndex:
+    """Cases keyed by court level, date and citation, with top-k by combined score."""
+
+    def __init__(
+        self,
+        authority_weight: float = AUTHORITY_WEIGHT,
+        recency_weight: float = RECENCY_WEIGHT,
+        relevance_weight: float = RELEVANCE_WEIGHT,
+        recency_half_life_years: float = RECENCY_HALF_LIFE_YEARS,
+        reference_date: Optional[date] = None,
+    ):
+        self.authority_weight = authority_weight
+        self.recency_weight = recency_weight
+        self.relevance_weight = relevance_weight
+        self.recency_half_life_years = recency_half_life_years
+        self.reference_date = reference_date or date.today()
+
+        self._entries: Dict[int, _Entry] = {}
+        self._by_key: Dict[str, _Entry] = {}
+        # Sorted (sort key..., seq) tuples; seq keeps insertion order on ties
+        self._by_level: Dict[CourtLevel, List[Tuple[int, int]]] = {}
+        self._by_date: List[Tuple[int, int]] = []
+        self._by_score: List[Tuple[float, int]] = []
+
+    # ------------------------------------------------------------------
+    # Inserts
+    # ------------------------------------------------------------------
+    def add(self, case: Dict, relevance: float = 0.0) -> bool:
+        """
+        Insert a case, or raise the relevance of one already indexed.
+
+        Args:
+            case: Case metadata with 'court', 'citation', 'date' and 'url' fields
+            relevance: 0..1 relevance to the current issue
+
+        Returns:
+            True if the case was new to the index
+        """
+        key = case_key(case)
+        existing = self._by_key.get(key)
+        if existing is not None:
+            if relevance > existing.relevance:
+                del self._by_score[bisect_left(self._by_score, (-existing.score, existing.seq))]
+                existing.relevance = relevance
+                existing.score = self._score(existing)
+                insort(self._by_score, (-existing.score, existing.seq))
+            return False
+
+        level = identify_case_court_level(case)
+        entry = _Entry(
+            seq=len(self._entries),
+            case={
+                **case,
+                "court_level": level,
+                "court_level_value": int(level),
+                "court_level_name": get_court_display_name(level),
+            },
+            level=level,
+            decided=parse_case_date(case.get("date"), case.get("citation")),
+            relevance=relevance,
+        )
+        entry.score = self._score(entry)
+
+        self._entries[entry.seq] = entry
+        self._by_key[key] = entry
+        insort(self._by_level.setdefault(level, []), (-entry.date_ordinal, entry.seq))
+        insort(self._by_date, (entry.date_ordinal, entry.seq))
+        insort(self._by_score, (-entry.score, entry.seq))
+        return True
+
+    def extend(self, cases: Iterable[Dict], relevances: Optional[Iterable[float]] = None) -> int:
+        """Insert many cases; returns how many were new."""
+        relevances = list(relevances) if relevances is not None else []
+        added = 0
+        for i, case in enumerate(cases):
+            added += self.add(case, relevances[i] if i < len(relevances) else 0.0)
+        return added
+
+    def _score(self, entry: _Entry) -> float:
+        authority = int(entry.level) / int(CourtLevel.SUPREME_COURT)
+        recency = 0.0
+        if entry.decided is not None:
+            age_years = max(0, (self.reference_date - entry.decided).days) / 365.25
+            recency = 0.5 ** (age_years / self.recency_half_life_years)
+        return (
+            self.authority_weight * authority
+            + self.recency_weight * recency
+            + self.relevance_weight * entry.relevance
+        )
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, citation: str) -> bool:
+        return self.get(citation) is not None
+
+    def get(self, citation: str) -> Optional[Dict]:
+        """Case by neutral citation (any spacing or case) or URL."""
+        entry = self._by_key.get(case_key({"citation": citation, "url": citation}))
+        return entry.case if entry else None
+
+    def levels(self) -> List[CourtLevel]:
+        """Court levels present, highest first."""
+        return sorted(self._by_level, reverse=True)
+
+    def by_court_level(self, level: CourtLevel) -> List[Dict]:
+        """Cases of one court level, newest first."""
+        return [self._entries[seq].case for _, seq in self._by_level.get(level, [])]
+
+    def decided_between(self, start: date, end: date) -> List[Dict]:
+        """Cases decided in [start, end], oldest first."""
+        lo = bisect_left(self._by_date, (start.toordinal(),))
+        hi = bisect_right(self._by_date, (end.toordinal(), len(self._entries)))
+        return [self._entries[seq].case for _, seq in self._by_date[lo:hi]]
+
+    def top_k(self, k: int) -> List[Dict]:
+        """
+        The k cases with the highest combined authority/recency/relevance
+        score, best first, each with its 'precedent_rank' (see authority_rank) set.
+        """
+        top = []
+        for _, seq in self._by_score[:k]:
+            entry = self._entries[seq]
+            entry.case["precedent_rank"] = self._authority_rank(entry)
+            top.append(entry.case)
+        return top
+
+    def authority_rank(self, case: Dict) -> Optional[int]:
+        """Position of a case in ``ranked()`` (1 = highest), or None if it is not indexed."""
+        entry = self._by_key.get(case_key(case))
+        return self._authority_rank(entry) if entry else None
+
+    def _authority_rank(self, entry: _Entry) -> int:
+        above = sum(len(self._by_level[level]) for level in self._by_level if level > entry.level)
+        return above + bisect_left(self._by_level[entry.level], (-entry.date_ordinal, entry.seq)) + 1
+
+    def score(self, case: Dict) -> Optional[float]:
+        entry = self._by_key.get(case_key(case))
+        return entry.score if entry else None
+
+    def controlling(self) -> List[Dict]:
+        """The controlling precedent(s): every case of the highest court level present, newest first."""
+        levels = self.levels()
+        return self.by_court_level(levels[0]) if levels else []
+
+    def ranked(self) -> List[Dict]:
+        """
+        All cases by authority: court level, then newest first, with
+        'precedent_rank' set (1 = highest), as rank_cases_by_authority does.
+        """
+        ranked = [case for level in self.levels() for case in self.by_court_level(level)]
+        for rank, case in enumerate(ranked, start=1):
+            case["precedent_rank"] = rank
+        return ranked
@@ -0,0 +1,174 @@
+"""
+SQLite-backed cache for case law search results.
+
+Entries are keyed by (normalized query, page, per_page, order). Queries are
+normalized with ``normalize_query`` from the snippet extractor, so keyword
+sets that only differ in case, spacing or quoted-phrase order share one
+entry across issues and runs. Expired entries are purged when the cache is
+opened and again every ``PURGE_EVERY_PUTS`` stores, so the file does not
+grow without bound in a long-running process.
+
+Configuration (environment variables):
+
+- ``CASE_LAW_SEARCH_CACHE_PATH``: SQLite file (default: ``dataset/case_law_cache/search.sqlite3``)
+- ``CASE_LAW_SEARCH_CACHE_TTL_HOURS``: entry lifetime in hours (default: 24)
+- ``CASE_LAW_CACHE_DISABLED``: set to ``1`` to bypass all case law caches
+
+    python -m src.tools.search_cache stats
+    python -m src.tools.search_cache purge
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.tools.judgment_cache import judgment_cache_enabled
+from src.tools.snippet_extractor import normalize_query
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_SEARCH_CACHE_PATH = PROJECT_ROOT / "dataset" / "case_law_cache" / "search.sqlite3"
+
+SEARCH_CACHE_PATH_ENV_KEY = "CASE_LAW_SEARCH_CACHE_PATH"
+SEARCH_CACHE_TTL_ENV_KEY = "CASE_LAW_SEARCH_CACHE_TTL_HOURS"
+
+DEFAULT_TTL_HOURS = 24.0
+# Stores between purges of expired entries
+PURGE_EVERY_PUTS = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    query TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    per_page INTEGER NOT NULL,
+    sort_order TEXT NOT NULL,
+    results TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (query, page, per_page, sort_order)
+);
+"""
+
+
+class SearchCache:
+    """TTL cache of parsed search result lists."""
+
+    def __init__(self, path: str | Path, ttl_seconds: float):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "purged": 0}
+        self._puts_since_purge = 0
+        self.purge_expired()
+
+    def get(self, query: str, page: int, per_page: int, order: str) -> Optional[List[Dict[str, Any]]]:
+        key = (normalize_query(query), page, per_page, order)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, created_at FROM searches "
+                "WHERE query = ? AND page = ? AND per_page = ? AND sort_order = ?",
+                key,
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.ttl_seconds:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+        return json.loads(row[0])
+
+    def put(self, query: str, page: int, per_page: int, order: str, results: List[Dict[str, Any]]) -> None:
+        key = (normalize_query(query), page, per_page, order)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches "
+                "(query, page, per_page, sort_order, results, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, json.dumps(results), time.time()),
+            )
+            self._stats["stores"] += 1
+            self._puts_since_purge += 1
+            purge = self._puts_since_purge >= PURGE_EVERY_PUTS
+        if purge:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """Delete expired entries; returns the number removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM searches WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+            self._puts_since_purge = 0
+            self._stats["purged"] += cursor.rowcount
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = self._conn.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[SearchCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Get the shared search cache, or None when caching is disabled."""
+    global _cache
+
+    if not judgment_cache_enabled():
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                ttl_hours = float(os.getenv(SEARCH_CACHE_TTL_ENV_KEY) or DEFAULT_TTL_HOURS)
+                _cache = SearchCache(
+                    path=os.getenv(SEARCH_CACHE_PATH_ENV_KEY) or DEFAULT_SEARCH_CACHE_PATH,
+                    ttl_seconds=ttl_hours * 60 * 60,
+                )
+
+    return _cache
+
+
+def get_search_cache_stats() -> Dict[str, Any]:
+    cache = get_search_cache()
+    return cache.stats() if cache is not None else {}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect the case law search cache")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    subcommands.add_parser("stats", help="Entries and expired entries purged on open")
+    subcommands.add_parser("purge", help="Delete expired entries")
+
+    args = parser.parse_args()
+    if args.command == "purge":
+        cache = get_search_cache()
+        print(f"Purged {cache.purge_expired() if cache is not None else 0} expired searches")
+        return
+
+    stats = get_search_cache_stats()
+    if not stats:
+        print("The case law caches are disabled")
+        return
+    print(f"{stats['entries']} cached searches ({stats['purged']} expired entries purged)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,56 @@
+"""
+Keyword snippet extraction from judgment text, singly or in batches.
+
+Batches (extract_snippets_batch) run on a shared executor chosen with
+``CASE_LAW_SNIPPET_EXECUTOR``:
+
+- "thread" (default): a thread pool, which needs nothing from the caller;
+- "process": a pool of spawned worker processes, for CPU parallelism on an
+  interpreter with a GIL. Each worker re-imports the application, so every
+  entry point that reaches batch extraction must guard its top-level code
+  with ``if __name__ == "__main__":``. Opt in only where that holds.
+
+``CASE_LAW_SNIPPET_WORKERS`` sets the pool size (default: CPU count); 1
+extracts inline.
+"""
+
+import asyncio
+import multiprocessing
+import os
 import re
-from typing import List, Tuple
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from src.tools.keyword_matcher import get_keyword_matcher
+from src.tools.snippet_ranking import rank_windows
+
+# Snippet selection modes for extract_keyword_snippets
+POSITION_RANKING = "position"
+RELEVANCE_RANKING = "relevance"
+
+_WORD_RE = re.compile(r'\S+')
+
+# Word offsets are collected in chunks of this many before being packed
+_OFFSET_CHUNK = 8192
+
+SNIPPET_WORKERS_ENV_KEY = "CASE_LAW_SNIPPET_WORKERS"
+SNIPPET_EXECUTOR_ENV_KEY = "CASE_LAW_SNIPPET_EXECUTOR"
+
+THREAD_EXECUTOR = "thread"
+PROCESS_EXECUTOR = "process"
+
+# Smaller batches are extracted inline: handing work to the pool costs more
+# than it saves
+MIN_PARALLEL_BATCH = 4
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
 
 
 def parse_keywords(keyword_set: str) -> List[str]:
@@ -13,50 +64,63 @@ def parse_keywords(keyword_set: str) -> List[str]:
     Returns:
         List of search terms (phrases and individual words)
     """
-    terms = []
+    phrases, words = _split_keywords(keyword_set)
+    terms = phrases + words
     
+    return [term.strip() for term in terms if term.strip()]
+
+
+def _split_keywords(keyword_set: str) -> Tuple[List[str], List[str]]:
     # Extract phrases in quotes
     phrase_pattern = r'"([^"]+)"'
     phrases = re.findall(phrase_pattern, keyword_set)
-    terms.extend(phrases)
     
     # Remove quoted phrases and get remaining words
     remaining = re.sub(phrase_pattern, '', keyword_set)
     words = remaining.split()
-    terms.extend(words)
     
-    return [term.strip() for term in terms if term.strip()]
+    return phrases, words
 
 
-def find_keyword_positions(text: str, keywords: List[str]) -> List[Tuple[int, int, str]]:
+def normalize_query(keyword_set: str) -> str:
     """
-    Find all positions where keywords appear in text.
+    Canonical form of a keyword set, so queries that differ only in case,
+    spacing or the order of quoted phrases compare equal.
+    Uses the same phrase/word split as parse_keywords.
     
     Args:
-        text: The judgment text to search
-        keywords: List of keyword terms (phrases or words)
+        keyword_set: Search query string (e.g., ' "Environmental  Matters" subsidiary')
     
     Returns:
-        List of tuples (start_pos, end_pos, matched_keyword)
+        Normalized query (e.g., '"environmental matters" subsidiary')
+    """
+    phrases, words = _split_keywords(keyword_set)
+    
+    phrases = sorted({' '.join(phrase.lower().split()) for phrase in phrases})
+    phrases = [f'"{phrase}"' for phrase in phrases if phrase]
+    words = [word.lower() for word in words]
+    
+    return ' '.join(phrases + words)
+
+
+def find_keyword_positions(
+    text: str,
+    keywords: List[str],
+    whole_words: bool = False
+) -> List[Tuple[int, int, str]]:
     """
-    positions = []
-    text_lower = text.lower()
+    Find all positions where keywords appear in text, in a single pass
+    (see keyword_matcher).
     
-    for keyword in keywords:
-        keyword_lower = keyword.lower()
-        start = 0
-        
-        while True:
-            pos = text_lower.find(keyword_lower, start)
-            if pos == -1:
-                break
-            
-            positions.append((pos, pos + len(keyword), keyword))
-            start = pos + 1
+    Args:
+        text: The judgment text to search
+        keywords: List of keyword terms (phrases or words)
+        whole_words: Only match terms that start and end on word boundaries
     
-    # Sort by position
-    positions.sort(key=lambda x: x[0])
-    return positions
+    Returns:
+        List of tuples (start_pos, end_pos, matched_keyword), sorted by position
+    """
+    return get_keyword_matcher(keywords, whole_words).find_all(text)
 
 
 def extract_snippet(text: str, position: int, words_before: int, words_after: int) -> str:
@@ -70,35 +134,20 @@ def extract_snippet(text: str, position: int, words_before: int, words_after: in
         words_after: Number of words to include after the position
     
     Returns:
-        The extracted snippet
+        The extracted snippet, with the original formatting preserved
     """
-    words = text.split()
-    
-    # Find which word index contains the position
-    char_count = 0
-    center_word_idx = 0
+    word_positions = word_offsets(text)
+    if not word_positions:
+        return ""
     
-    for i, word in enumerate(words):
-        char_count += len(word) + 1  # +1 for space
-        if char_count >= position:
-            center_word_idx = i
-            break
+    # Word containing the position
+    center_word_idx = max(0, bisect_right(word_positions, position) - 1)
     
     # Calculate start and end word indices
     start_idx = max(0, center_word_idx - words_before)
-    end_idx = min(len(words), center_word_idx + words_after + 1)
-    
-    # Extract snippet
-    snippet_words = words[start_idx:end_idx]
-    snippet = ' '.join(snippet_words)
-    
-    # Add ellipsis if truncated
-    if start_idx > 0:
-        snippet = '... ' + snippet
-    if end_idx < len(words):
-        snippet = snippet + ' ...'
+    end_idx = min(len(word_positions), center_word_idx + words_after + 1)
     
-    return snippet
+    return "".join(_snippet_pieces(text, word_positions, start_idx, end_idx))
 
 
 def merge_overlapping_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
@@ -129,12 +178,62 @@ def merge_overlapping_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, i
     return merged
 
 
+def word_offsets(text: str) -> Sequence[int]:
+    """
+    Start character offset of each whitespace-separated word in text.
+    
+    Offsets are packed into a machine-integer array (8 bytes per word instead
+    of a list of int objects), which is the largest allocation of an extraction.
+    """
+    offsets = array('q')
+    matches = _WORD_RE.finditer(text)
+    while True:
+        chunk = [match.start() for match in islice(matches, _OFFSET_CHUNK)]
+        if not chunk:
+            return offsets
+        offsets.extend(chunk)
+
+
+class RangeSet:
+    """
+    Non-overlapping half-open (start, end) ranges kept sorted by start, so
+    overlap checks and inserts are a binary search instead of a full scan.
+    """
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+
+    def overlaps(self, start: int, end: int) -> bool:
+        idx = bisect_left(self._starts, start)
+        if idx > 0 and self._ends[idx - 1] > start:
+            return True
+        return idx < len(self._starts) and self._starts[idx] < end
+
+    def add_if_free(self, start: int, end: int) -> bool:
+        """Insert the range unless it overlaps one already held; returns True if added."""
+        if self.overlaps(start, end):
+            return False
+        idx = bisect_left(self._starts, start)
+        self._starts.insert(idx, start)
+        self._ends.insert(idx, end)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self):
+        return iter(zip(self._starts, self._ends))
+
+
 def extract_keyword_snippets(
     judgment_text: str,
     keyword_set: str,
     words_before: int =250,
     words_after: int = 250,
-    max_snippets: int = 10
+    max_snippets: int = 10,
+    whole_words: bool = False,
+    ranking: str = POSITION_RANKING
 ) -> str:
     """
     Extract snippets from judgment text where keywords are present.
@@ -145,91 +244,253 @@ def extract_keyword_snippets(
         words_before: Number of words to include before each keyword match (default: 500)
         words_after: Number of words to include after each keyword match (default: 500)
         max_snippets: Maximum number of snippets to extract (default: 10)
+        whole_words: Only count keyword hits on word boundaries (default: False)
+        ranking: "position" keeps the first windows in document order; "relevance"
+            keeps the best-scoring windows (see snippet_ranking) (default: "position")
     
     Returns:
         Concatenated snippets separated by markers
     """
+    if ranking not in (POSITION_RANKING, RELEVANCE_RANKING):
+        raise ValueError(
+            f"Unsupported snippet ranking '{ranking}'. "
+            f"Supported rankings: {[POSITION_RANKING, RELEVANCE_RANKING]}"
+        )
+    
     keywords = parse_keywords(keyword_set)
 
 
     body = judgment_text
     
-    positions = find_keyword_positions(body, keywords)
+    positions = find_keyword_positions(body, keywords, whole_words)
     
     if not positions:
         return body  # No keywords found, return full text
     
-    words = body.split()
-    total_words = len(words)
-    
-    # Pre-calculate word positions (start character index for each word)
-    word_positions = []
-    char_pos = 0
-    for word in words:
-        word_positions.append(char_pos)
-        char_pos += len(word) + 1  # +1 for space
+    # Start character index of every word, in one pass over the text
+    word_positions = word_offsets(body)
+    total_words = len(word_positions)
+    
+    # Word containing each hit's character position
+    hit_words = [
+        (max(0, bisect_right(word_positions, pos) - 1), keyword)
+        for pos, _, keyword in positions
+    ]
+    
+    if ranking == RELEVANCE_RANKING:
+        candidates = [
+            (start_word_idx, end_word_idx)
+            for _, start_word_idx, end_word_idx in rank_windows(hit_words, total_words, words_before, words_after)
+        ]
+    else:
+        candidates = [
+            (max(0, center_word_idx - words_before), min(total_words, center_word_idx + words_after + 1))
+            for center_word_idx, _ in hit_words
+        ]
+    
+    # Greedily keep candidates that don't overlap an already selected range
+    selected = RangeSet()
+    for start_word_idx, end_word_idx in candidates:
+        if len(selected) >= max_snippets:
+            break
+        selected.add_if_free(start_word_idx, end_word_idx)
     
-    # Select non-overlapping snippet ranges based on word indices
-    selected_word_ranges = []
-    used_word_ranges = []
+    # Snippets are always output in document order
+    selected_word_ranges = list(selected)
     
-    for pos, _, keyword in positions:
-        if len(selected_word_ranges) >= max_snippets:
-            break
-        
-        # Find which word contains this character position
-        center_word_idx = 0
-        for i, word_start in enumerate(word_positions):
-            if word_start > pos:
-                center_word_idx = max(0, i - 1)
-                break
-            center_word_idx = i
-        
-        # Calculate word range for this snippet
-        start_word_idx = max(0, center_word_idx - words_before)
-        end_word_idx = min(total_words, center_word_idx + words_after + 1)
-        
-        # Check if this overlaps with any already selected range
-        overlaps = False
-        for used_start, used_end in used_word_ranges:
-            # Check for overlap
-            if start_word_idx < used_end and end_word_idx > used_start:
-                overlaps = True
-                break
-        
-        # Only add if it doesn't overlap
-        if not overlaps:
-            selected_word_ranges.append((start_word_idx, end_word_idx))
-            used_word_ranges.append((start_word_idx, end_word_idx))
-    
-    # Extract snippets using word ranges, preserving original text structure
-    snippets = []
-    for i, (start_word_idx, end_word_idx) in enumerate(selected_word_ranges, 1):
-        # Get character positions for the word range
-        start_char = word_positions[start_word_idx]
-        if end_word_idx < total_words:
-            # End at the start of the next word
-            end_char = word_positions[end_word_idx]
-        else:
-            # End at the end of text
-            end_char = len(body)
-        
-        # Extract text using character positions to preserve formatting
-        snippet = body[start_char:end_char].strip()
-        
-        # Add ellipsis if truncated
-        if start_word_idx > 0:
-            snippet = '... ' + snippet
-        if end_word_idx < total_words:
-            snippet = snippet + ' ...'
-        
-        snippets.append(f"[SNIPPET {i}]\n{snippet}")
+    snippets = format_snippets(body, word_positions, selected_word_ranges)
     
     # Return concatenated snippets
     if not snippets:
         return body  # Return full text if no snippets extracted
     
-    result = "\n\n".join(snippets)
+    return snippets
+
+
+def word_range_span(body: str, word_positions: Sequence[int], start_word_idx: int, end_word_idx: int) -> Tuple[int, int]:
+    """Character span (start, end) of words [start_word_idx, end_word_idx) in body."""
+    start_char = word_positions[start_word_idx]
+    if end_word_idx < len(word_positions):
+        # End at the start of the next word
+        end_char = word_positions[end_word_idx]
+    else:
+        # End at the end of text
+        end_char = len(body)
+    
+    # Drop the whitespace before the next word without copying it
+    while end_char > start_char and body[end_char - 1].isspace():
+        end_char -= 1
+    return start_char, end_char
+
+
+def word_range_text(body: str, word_positions: Sequence[int], start_word_idx: int, end_word_idx: int) -> str:
+    """Text of words [start_word_idx, end_word_idx), preserving the original formatting."""
+    start_char, end_char = word_range_span(body, word_positions, start_word_idx, end_word_idx)
+    return body[start_char:end_char]
+
+
+def _snippet_pieces(body: str, word_positions: Sequence[int], start_word_idx: int, end_word_idx: int) -> List[str]:
+    # Ellipses mark text cut before or after the snippet
+    start_char, end_char = word_range_span(body, word_positions, start_word_idx, end_word_idx)
+    pieces = ['... '] if start_word_idx > 0 else []
+    pieces.append(body[start_char:end_char])
+    if end_word_idx < len(word_positions):
+        pieces.append(' ...')
+    return pieces
+
+
+def format_snippets(body: str, word_positions: Sequence[int], word_ranges: Sequence[Tuple[int, int]]) -> str:
+    """
+    Render word ranges as numbered [SNIPPET i] blocks, with ellipses where text was cut.
+    
+    Snippets are assembled from spans of body and joined once, so each
+    snippet's text is copied only into the final output.
+    """
+    pieces: List[str] = []
+    for i, (start_word_idx, end_word_idx) in enumerate(word_ranges, 1):
+        if i > 1:
+            pieces.append("\n\n")
+        pieces.append(f"[SNIPPET {i}]\n")
+        pieces.extend(_snippet_pieces(body, word_positions, start_word_idx, end_word_idx))
+    
+    return "".join(pieces)
+
+
+# ----------------------------------------------------------------------------
+# Batch extraction
+# ----------------------------------------------------------------------------
+
+def free_threaded() -> bool:
+    """True on a free-threaded interpreter running without the GIL."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def snippet_workers() -> int:
+    """Worker count for batch extraction (``CASE_LAW_SNIPPET_WORKERS``, default: CPU count)."""
+    value = os.getenv(SNIPPET_WORKERS_ENV_KEY)
+    return max(1, int(value) if value else (os.cpu_count() or 1))
+
+
+def snippet_executor_kind() -> str:
+    """Executor for batch extraction (``CASE_LAW_SNIPPET_EXECUTOR``): "thread" (default) or "process"."""
+    kind = (os.getenv(SNIPPET_EXECUTOR_ENV_KEY) or THREAD_EXECUTOR).lower()
+    if kind not in (THREAD_EXECUTOR, PROCESS_EXECUTOR):
+        raise ValueError(
+            f"Unsupported snippet executor '{kind}'. Supported executors: {[THREAD_EXECUTOR, PROCESS_EXECUTOR]}"
+        )
+    return kind
+
+
+def get_snippet_executor() -> Optional[Executor]:
+    """
+    Shared executor for batch extraction, created on first use.
+    
+    A thread pool unless the process pool was opted into (see the module
+    docstring); a free-threaded interpreter always gets threads, which give
+    the same parallelism without pickling. Returns None when only one worker
+    is configured.
+    """
+    global _executor
+    
+    if _executor is None and snippet_workers() > 1:
+        with _executor_lock:
+            if _executor is None:
+                if free_threaded() or snippet_executor_kind() == THREAD_EXECUTOR:
+                    _executor = ThreadPoolExecutor(snippet_workers(), thread_name_prefix="snippets")
+                else:
+                    # Workers are spawned rather than forked: the parent runs
+                    # event loops and HTTP client threads
+                    _executor = ProcessPoolExecutor(
+                        snippet_workers(), mp_context=multiprocessing.get_context("spawn")
+                    )
+    
+    return _executor
+
+
+def shutdown_snippet_executor() -> None:
+    """Stop the shared executor; the next batch creates a new one."""
+    global _executor
+    
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+def _discard_broken_executor(pool: Executor, error: BaseException) -> None:
+    # A worker died (or could not start); extract inline and let the next
+    # batch start a fresh pool. Executors passed in by the caller are theirs
+    # to shut down.
+    global _executor
+    
+    print(f"[snippet_extractor] Snippet workers failed ({error!r}), extracting inline")
+    with _executor_lock:
+        if _executor is not pool:
+            return
+        _executor = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_item(extractor: Callable[..., str], options: dict, item: Tuple[Any, str]) -> str:
+    document, keyword_set = item
+    return extractor(document, keyword_set, **options)
+
+
+def _batch_executor(items: Sequence, executor: Optional[Executor]) -> Optional[Executor]:
+    if executor is not None:
+        return executor
+    if len(items) < MIN_PARALLEL_BATCH:
+        return None
+    return get_snippet_executor()
+
+
+def extract_snippets_batch(
+    items: Sequence[Tuple[Any, str]],
+    extractor: Callable[..., str] = extract_keyword_snippets,
+    executor: Optional[Executor] = None,
+    **options
+) -> List[str]:
+    """
+    Extract snippets from many judgments in parallel.
+    
+    Args:
+        items: (judgment, keyword_set) pairs; the judgment is whatever the
+            extractor takes (judgment text for extract_keyword_snippets)
+        extractor: Module-level function called as extractor(judgment, keyword_set, **options)
+            (default: extract_keyword_snippets)
+        executor: Executor to use (default: the shared one from get_snippet_executor)
+        **options: Keyword arguments for the extractor (e.g. words_before=500)
     
-    return result
+    Returns:
+        One result per item, in input order
+    """
+    run = partial(_extract_item, extractor, options)
+    pool = _batch_executor(items, executor)
+    if pool is not None:
+        try:
+            return list(pool.map(run, items))
+        except BrokenExecutor as e:
+            _discard_broken_executor(pool, e)
+    return [run(item) for item in items]
+
 
+async def aextract_snippets_batch(
+    items: Sequence[Tuple[Any, str]],
+    extractor: Callable[..., str] = extract_keyword_snippets,
+    executor: Optional[Executor] = None,
+    **options
+) -> List[str]:
+    """
+    Async version of extract_snippets_batch; the event loop stays free while
+    the batch runs (small batches run on a worker thread).
+    """
+    run = partial(_extract_item, extractor, options)
+    pool = _batch_executor(items, executor)
+    if pool is not None:
+        loop = asyncio.get_running_loop()
+        try:
+            return list(await asyncio.gather(*[loop.run_in_executor(pool, run, item) for item in items]))
+        except BrokenExecutor as e:
+            _discard_broken_executor(pool, e)
+    return await asyncio.to_thread(lambda: [run(item) for item in items])
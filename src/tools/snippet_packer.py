@@ -0,0 +1,191 @@
+"""
+Token-budgeted snippet packing.
+
+``pack_snippets`` fills a per-case token budget with the most relevant
+keyword windows of a judgment (ranked as in snippet_ranking). Windows that
+overlap or nearly touch an already chosen passage are merged into it, so
+only the new words are paid for and the LLM sees one continuous passage
+instead of fragments. A window that does not fit the remaining budget is
+trimmed symmetrically until it does. A judgment without keyword hits packs
+to an empty string; there is no full-text fallback.
+
+Token counting is pluggable: pass any ``Callable[[str], int]`` or pick one
+by name with ``get_tokenizer``. ``CASE_LAW_TOKENIZER`` selects the default:
+
+- ``approx`` (default): about four characters per token, no dependencies;
+- ``tiktoken``: exact counts for OpenAI models when tiktoken and its
+  encoding files are available (falls back to ``approx`` otherwise).
+"""
+
+from __future__ import annotations
+
+import os
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from src.tools.snippet_extractor import (
+    find_keyword_positions,
+    format_snippets,
+    parse_keywords,
+    word_offsets,
+    word_range_text,
+)
+from src.tools.snippet_ranking import rank_windows
+
+TokenCounter = Callable[[str], int]
+
+TOKENIZER_ENV_KEY = "CASE_LAW_TOKENIZER"
+SNIPPET_TOKEN_BUDGET_ENV_KEY = "CASE_LAW_SNIPPET_TOKEN_BUDGET"
+
+DEFAULT_SNIPPET_TOKEN_BUDGET = 6000
+TIKTOKEN_ENCODING = "o200k_base"
+
+# Gaps of at most this many words between passages are bridged
+MERGE_GAP_WORDS = 10
+# Trimmed windows shorter than this are not worth including
+MIN_WINDOW_WORDS = 20
+# Cost of the "[SNIPPET i]" marker and ellipses around each passage
+SNIPPET_MARKER = "[SNIPPET 10]\n... ...\n\n"
+
+
+def approx_token_count(text: str) -> int:
+    """Rough token count for English prose: about four characters per token."""
+    return (len(text) + 3) // 4
+
+
+@lru_cache(maxsize=None)
+def _tiktoken_counter(encoding_name: str) -> Optional[TokenCounter]:
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding(encoding_name)
+    except Exception as e:  # not installed, or encoding files unavailable offline
+        print(f"[snippet_packer] tiktoken unavailable ({e}), using approximate token counts")
+        return None
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def get_tokenizer(name: Optional[str] = None) -> TokenCounter:
+    """Token counter by name ("approx" or "tiktoken"); defaults to ``CASE_LAW_TOKENIZER``."""
+    name = (name or os.getenv(TOKENIZER_ENV_KEY) or "approx").lower()
+    if name == "approx":
+        return approx_token_count
+    if name == "tiktoken":
+        return _tiktoken_counter(TIKTOKEN_ENCODING) or approx_token_count
+    raise ValueError(f"Unsupported tokenizer '{name}'. Supported tokenizers: ['approx', 'tiktoken']")
+
+
+def default_snippet_token_budget() -> int:
+    return int(os.getenv(SNIPPET_TOKEN_BUDGET_ENV_KEY) or DEFAULT_SNIPPET_TOKEN_BUDGET)
+
+
+# A planned addition: merged range, index span of absorbed ranges, its cost
+# in tokens and the extra tokens it adds to the packing.
+Plan = Tuple[Tuple[int, int], int, int, int, int]
+
+
+class _Packing:
+    """Chosen passages as sorted, disjoint word ranges with their token costs."""
+
+    def __init__(self, body: str, word_positions: Sequence[int], count_tokens: TokenCounter):
+        self.body = body
+        self.word_positions = word_positions
+        self.count_tokens = count_tokens
+        self.marker_tokens = count_tokens(SNIPPET_MARKER)
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.costs: List[int] = []
+        self.used = 0
+
+    @property
+    def ranges(self) -> List[Tuple[int, int]]:
+        return list(zip(self.starts, self.ends))
+
+    def plan(self, start: int, end: int) -> Optional[Plan]:
+        """How adding [start, end) would change the packing; None if already covered."""
+        # Chosen ranges overlapping or within MERGE_GAP_WORDS of the window
+        lo = bisect_left(self.ends, start - MERGE_GAP_WORDS)
+        hi = bisect_right(self.starts, end + MERGE_GAP_WORDS)
+        if hi - lo == 1 and self.starts[lo] <= start and end <= self.ends[lo]:
+            return None
+
+        merged = (min([start, *self.starts[lo:hi]]), max([end, *self.ends[lo:hi]]))
+        text = word_range_text(self.body, self.word_positions, *merged)
+        cost = self.count_tokens(text) + self.marker_tokens
+        return merged, lo, hi, cost, cost - sum(self.costs[lo:hi])
+
+    def apply(self, plan: Plan) -> None:
+        (start, end), lo, hi, cost, delta = plan
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+        self.costs[lo:hi] = [cost]
+        self.used += delta
+
+
+def pack_snippets(
+    judgment_text: str,
+    keyword_set: str,
+    token_budget: int,
+    tokenizer: Optional[TokenCounter] = None,
+    words_before: int = 150,
+    words_after: int = 150,
+    whole_words: bool = False,
+) -> str:
+    """
+    Fill ``token_budget`` tokens with the most relevant passages of a judgment.
+
+    Args:
+        judgment_text: The full judgment text
+        keyword_set: The search query with keywords (e.g., '"environmental matters" subsidiary')
+        token_budget: Maximum tokens of snippet text (including markers) for this case
+        tokenizer: Token counter (default: ``get_tokenizer()``)
+        words_before: Words of context before each keyword hit (default: 150)
+        words_after: Words of context after each keyword hit (default: 150)
+        whole_words: Only count keyword hits on word boundaries (default: False)
+
+    Returns:
+        [SNIPPET i] blocks in document order, or "" if no keyword occurs
+    """
+    count_tokens = tokenizer or get_tokenizer()
+    positions = find_keyword_positions(judgment_text, parse_keywords(keyword_set), whole_words)
+    if not positions or token_budget <= 0:
+        return ""
+
+    word_positions = word_offsets(judgment_text)
+    total_words = len(word_positions)
+    hit_words = [
+        (max(0, bisect_right(word_positions, pos) - 1), keyword)
+        for pos, _, keyword in positions
+    ]
+
+    packing = _Packing(judgment_text, word_positions, count_tokens)
+
+    for _, start, end in rank_windows(hit_words, total_words, words_before, words_after):
+        if token_budget - packing.used <= packing.marker_tokens:
+            break
+
+        plan = packing.plan(start, end)
+        if plan is None:
+            continue
+        if packing.used + plan[4] > token_budget:
+            plan = _trim_to_fit(packing, start, end, token_budget)
+            if plan is None:
+                continue
+        packing.apply(plan)
+
+    return format_snippets(judgment_text, word_positions, packing.ranges)
+
+
+def _trim_to_fit(packing: _Packing, start: int, end: int, token_budget: int) -> Optional[Plan]:
+    """Smallest symmetric trim of [start, end) that fits the remaining budget, if any."""
+    best = None
+    lo, hi = 0, (end - start - MIN_WINDOW_WORDS) // 2
+    while lo <= hi:
+        trim = (lo + hi) // 2
+        plan = packing.plan(start + trim, end - trim)
+        if plan is not None and packing.used + plan[4] <= token_budget:
+            best, hi = plan, trim - 1
+        else:
+            lo = trim + 1
+    return best
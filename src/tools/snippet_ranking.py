@@ -0,0 +1,103 @@
+"""
+Relevance scoring of candidate snippet windows.
+
+Every keyword hit proposes a window of ``words_before``/``words_after``
+words around it. ``rank_windows`` scores those windows BM25-style:
+
+- each term is weighted by its inverse "document" frequency, where the
+  documents are consecutive window-sized blocks of the judgment, so a term
+  used on every page (a party name) counts less than one concentrated in a
+  few passages;
+- quoted phrases get an extra boost over single words;
+- term frequency in the window saturates (k1) and is normalised by window
+  length (b), which makes the score a measure of keyword density;
+- windows covering more of the distinct query terms get a diversity bonus.
+
+Windows are scored in one sweep over the sorted hits with two pointers, so
+ranking costs O(hits x distinct terms).
+"""
+
+from __future__ import annotations
+
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+K1 = 1.2
+B = 0.75
+PHRASE_BOOST = 1.5
+DIVERSITY_WEIGHT = 0.5
+
+# (score, start_word, end_word) with end exclusive
+ScoredWindow = Tuple[float, int, int]
+
+
+def term_weights(hits: Sequence[Tuple[int, str]], total_words: int, block_words: int) -> Dict[str, float]:
+    """BM25 IDF of each term over window-sized blocks, boosted for phrases."""
+    n_blocks = max(1, math.ceil(total_words / block_words))
+    blocks_with_term: Dict[str, set] = defaultdict(set)
+    for word_idx, term in hits:
+        blocks_with_term[term].add(word_idx // block_words)
+
+    weights = {}
+    for term, blocks in blocks_with_term.items():
+        idf = math.log(1 + (n_blocks - len(blocks) + 0.5) / (len(blocks) + 0.5))
+        weights[term] = idf * (PHRASE_BOOST if " " in term.strip() else 1.0)
+    return weights
+
+
+def rank_windows(
+    hits: Sequence[Tuple[int, str]],
+    total_words: int,
+    words_before: int,
+    words_after: int,
+) -> List[ScoredWindow]:
+    """
+    Score the window around each distinct hit position.
+
+    Args:
+        hits: (word_index, term) pairs sorted by word index
+        total_words: Number of words in the judgment
+        words_before: Words included before the hit
+        words_after: Words included after the hit
+
+    Returns:
+        Scored windows, best first (earlier windows win ties)
+    """
+    if not hits:
+        return []
+
+    block_words = words_before + words_after + 1
+    weights = term_weights(hits, total_words, block_words)
+    n_terms = len(weights)
+
+    scored: List[ScoredWindow] = []
+    counts: Counter = Counter()
+    lo = hi = 0
+    previous_center = None
+
+    for center, _ in hits:
+        if center == previous_center:
+            continue
+        previous_center = center
+
+        start = max(0, center - words_before)
+        end = min(total_words, center + words_after + 1)
+
+        while hi < len(hits) and hits[hi][0] < end:
+            counts[hits[hi][1]] += 1
+            hi += 1
+        while hits[lo][0] < start:
+            term = hits[lo][1]
+            counts[term] -= 1
+            if not counts[term]:
+                del counts[term]
+            lo += 1
+
+        norm = K1 * (1 - B + B * (end - start) / block_words)
+        score = sum(weights[term] * tf * (K1 + 1) / (tf + norm) for term, tf in counts.items())
+        score *= 1 + DIVERSITY_WEIGHT * len(counts) / n_terms
+        scored.append((score, start, end))
+
+    scored.sort(key=lambda window: (-window[0], window[1]))
+    return scored
@@ -0,0 +1,311 @@
+"""
+Persistent cache of LLM responses for the local prompt registry.
+
+Re-running a workflow on an unchanged case repeats every LLM call with the
+same rendered prompt. With the cache enabled, ``get_prompt(name,
+include_model=True)`` pipes the prompt through ``cached_model`` instead of
+straight into the model, and each response is stored in SQLite under
+
+- the prompt name,
+- a hash of the prompt template (so editing a prompt invalidates its entries),
+- the model name and temperature,
+- a hash of the rendered messages.
+
+A replay or partial rerun then answers every repeated call from disk. The
+least recently used entries are evicted once the stored responses exceed
+the size cap. Hits, misses and stores are counted per prompt.
+
+Configuration (environment variables):
+
+- ``LLM_CACHE_ENABLED``: set to ``1`` to cache responses (default: off)
+- ``LLM_CACHE_PATH``: SQLite file (default: ``dataset/llm_cache/responses.sqlite3``)
+- ``LLM_CACHE_MAX_MB``: total response size cap (default: 256)
+
+    python -m src.utils.llm_cache stats
+    python -m src.utils.llm_cache clear [--prompt NAME]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from langchain_core.prompt_values import PromptValue
+from langchain_core.prompts import BasePromptTemplate
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_LLM_CACHE_PATH = PROJECT_ROOT / "dataset" / "llm_cache" / "responses.sqlite3"
+
+LLM_CACHE_ENABLED_ENV_KEY = "LLM_CACHE_ENABLED"
+LLM_CACHE_PATH_ENV_KEY = "LLM_CACHE_PATH"
+LLM_CACHE_MAX_MB_ENV_KEY = "LLM_CACHE_MAX_MB"
+
+DEFAULT_MAX_MB = 256.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    prompt TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    model TEXT NOT NULL,
+    messages_hash TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (prompt, prompt_version, model, messages_hash)
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+CREATE TABLE IF NOT EXISTS prompt_stats (
+    prompt TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (prompt, name)
+);
+"""
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def prompt_version(prompt: BasePromptTemplate) -> str:
+    """Hash of a prompt template's messages and variables."""
+    return _sha256(prompt.pretty_repr())[:16]
+
+
+def model_id(model: Any) -> str:
+    """Model name and temperature, e.g. "gpt-4o-mini@0"."""
+    name = getattr(model, "model_name", None) or getattr(model, "model", None) or type(model).__name__
+    return f"{name}@{getattr(model, 'temperature', None)}"
+
+
+def messages_hash(prompt_value: PromptValue) -> str:
+    """Hash of the rendered messages sent to the model."""
+    return _sha256(json.dumps(messages_to_dict(prompt_value.to_messages()), sort_keys=True, default=str))
+
+
+class LLMCache:
+    """Size-capped LRU store of model responses with per-prompt statistics."""
+
+    def __init__(self, path: str | Path, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._session: Dict[str, Dict[str, int]] = {}
+
+    def get(self, prompt: str, version: str, model: str, digest: str) -> Optional[BaseMessage]:
+        """The cached response, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses "
+                "WHERE prompt = ? AND prompt_version = ? AND model = ? AND messages_hash = ?",
+                (prompt, version, model, digest),
+            ).fetchone()
+            if row is None:
+                self._bump(prompt, "misses")
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? "
+                "WHERE prompt = ? AND prompt_version = ? AND model = ? AND messages_hash = ?",
+                (time.time(), prompt, version, model, digest),
+            )
+            self._bump(prompt, "hits")
+        return messages_from_dict([json.loads(row[0])])[0]
+
+    def put(self, prompt: str, version: str, model: str, digest: str, response: BaseMessage) -> None:
+        """Store a response and enforce the size cap."""
+        data = json.dumps(messages_to_dict([response])[0], default=str)
+        size = len(data.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(prompt, prompt_version, model, messages_hash, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (prompt, version, model, digest, data, size, now, now),
+            )
+            self._bump(prompt, "stores")
+            self._evict()
+
+    def clear(self, prompt: Optional[str] = None) -> int:
+        """Delete all entries, or those of one prompt; returns the number removed."""
+        with self._lock:
+            if prompt is None:
+                return self._conn.execute("DELETE FROM responses").rowcount
+            return self._conn.execute("DELETE FROM responses WHERE prompt = ?", (prompt,)).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss counters per prompt for this process (``session``) and across
+        all runs (``lifetime``), plus current entry count and size.
+        """
+        with self._lock:
+            lifetime: Dict[str, Dict[str, int]] = {}
+            for prompt, name, value in self._conn.execute("SELECT prompt, name, value FROM prompt_stats"):
+                lifetime.setdefault(prompt, {})[name] = value
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            session = {prompt: dict(counters) for prompt, counters in self._session.items()}
+
+        def _with_ratios(per_prompt: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+            for counters in per_prompt.values():
+                lookups = counters.get("hits", 0) + counters.get("misses", 0)
+                counters["hit_ratio"] = counters.get("hits", 0) / lookups if lookups else 0.0
+            return per_prompt
+
+        return {
+            "session": _with_ratios(session),
+            "lifetime": _with_ratios(lifetime),
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Internal helpers (callers hold self._lock)
+    # ------------------------------------------------------------------
+    def _bump(self, prompt: str, name: str, amount: int = 1) -> None:
+        counters = self._session.setdefault(prompt, {})
+        counters[name] = counters.get(name, 0) + amount
+        self._conn.execute(
+            "INSERT INTO prompt_stats (prompt, name, value) VALUES (?, ?, ?) "
+            "ON CONFLICT(prompt, name) DO UPDATE SET value = value + excluded.value",
+            (prompt, name, amount),
+        )
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for rowid, prompt, size in self._conn.execute(
+            "SELECT rowid, prompt, size FROM responses ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE rowid = ?", (rowid,))
+            total -= size
+            self._bump(prompt, "evictions")
+
+
+def cached_model(
+    cache: LLMCache,
+    name: str,
+    prompt: BasePromptTemplate,
+    model: Runnable,
+    model_key: Optional[str] = None,
+) -> Runnable:
+    """
+    ``model`` answering from ``cache`` when the same rendered prompt was sent before.
+
+    Args:
+        cache: The response cache
+        name: Registry name of the prompt, used as the cache namespace
+        prompt: The prompt template the model is piped after (for its version hash)
+        model: The chat model, or a runnable wrapping it
+        model_key: The model's identity in cache keys (default: ``model_id(model)``,
+            which needs the chat model itself)
+
+    Returns:
+        A runnable to use in place of ``model`` after ``prompt``
+    """
+    version = prompt_version(prompt)
+    model_key = model_key or model_id(model)
+
+    def invoke(prompt_value: PromptValue, config: RunnableConfig) -> BaseMessage:
+        digest = messages_hash(prompt_value)
+        response = cache.get(name, version, model_key, digest)
+        if response is None:
+            response = model.invoke(prompt_value, config)
+            cache.put(name, version, model_key, digest, response)
+        return response
+
+    async def ainvoke(prompt_value: PromptValue, config: RunnableConfig) -> BaseMessage:
+        digest = messages_hash(prompt_value)
+        response = await asyncio.to_thread(cache.get, name, version, model_key, digest)
+        if response is None:
+            response = await model.ainvoke(prompt_value, config)
+            await asyncio.to_thread(cache.put, name, version, model_key, digest, response)
+        return response
+
+    return RunnableLambda(invoke, afunc=ainvoke, name=f"cached_{model_key}")
+
+
+def llm_cache_enabled() -> bool:
+    return os.getenv(LLM_CACHE_ENABLED_ENV_KEY, "0").lower() in ("1", "true", "yes")
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Get the shared LLM response cache, or None unless ``LLM_CACHE_ENABLED`` is set."""
+    global _cache
+
+    if not llm_cache_enabled():
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                max_mb = float(os.getenv(LLM_CACHE_MAX_MB_ENV_KEY) or DEFAULT_MAX_MB)
+                _cache = LLMCache(
+                    path=os.getenv(LLM_CACHE_PATH_ENV_KEY) or DEFAULT_LLM_CACHE_PATH,
+                    max_bytes=int(max_mb * 1024 * 1024),
+                )
+
+    return _cache
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    cache = get_llm_cache()
+    return cache.stats() if cache is not None else {}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect the LLM response cache")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    subcommands.add_parser("stats", help="Entries, size and per-prompt hit ratios")
+    clear = subcommands.add_parser("clear", help="Delete cached responses")
+    clear.add_argument("--prompt", help="Only delete the responses of this prompt")
+
+    args = parser.parse_args()
+    max_mb = float(os.getenv(LLM_CACHE_MAX_MB_ENV_KEY) or DEFAULT_MAX_MB)
+    cache = LLMCache(os.getenv(LLM_CACHE_PATH_ENV_KEY) or DEFAULT_LLM_CACHE_PATH, int(max_mb * 1024 * 1024))
+
+    if args.command == "clear":
+        print(f"Deleted {cache.clear(args.prompt)} cached responses")
+        return
+
+    stats = cache.stats()
+    print(f"{stats['entries']} responses, {stats['size_bytes'] / 1e6:.2f} MB in {cache.path}")
+    for prompt, counters in sorted(stats["lifetime"].items()):
+        print(
+            f"{prompt:<40} hits {counters.get('hits', 0):>6}  misses {counters.get('misses', 0):>6}  "
+            f"hit ratio {counters['hit_ratio']:.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
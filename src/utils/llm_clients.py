@@ -0,0 +1,179 @@
+"""
+Shared chat model clients.
+
+``get_chat_model`` keeps one ``ChatOpenAI`` per (model, temperature, timeout,
+max_retries), so callers asking for different settings get their own client
+instead of silently sharing whichever was created first. Every one of them
+sends its requests through the same pooled HTTP clients, so hundreds of
+concurrent ``abatch`` calls across prompts and models share keep-alive
+connections instead of each client opening its own pool. HTTP/2 multiplexes
+them over a few sockets when the optional ``h2`` package is installed.
+
+Sync requests share one pool. Async connections are bound to the event loop
+that opened them, so async requests share one pool per running loop (as in
+``src.tools.http_client``); a second ``asyncio.run`` gets a fresh pool
+instead of reusing connections from a closed loop.
+
+Pool sizing is configurable through environment variables:
+
+- ``LLM_HTTP_MAX_CONNECTIONS``: total pooled connections (default: 100)
+- ``LLM_HTTP_MAX_KEEPALIVE``: idle keep-alive connections (default: 20)
+- ``LLM_HTTP_KEEPALIVE_EXPIRY``: seconds an idle connection lives (default: 30)
+- ``LLM_HTTP2``: set to ``0`` to force HTTP/1.1
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import openai
+from langchain_openai import ChatOpenAI
+
+MAX_CONNECTIONS_ENV_KEY = "LLM_HTTP_MAX_CONNECTIONS"
+MAX_KEEPALIVE_ENV_KEY = "LLM_HTTP_MAX_KEEPALIVE"
+KEEPALIVE_EXPIRY_ENV_KEY = "LLM_HTTP_KEEPALIVE_EXPIRY"
+HTTP2_ENV_KEY = "LLM_HTTP2"
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+# (model, temperature, timeout, max_retries); None means the library default
+ModelKey = Tuple[str, Optional[float], Optional[float], Optional[int]]
+
+_models: Dict[ModelKey, ChatOpenAI] = {}
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional["LoopBoundAsyncClient"] = None
+_lock = threading.Lock()
+
+
+def get_llm_pool_limits() -> httpx.Limits:
+    """Build connection pool limits for LLM traffic from the environment."""
+    return httpx.Limits(
+        max_connections=int(os.getenv(MAX_CONNECTIONS_ENV_KEY) or DEFAULT_MAX_CONNECTIONS),
+        max_keepalive_connections=int(os.getenv(MAX_KEEPALIVE_ENV_KEY) or DEFAULT_MAX_KEEPALIVE),
+        keepalive_expiry=float(os.getenv(KEEPALIVE_EXPIRY_ENV_KEY) or DEFAULT_KEEPALIVE_EXPIRY),
+    )
+
+
+def llm_http2_enabled() -> bool:
+    """HTTP/2 is used when not disabled by env and the ``h2`` package is importable."""
+    if os.getenv(HTTP2_ENV_KEY, "1").lower() in ("0", "false", "no"):
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+class LoopBoundAsyncClient(openai.DefaultAsyncHttpxClient):
+    """
+    The async client given to every ChatOpenAI. It sends each request through
+    a pooled client owned by the running event loop, created on first use and
+    dropped with the loop.
+    """
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._pool_options = kwargs
+        self._loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def for_running_loop(self) -> httpx.AsyncClient:
+        """The pooled client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._loop_clients.get(loop)
+
+        if client is None or client.is_closed:
+            client = openai.DefaultAsyncHttpxClient(**self._pool_options)
+            self._loop_clients[loop] = client
+
+        return client
+
+    async def send(self, request, **kwargs: Any):
+        # Requests arrive fully built (timeouts included); send them as-is
+        return await self.for_running_loop().send(request, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the running loop's pool; pools of other loops go with their loops."""
+        client = self._loop_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+        await super().aclose()
+
+
+def _shared_http_clients() -> Tuple[httpx.Client, LoopBoundAsyncClient]:
+    # Callers hold _lock. The OpenAI defaults (timeouts, redirects) are kept;
+    # per-request timeouts still come from each ChatOpenAI.
+    global _http_client, _async_http_client
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = openai.DefaultHttpxClient(limits=get_llm_pool_limits(), http2=llm_http2_enabled())
+    if _async_http_client is None or _async_http_client.is_closed:
+        _async_http_client = LoopBoundAsyncClient(limits=get_llm_pool_limits(), http2=llm_http2_enabled())
+    return _http_client, _async_http_client
+
+
+def get_chat_model(
+    model: str,
+    temperature: Optional[float] = 0,
+    timeout: Optional[float] = None,
+    max_retries: Optional[int] = None,
+) -> ChatOpenAI:
+    """
+    Get the shared ChatOpenAI client for a model and its settings.
+
+    Args:
+        model: Model name (e.g., "gpt-4o-mini")
+        temperature: Sampling temperature, or None for the model's default
+            (reasoning models only accept their default)
+        timeout: Request timeout in seconds (default: the OpenAI client's)
+        max_retries: Retries on failed requests (default: the OpenAI client's)
+
+    Returns:
+        A ChatOpenAI instance, created on first use and reused afterwards
+    """
+    key: ModelKey = (model, temperature, timeout, max_retries)
+
+    client = _models.get(key)
+    if client is None:
+        with _lock:
+            client = _models.get(key)
+            if client is None:
+                http_client, http_async_client = _shared_http_clients()
+                options = {} if max_retries is None else {"max_retries": max_retries}
+                client = ChatOpenAI(
+                    model=model,
+                    temperature=temperature,
+                    timeout=timeout,
+                    http_client=http_client,
+                    http_async_client=http_async_client,
+                    **options,
+                )
+                _models[key] = client
+
+    return client
+
+
+async def aclose_llm_clients() -> None:
+    """
+    Drop every cached model and close the shared pools (the async one of the
+    running loop); the next call to ``get_chat_model`` recreates them.
+    """
+    global _http_client, _async_http_client
+
+    with _lock:
+        clients = (_http_client, _async_http_client)
+        _models.clear()
+        _http_client = None
+        _async_http_client = None
+
+    http_client, async_http_client = clients
+    if http_client is not None:
+        http_client.close()
+    if async_http_client is not None:
+        await async_http_client.aclose()
@@ -0,0 +1,440 @@
+"""
+Process-wide admission control for LLM requests.
+
+Every model call made through ``get_prompt(name, include_model=True)`` passes
+through one shared ``LLMGovernor`` first, whichever workflow, thread or event
+loop it comes from. The governor keeps the process inside the provider's
+budgets instead of firing every ``abatch`` payload of every issue at once:
+
+- requests per minute and tokens per minute, over a sliding 60 second
+  window (tokens are estimated from the rendered prompt plus an allowance
+  for the completion, then corrected from the reported usage);
+- a cap on requests in flight.
+
+Callers queue by priority, then arrival. Only the head of the queue waits
+for budget, so a high priority call (the final judgement) overtakes every
+queued normal call instead of waiting behind a batch of micro verdicts.
+
+A 429 answer pauses admissions for ``Retry-After`` (or a jittered
+exponential backoff) and halves the budgets; each successful call then
+restores 5% of them, so a process that keeps hitting the provider's limit
+settles just under it. The rate limited call is retried up to
+``LLM_MAX_RATE_LIMIT_RETRIES`` times.
+
+Governed models are built with the OpenAI client's own retries off, so
+every attempt is admitted and counted here. Connection errors, timeouts
+and 5xx answers are retried with a jittered exponential backoff, without
+touching the budgets.
+
+Configuration (environment variables; 0 disables a limit):
+
+- ``LLM_REQUESTS_PER_MINUTE``: request budget (default: 500)
+- ``LLM_TOKENS_PER_MINUTE``: token budget (default: 200000)
+- ``LLM_MAX_CONCURRENCY``: requests in flight (default: 32)
+- ``LLM_MAX_RATE_LIMIT_RETRIES``: retries after a 429 (default: 3)
+- ``LLM_MAX_ERROR_RETRIES``: retries after a connection error, timeout or 5xx (default: 2)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import openai
+from langchain_core.messages import BaseMessage, get_buffer_string
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+from src.tools.rate_limit import parse_retry_after
+from src.tools.snippet_packer import approx_token_count
+
+REQUESTS_PER_MINUTE_ENV_KEY = "LLM_REQUESTS_PER_MINUTE"
+TOKENS_PER_MINUTE_ENV_KEY = "LLM_TOKENS_PER_MINUTE"
+MAX_CONCURRENCY_ENV_KEY = "LLM_MAX_CONCURRENCY"
+MAX_RATE_LIMIT_RETRIES_ENV_KEY = "LLM_MAX_RATE_LIMIT_RETRIES"
+MAX_ERROR_RETRIES_ENV_KEY = "LLM_MAX_ERROR_RETRIES"
+
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 200_000
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_MAX_RATE_LIMIT_RETRIES = 3
+# The OpenAI client's own default, now applied by the governor
+DEFAULT_MAX_ERROR_RETRIES = 2
+
+HIGH_PRIORITY = 0
+NORMAL_PRIORITY = 1
+
+WINDOW_SECONDS = 60.0
+# Tokens reserved for the completion until the actual usage is known
+COMPLETION_TOKEN_ALLOWANCE = 500
+# Budget scaling after 429s: halve on each, recover this much per success
+MIN_BUDGET_SCALE = 0.1
+BUDGET_RECOVERY_STEP = 0.05
+BACKOFF_BASE_DELAY = 1.0
+BACKOFF_MAX_DELAY = 60.0
+
+# Failures worth another attempt besides 429s (APITimeoutError is an APIConnectionError)
+TRANSIENT_ERRORS = (openai.APIConnectionError, openai.InternalServerError)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    wake: Callable[[], None] = field(compare=False, default=lambda: None)
+
+
+class Lease:
+    """An admitted request; release it exactly once when the call ends."""
+
+    def __init__(self, governor: "LLMGovernor", entry: List[float]):
+        self._governor = governor
+        self._entry = entry
+
+    def complete(self, used_tokens: Optional[int] = None) -> None:
+        """The call succeeded; ``used_tokens`` replaces the estimate when known."""
+        self._governor._release(self._entry, used_tokens, succeeded=True)
+
+    def release(self) -> None:
+        """The call failed; its estimated tokens stay counted."""
+        self._governor._release(self._entry, None, succeeded=False)
+
+
+class LLMGovernor:
+    """Priority queue in front of shared request, token and concurrency budgets."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_rate_limit_retries: int = DEFAULT_MAX_RATE_LIMIT_RETRIES,
+        max_error_retries: int = DEFAULT_MAX_ERROR_RETRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.max_error_retries = max_error_retries
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        # [admitted at, tokens] of requests admitted within the window, oldest first
+        self._window: Deque[List[float]] = deque()
+        self._window_tokens = 0.0
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._scale = 1.0
+        self._stats: Dict[str, float] = {
+            "requests": 0,
+            "queued": 0,
+            "wait_seconds": 0.0,
+            "rate_limited": 0,
+            "retries": 0,
+            "errors": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+    def acquire(self, tokens: int, priority: int = NORMAL_PRIORITY) -> Lease:
+        """Block until the request may be sent."""
+        waiter = self._enqueue(tokens, priority)
+        event = threading.Event()
+        started = time.monotonic()
+        try:
+            while True:
+                event.clear()
+                outcome = self._try_admit(waiter, event.set)
+                if isinstance(outcome, Lease):
+                    self._record_wait(time.monotonic() - started)
+                    return outcome
+                event.wait(outcome)
+        except BaseException:
+            self._discard(waiter)
+            raise
+
+    async def aacquire(self, tokens: int, priority: int = NORMAL_PRIORITY) -> Lease:
+        """Async counterpart of ``acquire``; waits without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        waiter = self._enqueue(tokens, priority)
+        started = time.monotonic()
+        try:
+            while True:
+                woken = loop.create_future()
+
+                def wake(woken: asyncio.Future = woken) -> None:
+                    loop.call_soon_threadsafe(lambda: woken.done() or woken.set_result(None))
+
+                outcome = self._try_admit(waiter, wake)
+                if isinstance(outcome, Lease):
+                    self._record_wait(time.monotonic() - started)
+                    return outcome
+                try:
+                    await asyncio.wait_for(woken, outcome)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._discard(waiter)
+            raise
+
+    def back_off(self, attempt: int, retry_after: Optional[float] = None) -> bool:
+        """
+        Record a 429: pause admissions and halve the budgets.
+
+        Args:
+            attempt: 0-based attempt of the rate limited call
+            retry_after: Seconds the provider asked to wait, if it said
+
+        Returns:
+            True if the call should be retried
+        """
+        delay = retry_after
+        if delay is None:
+            delay = random.uniform(0, min(BACKOFF_MAX_DELAY, BACKOFF_BASE_DELAY * (2 ** attempt)))
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + min(delay, BACKOFF_MAX_DELAY))
+            self._scale = max(MIN_BUDGET_SCALE, self._scale / 2)
+            self._stats["rate_limited"] += 1
+            retry = attempt < self.max_rate_limit_retries
+            if retry:
+                self._stats["retries"] += 1
+            self._wake_head()
+        return retry
+
+    def error_delay(self, attempt: int) -> Optional[float]:
+        """
+        Record a connection error, timeout or 5xx.
+
+        Args:
+            attempt: 0-based attempt of the failed call
+
+        Returns:
+            Seconds to wait before retrying, or None to give up
+        """
+        with self._lock:
+            self._stats["errors"] += 1
+            if attempt >= self.max_error_retries:
+                return None
+            self._stats["retries"] += 1
+        return random.uniform(0, min(BACKOFF_MAX_DELAY, BACKOFF_BASE_DELAY * (2 ** attempt)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune(self._clock())
+            return {
+                **self._stats,
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                "window_requests": len(self._window),
+                "window_tokens": self._window_tokens,
+                "budget_scale": self._scale,
+            }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _enqueue(self, tokens: int, priority: int) -> _Waiter:
+        waiter = _Waiter(priority=priority, seq=next(self._seq), tokens=tokens)
+        with self._lock:
+            previous_head = self._waiters[0] if self._waiters else None
+            heapq.heappush(self._waiters, waiter)
+            self._stats["queued"] += 1
+            if previous_head is not None and self._waiters[0] is waiter:
+                # Overtaken, the previous head goes back to waiting until woken
+                previous_head.wake()
+        return waiter
+
+    def _try_admit(self, waiter: _Waiter, wake: Callable[[], None]) -> Lease | Optional[float]:
+        """Admit the waiter, or return how long it should sleep (None: until woken)."""
+        with self._lock:
+            waiter.wake = wake
+            if self._waiters[0] is not waiter:
+                return None
+
+            now = self._clock()
+            self._prune(now)
+            delay = self._delay(now, waiter.tokens)
+            if delay is None or delay > 0:
+                return delay
+
+            heapq.heappop(self._waiters)
+            entry = [now, float(waiter.tokens)]
+            self._window.append(entry)
+            self._window_tokens += waiter.tokens
+            self._in_flight += 1
+            self._stats["requests"] += 1
+            self._wake_head()
+            return Lease(self, entry)
+
+    def _delay(self, now: float, tokens: int) -> Optional[float]:
+        # Callers hold self._lock. None: blocked until a request finishes.
+        if self.max_concurrency and self._in_flight >= self.max_concurrency:
+            return None
+
+        delays = [self._paused_until - now]
+        if self.requests_per_minute:
+            allowed = max(1, int(self.requests_per_minute * self._scale))
+            if len(self._window) >= allowed:
+                delays.append(self._window[len(self._window) - allowed][0] + WINDOW_SECONDS - now)
+        if self.tokens_per_minute and self._window:
+            excess = self._window_tokens + tokens - self.tokens_per_minute * self._scale
+            for admitted_at, entry_tokens in self._window:
+                if excess <= 0:
+                    break
+                excess -= entry_tokens
+                delays.append(admitted_at + WINDOW_SECONDS - now)
+        return max(0.0, max(delays))
+
+    def _prune(self, now: float) -> None:
+        while self._window and self._window[0][0] <= now - WINDOW_SECONDS:
+            self._window_tokens -= self._window.popleft()[1]
+
+    def _release(self, entry: List[float], used_tokens: Optional[int], succeeded: bool) -> None:
+        with self._lock:
+            now = self._clock()
+            self._prune(now)
+            self._in_flight -= 1
+            if used_tokens is not None:
+                if entry[0] > now - WINDOW_SECONDS:  # still counted in the window
+                    self._window_tokens += used_tokens - entry[1]
+                entry[1] = float(used_tokens)
+            if succeeded:
+                self._scale = min(1.0, self._scale + BUDGET_RECOVERY_STEP)
+            self._wake_head()
+
+    def _discard(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self._wake_head()
+
+    def _record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._stats["wait_seconds"] += seconds
+
+    def _wake_head(self) -> None:
+        if self._waiters:
+            self._waiters[0].wake()
+
+
+def estimate_tokens(prompt_value: PromptValue) -> int:
+    """Tokens to reserve for a call: the rendered prompt plus a completion allowance."""
+    return approx_token_count(get_buffer_string(prompt_value.to_messages())) + COMPLETION_TOKEN_ALLOWANCE
+
+
+def _used_tokens(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+def _retry_after(error: openai.RateLimitError) -> Optional[float]:
+    response = getattr(error, "response", None)
+    return parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+
+
+def governed_model(governor: LLMGovernor, model: Runnable, priority: int = NORMAL_PRIORITY) -> Runnable:
+    """
+    ``model`` with every call admitted by ``governor`` and 429s, connection
+    errors, timeouts and 5xx answers retried. Build ``model`` with
+    ``max_retries=0`` so that no attempt bypasses the governor.
+
+    Args:
+        governor: The shared governor (see get_llm_governor)
+        model: The chat model
+        priority: HIGH_PRIORITY to overtake queued calls, else NORMAL_PRIORITY
+
+    Returns:
+        A runnable to use in place of ``model``
+    """
+
+    def invoke(prompt_value: PromptValue, config: RunnableConfig) -> BaseMessage:
+        tokens = estimate_tokens(prompt_value)
+        for attempt in itertools.count():
+            lease = governor.acquire(tokens, priority)
+            try:
+                response = model.invoke(prompt_value, config)
+            except openai.RateLimitError as error:
+                lease.release()
+                if not governor.back_off(attempt, _retry_after(error)):
+                    raise
+                continue
+            except TRANSIENT_ERRORS:
+                lease.release()
+                delay = governor.error_delay(attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            except BaseException:
+                lease.release()
+                raise
+            lease.complete(_used_tokens(response))
+            return response
+
+    async def ainvoke(prompt_value: PromptValue, config: RunnableConfig) -> BaseMessage:
+        tokens = estimate_tokens(prompt_value)
+        for attempt in itertools.count():
+            lease = await governor.aacquire(tokens, priority)
+            try:
+                response = await model.ainvoke(prompt_value, config)
+            except openai.RateLimitError as error:
+                lease.release()
+                if not governor.back_off(attempt, _retry_after(error)):
+                    raise
+                continue
+            except TRANSIENT_ERRORS:
+                lease.release()
+                delay = governor.error_delay(attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                lease.release()
+                raise
+            lease.complete(_used_tokens(response))
+            return response
+
+    return RunnableLambda(invoke, afunc=ainvoke, name="governed_model")
+
+
+_governor: Optional[LLMGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def get_llm_governor() -> LLMGovernor:
+    """Get the process-wide governor, configured from the environment on first use."""
+    global _governor
+
+    if _governor is None:
+        with _governor_lock:
+            if _governor is None:
+                _governor = LLMGovernor(
+                    requests_per_minute=float(os.getenv(REQUESTS_PER_MINUTE_ENV_KEY) or DEFAULT_REQUESTS_PER_MINUTE),
+                    tokens_per_minute=float(os.getenv(TOKENS_PER_MINUTE_ENV_KEY) or DEFAULT_TOKENS_PER_MINUTE),
+                    max_concurrency=int(os.getenv(MAX_CONCURRENCY_ENV_KEY) or DEFAULT_MAX_CONCURRENCY),
+                    max_rate_limit_retries=int(
+                        os.getenv(MAX_RATE_LIMIT_RETRIES_ENV_KEY) or DEFAULT_MAX_RATE_LIMIT_RETRIES
+                    ),
+                    max_error_retries=int(os.getenv(MAX_ERROR_RETRIES_ENV_KEY) or DEFAULT_MAX_ERROR_RETRIES),
+                )
+
+    return _governor
+
+
+def get_llm_governor_stats() -> Dict[str, Any]:
+    return get_llm_governor().stats()
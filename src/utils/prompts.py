@@ -8,25 +8,33 @@ from langchain_openai import ChatOpenAI
 from typing import Optional
 import os
 
+from src.utils.llm_cache import cached_model, get_llm_cache, model_id
+from src.utils.llm_clients import get_chat_model
+from src.utils.llm_governor import HIGH_PRIORITY, NORMAL_PRIORITY, get_llm_governor, governed_model
+
 # Default model configuration
 DEFAULT_MODEL = "gpt-4o-mini"
 GLOBAL_MODEL_ENV_KEY = "GLOBAL_MODEL"
 
-_cached_model: Optional[ChatOpenAI] = None
-_cached_model_name: Optional[str] = None
-
+# Prompts whose calls overtake queued calls in the LLM governor
+HIGH_PRIORITY_PROMPTS = {"orchestrator_judgement_summary"}
 
-def get_model(temperature: float = 0) -> ChatOpenAI:
-    """Get configured ChatOpenAI model instance."""
-    global _cached_model, _cached_model_name
 
-    model_name = os.getenv(GLOBAL_MODEL_ENV_KEY, DEFAULT_MODEL)
-
-    if _cached_model is None or model_name != _cached_model_name:
-        _cached_model = ChatOpenAI(model=model_name, temperature=temperature)
-        _cached_model_name = model_name
+def get_model(
+    temperature: Optional[float] = 0,
+    model: Optional[str] = None,
+    timeout: Optional[float] = None,
+    max_retries: Optional[int] = None,
+) -> ChatOpenAI:
+    """
+    Get the configured ChatOpenAI model instance.
 
-    return _cached_model
+    One instance is kept per (model, temperature, timeout, max_retries), all
+    sharing one pooled HTTP client (see llm_clients). The model defaults to
+    ``GLOBAL_MODEL``.
+    """
+    model_name = model or os.getenv(GLOBAL_MODEL_ENV_KEY, DEFAULT_MODEL)
+    return get_chat_model(model_name, temperature, timeout, max_retries)
 
 
 # ============================================================================
@@ -294,7 +302,10 @@ Write your analysis in a natural judicial style, as UK courts would discuss prec
 Cases Retrieved (ranked by court hierarchy):
 {ranked_cases}
 
-TASK: Analyze the relationships between these cases and how they apply to the legal issue.
+Citations Found in the Judgments (treatments are inferred from the wording around each citation and may be wrong):
+{citation_relationships}
+
+TASK: Analyze the relationships between these cases and how they apply to the legal issue. Use the citations above as leads: confirm a recorded treatment against the cases before relying on it, and cite the paragraph given when you do.
 
 Your analysis should address:
 
@@ -333,12 +344,14 @@ Date: {date}
 Retrieved Judgment Snippets:
 {court_judgment}
 
+Snippets are usually whole paragraphs of the judgment, labelled with their paragraph numbers (e.g. [45]). Snippets without labels are excerpts whose paragraph numbers are unknown; quote them without a paragraph number.
+
 TASK: Extract legal principles and quotes from this case that are relevant to the focus area.
 
 Your output should include:
 1. CASE CITATION: Full citation of the case
 2. LEGAL PRINCIPLES: Key legal tests, doctrines, or rules established
-3. KEY QUOTES: 1-2 direct quotes that establish these principles (with quotation marks)
+3. KEY QUOTES: 1-2 direct quotes that establish these principles (with quotation marks and paragraph number, if labelled)
 4. APPLICATION: How these principles apply to similar fact patterns
 
 Format your response as structured text following this template:
@@ -350,8 +363,8 @@ LEGAL PRINCIPLES ESTABLISHED:
 - [Principle 2]
 
 KEY QUOTES:
-1. "[Direct quote from judgment]"
-2. "[Direct quote from judgment]"
+1. "[Direct quote from judgment]" at [paragraph number]
+2. "[Direct quote from judgment]" at [paragraph number]
 
 RELEVANCE TO ISSUE:
 [Brief explanation of how this case applies to the focus area]
@@ -428,7 +441,7 @@ Return a JSON object with the following structure:
       "court": "Court of Appeal",
       "is_controlling_precedent": true,
       "principle": "The specific legal principle established",
-      "quote": "Direct quote from the judgment (if available)",
+      "quote": "Direct quote from the judgment followed by its paragraph number, e.g. at [45] (if available)",
       "relevance": "Why this case is relevant to the current issue"
     }}
   ]
@@ -573,7 +586,9 @@ def get_prompt(name: str, include_model: bool = False):
 
     Args:
         name: The prompt name
-        include_model: If True, bind the prompt to a ChatOpenAI model
+        include_model: If True, bind the prompt to a ChatOpenAI model, admitted
+            by the process-wide LLM governor and answering repeated calls from
+            the LLM response cache when it is enabled
 
     Returns:
         The prompt template, optionally bound to a model
@@ -584,8 +599,15 @@ def get_prompt(name: str, include_model: bool = False):
     prompt = PROMPT_REGISTRY[name]
 
     if include_model:
-        model = get_model()
-        return prompt | model
+        # The governor retries instead of the client, so every attempt is counted
+        model = get_model(max_retries=0)
+        priority = HIGH_PRIORITY if name in HIGH_PRIORITY_PROMPTS else NORMAL_PRIORITY
+        governed = governed_model(get_llm_governor(), model, priority)
+        cache = get_llm_cache()
+        if cache is not None:
+            # Cache hits never reach the governor
+            return prompt | cached_model(cache, name, prompt, governed, model_key=model_id(model))
+        return prompt | governed
 
     return prompt
 
@@ -0,0 +1,110 @@
+"""
+Tests for the offline case law corpus, built from the saved judgments in
+dataset/fixtures/case_law.
+"""
+
+import asyncio
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.case_law.nodes.fetch_case_document import afetch_case_document
+from src.case_law.nodes.search_case_law import asearch_caselaw
+from src.case_law_workflow import workflow
+from src.tools import case_law_corpus, citation_graph
+from src.tools.case_law_corpus import CaseLawCorpus, to_fts_query
+from src.tools.citation_graph import CitationGraph
+
+FIXTURES_DIR = Path(__file__).parent / "dataset" / "fixtures" / "case_law"
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    source_dir = tmp_path / "judgments"
+    source_dir.mkdir()
+    for fixture in FIXTURES_DIR.glob("judgment_*"):
+        shutil.copy(fixture, source_dir)
+
+    corpus = CaseLawCorpus(tmp_path / "corpus.sqlite3")
+    # The HTML and XML copies of the same judgment share one entry
+    assert corpus.ingest_directory(source_dir) == 3
+    assert len(corpus) == 2
+    monkeypatch.setattr(case_law_corpus, "_corpus", corpus)
+    # Fetching indexes citations; keep them out of the real graph
+    graph = CitationGraph(tmp_path / "citation_graph.sqlite3")
+    monkeypatch.setattr(citation_graph, "_graph", graph)
+    yield corpus
+    corpus.close()
+    graph.close()
+
+
+def test_to_fts_query_quotes_terms():
+    assert to_fts_query('"liquidated damages" penalty') == '"liquidated damages" OR "penalty"'
+    # Punctuation would otherwise be FTS5 syntax errors
+    assert to_fts_query("breach: s.2-3") == '"breach:" OR "s.2-3"'
+
+
+def test_corpus_search_matches_live_result_shape(corpus):
+    results = corpus.search("penalty Makdessi", results_per_page=3)
+
+    assert results[0] == {
+        "name": "Brown v Green Ltd",
+        "citation": "[2023] EWCA Civ 456",
+        "court": "IN THE COURT OF APPEAL (CIVIL DIVISION)",
+        "date": "2023-12-15",
+        "url": "https://caselaw.nationalarchives.gov.uk/ewca/civ/2023/456",
+    }
+    assert corpus.search("penalty Makdessi", page=2, results_per_page=3) == []
+
+
+def test_corpus_get_judgment(corpus):
+    judgment = corpus.get_judgment("https://caselaw.nationalarchives.gov.uk/EWHC/Comm/2024/123")
+
+    assert judgment.citation == "[2024] EWHC 123 (Comm)"
+    assert judgment.paragraphs
+    assert corpus.get_judgment("/uksc/2099/1") is None
+
+
+def test_workflow_nodes_run_offline(corpus):
+    state = {"keywords": ['"minimum commitment"'], "case_law_source": "corpus"}
+
+    cases = asyncio.run(asearch_caselaw(state))["cases"]
+    assert cases and all(case["keyword_set"] == '"minimum commitment"' for case in cases)
+
+    documents = asyncio.run(afetch_case_document({**state, "cases": cases}))
+    assert len(documents["fetched_case_documents"]) == len(cases)
+    assert documents["case_metadata"][0]["url"] == cases[0]["url"]
+
+
+def test_cases_without_keyword_passages_are_kept(corpus):
+    state = {"keywords": ['"minimum commitment"'], "case_law_source": "corpus"}
+    cases = asyncio.run(asearch_caselaw(state))["cases"]
+    unmatched = [{**case, "keyword_set": '"proprietary estoppel"'} for case in cases]
+
+    documents = asyncio.run(afetch_case_document({**state, "cases": unmatched}))
+
+    assert [case["citation"] for case in documents["case_metadata"]] == [case["citation"] for case in cases]
+    # The opening paragraphs stand in for keyword passages
+    assert all(document.startswith("[SNIPPET 1]\n") for document in documents["fetched_case_documents"])
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_graph_nodes_support_invoke_and_ainvoke(corpus, mode):
+    search = workflow.nodes["search_caselaw"].runnable
+    fetch = workflow.nodes["fetch_case_document"].runnable
+    state = {"keywords": ['"minimum commitment"'], "case_law_source": "corpus"}
+
+    if mode == "sync":
+        cases = search.invoke(state)["cases"]
+        documents = fetch.invoke({**state, "cases": cases})
+    else:
+        cases = asyncio.run(search.ainvoke(state))["cases"]
+        documents = asyncio.run(fetch.ainvoke({**state, "cases": cases}))
+
+    assert cases
+    assert len(documents["fetched_case_documents"]) == len(cases)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
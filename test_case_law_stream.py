@@ -0,0 +1,104 @@
+"""
+Tests for the streaming, paginated case law search.
+"""
+
+import asyncio
+
+import pytest
+
+from src.tools.case_law_stream import astream_case_law, parse_court_level, stream_case_law
+from src.tools.court_hierarchy import CourtLevel
+
+PAGES = {
+    1: [
+        {"citation": "[2022] EAT 1", "court": "N/A", "url": "/eat/2022/1"},
+        {"citation": "[2021] UKFTT 2", "court": "First-tier Tribunal", "url": "/ukftt/2021/2"},
+    ],
+    2: [
+        {"citation": "[2023] EWCA Civ 3", "court": "N/A", "url": "/ewca/civ/2023/3"},
+        {"citation": "[2022] EAT 1", "court": "N/A", "url": "/eat/2022/1"},
+    ],
+    3: [
+        {"citation": "[2020] UKSC 4", "court": "Supreme Court", "url": "/uksc/2020/4"},
+        {"citation": "[2024] EWHC 5 (Comm)", "court": "N/A", "url": "/ewhc/comm/2024/5"},
+    ],
+    4: [
+        {"citation": "[2019] EWHC 6 (Ch)", "court": "N/A", "url": "/ewhc/ch/2019/6"},
+    ],
+}
+
+
+@pytest.fixture
+def pages_requested():
+    return []
+
+
+@pytest.fixture
+def search_page(pages_requested):
+    def search(query, page, page_size):
+        pages_requested.append(page)
+        return PAGES.get(page, [])[:page_size]
+
+    return search
+
+
+def test_stops_once_enough_senior_cases_are_found(search_page, pages_requested):
+    results = list(stream_case_law(
+        "penalty", search_page, limit=2, min_court_level=CourtLevel.HIGH_COURT, page_size=2
+    ))
+
+    assert [r["url"] for r in results] == ["/ewca/civ/2023/3", "/uksc/2020/4"]
+    assert pages_requested == [1, 2, 3]
+
+
+def test_pages_are_fetched_lazily(search_page, pages_requested):
+    stream = stream_case_law("penalty", search_page, limit=5, page_size=2)
+
+    assert next(stream)["url"] == "/eat/2022/1"
+    assert pages_requested == [1]
+
+
+def test_backfills_with_highest_held_back_cases(search_page, pages_requested):
+    results = list(stream_case_law(
+        "penalty", search_page, limit=3, min_court_level=CourtLevel.SUPREME_COURT,
+        page_size=2, max_pages=3,
+    ))
+
+    assert [r["url"] for r in results] == ["/uksc/2020/4", "/ewca/civ/2023/3", "/ewhc/comm/2024/5"]
+    assert pages_requested == [1, 2, 3]
+
+
+def test_short_page_ends_the_stream(search_page, pages_requested):
+    results = list(stream_case_law("penalty", search_page, limit=10, page_size=2))
+
+    # The duplicate EAT result on page 2 is dropped
+    assert len(results) == 6
+    assert pages_requested == [1, 2, 3, 4]
+
+
+def test_async_stream_matches_sync(search_page):
+    async def asearch_page(query, page, page_size):
+        return search_page(query, page, page_size)
+
+    async def collect():
+        return [
+            r async for r in astream_case_law(
+                "penalty", asearch_page, limit=2, min_court_level=CourtLevel.HIGH_COURT, page_size=2
+            )
+        ]
+
+    expected = list(stream_case_law(
+        "penalty", search_page, limit=2, min_court_level=CourtLevel.HIGH_COURT, page_size=2
+    ))
+    assert asyncio.run(collect()) == expected
+
+
+def test_parse_court_level():
+    assert parse_court_level("high_court", CourtLevel.UNKNOWN) == CourtLevel.HIGH_COURT
+    assert parse_court_level(None, CourtLevel.HIGH_COURT) == CourtLevel.HIGH_COURT
+    with pytest.raises(ValueError):
+        parse_court_level("district_court", CourtLevel.UNKNOWN)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,223 @@
+"""
+Tests for the citation graph and the precedent analysis built on it, using the
+saved judgments in dataset/fixtures/case_law.
+"""
+
+import asyncio
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.case_law.nodes import analyze_precedents as analyze_precedents_node
+from src.case_law.nodes.analyze_precedents import analyze_precedents
+from src.case_law.nodes.fetch_case_document import afetch_case_document
+from src.tools import case_law_corpus, citation_graph
+from src.tools.case_law_corpus import CaseLawCorpus
+from src.tools.citation_graph import CitationGraph, Treatment, classify_treatment, extract_citations
+from src.tools.judgment_parser import Judgment, JudgmentParagraph, parse_judgment_html
+
+FIXTURES_DIR = Path(__file__).parent / "dataset" / "fixtures" / "case_law"
+
+
+def _fixture_judgment(name: str) -> Judgment:
+    html = (FIXTURES_DIR / f"{name}.html").read_text(encoding="utf-8")
+    return parse_judgment_html(html, f"https://caselaw.nationalarchives.gov.uk/{name}")
+
+
+@pytest.fixture
+def graph(tmp_path, monkeypatch):
+    graph = CitationGraph(tmp_path / "citation_graph.sqlite3")
+    monkeypatch.setattr(citation_graph, "_graph", graph)
+    yield graph
+    graph.close()
+
+
+@pytest.mark.parametrize("sentence, treatment", [
+    ("Jones v Smith [2019] EWHC 1 (QB) was wrongly decided and is overruled.", Treatment.OVERRULED),
+    ("I decline to follow [2019] EWHC 1 (QB).", Treatment.DOUBTED),
+    ("[2019] EWHC 1 (QB) was not followed.", Treatment.DOUBTED),
+    ("That case is plainly distinguishable.", Treatment.DISTINGUISHED),
+    ("The same approach was taken in Brown v Green Ltd [2023] EWCA Civ 456.", Treatment.FOLLOWED),
+    ("The judge applied [2015] UKSC 67.", Treatment.FOLLOWED),
+    ("He relied on [2015] UKSC 67.", Treatment.CITED),
+    # Quotation, setting out and negation are not treatment
+    ("Lord Neuberger in [2015] UKSC 67 said as follows:", Treatment.CITED),
+    ("The principles which apply were set out in [2015] UKSC 67.", Treatment.CITED),
+    ("We are not bound to follow [2019] EWHC 1 (QB).", Treatment.CITED),
+    ("[2019] EWHC 1 (QB) cannot be distinguished.", Treatment.CITED),
+    # A party's argument is not the court's holding
+    ("Counsel argues that [2019] EWHC 1 (QB) should be overruled but we reject that.", Treatment.CITED),
+    ("It was submitted that [2019] EWHC 1 (QB) is distinguishable.", Treatment.CITED),
+])
+def test_classify_treatment(sentence, treatment):
+    assert classify_treatment(sentence) == treatment
+
+
+def test_extract_citations_labels_paragraphs_and_treatments():
+    edges = extract_citations(_fixture_judgment("judgment_ewhc_comm_2024_123"))
+
+    assert [(edge.cited, edge.paragraph, edge.treatment) for edge in edges] == [
+        ("[2015] UKSC 67", "[4]", Treatment.CITED),
+        # The continuation block of paragraph 4 is attributed to it
+        ("[2023] EWCA Civ 456", "[4]", Treatment.FOLLOWED),
+    ]
+    assert {edge.citing for edge in edges} == {"[2024] EWHC 123 (Comm)"}
+
+
+def test_extract_citations_skips_self_citations_and_uncited_judgments():
+    judgment = Judgment(
+        url="/ewca/civ/2020/9",
+        citation="[2020] EWCA Civ 9",
+        paragraphs=[JudgmentParagraph("1.", "In [2020] EWCA Civ 9 we overruled [2018] EWHC 12 (Ch).")],
+    )
+
+    assert [(edge.cited, edge.treatment) for edge in extract_citations(judgment)] == [
+        ("[2018] EWHC 12 (Ch)", Treatment.OVERRULED),
+    ]
+    assert extract_citations(Judgment(url="/x", paragraphs=judgment.paragraphs)) == []
+
+
+def test_graph_queries_persist_across_connections(graph, tmp_path):
+    for name in ("judgment_ewca_civ_2023_456", "judgment_ewhc_comm_2024_123"):
+        graph.add_judgment(_fixture_judgment(name))
+    # Re-indexing a judgment replaces its edges
+    graph.add_judgment(_fixture_judgment("judgment_ewhc_comm_2024_123"))
+
+    reopened = CitationGraph(graph.path)
+    try:
+        assert reopened.stats() == {"cases": 3, "indexed_judgments": 2, "citations": 3}
+        top = reopened.most_cited(limit=1)[0]
+        assert (top["citation"], top["cited_by"]) == ("[2015] UKSC 67", 2)
+        assert [edge.citing for edge in reopened.followed_by("[2023]  ewca civ 456")] == ["[2024] EWHC 123 (Comm)"]
+        assert reopened.overruled_by("[2023] EWCA Civ 456") == []
+        assert [author["citation"] for author in reopened.most_cited(citing=["[2023] EWCA Civ 456"])] == [
+            "[2015] UKSC 67"
+        ]
+    finally:
+        reopened.close()
+
+
+def _case(name, citation, court, date):
+    return {
+        "name": name, "citation": citation, "court": court, "date": date, "url": f"/{name}", "keyword_set": "penalty"
+    }
+
+
+def _state(cases):
+    return {"issue": {"legal_issue": "Whether the minimum commitment clause is a penalty"}, "case_metadata": cases}
+
+
+POOL = [
+    _case("Smith v Jones", "[2024] EWHC 123 (Comm)", "High Court (Commercial Court)", "2024-01-10"),
+    _case("Brown v Green Ltd", "[2023] EWCA Civ 456", "Court of Appeal (Civil Division)", "2023-12-15"),
+]
+
+
+class FakePrompt:
+    def __init__(self):
+        self.received = {}
+        self.calls = 0
+
+    async def ainvoke(self, variables):
+        self.calls += 1
+        self.received.update(variables)
+        return "LLM analysis"
+
+
+@pytest.fixture
+def prompt(monkeypatch):
+    prompt = FakePrompt()
+
+    async def fake_pull_prompt_async(name, include_model=False):
+        return prompt
+
+    monkeypatch.setattr(analyze_precedents_node, "pull_prompt_async", fake_pull_prompt_async)
+    return prompt
+
+
+FOLLOWED_SENTENCE = (
+    "Brown v Green Ltd [2023] EWCA Civ 456 was followed in Smith v Jones [2024] EWHC 123 (Comm) at [4]."
+)
+
+
+def test_confirmed_relationships_are_written_without_the_llm(graph, prompt):
+    graph.add_judgments([
+        _fixture_judgment("judgment_ewca_civ_2023_456"),
+        _fixture_judgment("judgment_ewhc_comm_2024_123"),
+    ])
+
+    result = asyncio.run(analyze_precedents(_state(POOL)))
+
+    assert prompt.calls == 0
+    assert result["precedent_analysis"] == FOLLOWED_SENTENCE
+
+
+def test_conflicting_treatments_are_left_to_the_llm(graph, prompt):
+    graph.add_judgment(Judgment(
+        url="/ewhc/comm/2024/123",
+        citation="[2024] EWHC 123 (Comm)",
+        paragraphs=[
+            JudgmentParagraph("1.", "The judge applied [2023] EWCA Civ 456."),
+            JudgmentParagraph("2.", "On the second point [2023] EWCA Civ 456 is distinguishable."),
+        ],
+    ))
+
+    result = asyncio.run(analyze_precedents(_state(POOL)))
+
+    assert prompt.calls == 1
+    assert result["precedent_analysis"] == "LLM analysis"
+
+
+def test_llm_analyses_only_unresolved_cases_with_the_citations_as_context(graph, prompt):
+    graph.add_judgments([
+        _fixture_judgment("judgment_ewca_civ_2023_456"),
+        _fixture_judgment("judgment_ewhc_comm_2024_123"),
+    ])
+    cases = POOL + [_case("White v Black", "[2024] UKSC 789", "Supreme Court", "2024-02-01")]
+
+    result = asyncio.run(analyze_precedents(_state(cases)))
+
+    assert prompt.calls == 1
+    assert result["precedent_analysis"] == f"{FOLLOWED_SENTENCE}\n\nLLM analysis"
+    assert prompt.received["ranked_cases"].startswith("1. White v Black [2024] UKSC 789")
+    assert "Smith v Jones" not in prompt.received["ranked_cases"]
+    assert prompt.received["citation_relationships"].splitlines() == [
+        "- Smith v Jones [2024] EWHC 123 (Comm) followed Brown v Green Ltd [2023] EWCA Civ 456 at [4]",
+        "- [2015] UKSC 67 is cited in 2 of the retrieved judgments",
+    ]
+
+
+def test_a_single_case_is_still_analysed(graph, prompt):
+    result = asyncio.run(analyze_precedents(_state(POOL[:1])))
+
+    assert prompt.calls == 1
+    assert result["precedent_analysis"] == "LLM analysis"
+    assert prompt.received["legal_issue"] == "Whether the minimum commitment clause is a penalty"
+    assert prompt.received["citation_relationships"] == "No citations between these cases were found."
+
+
+def test_fetching_judgments_grows_the_graph(graph, tmp_path, monkeypatch):
+    source_dir = tmp_path / "judgments"
+    source_dir.mkdir()
+    for fixture in FIXTURES_DIR.glob("judgment_*.html"):
+        shutil.copy(fixture, source_dir)
+    corpus = CaseLawCorpus(tmp_path / "corpus.sqlite3")
+    corpus.ingest_directory(source_dir)
+    monkeypatch.setattr(case_law_corpus, "_corpus", corpus)
+
+    cases = [
+        {**result, "keyword_set": "penalty"}
+        for result in corpus.search("penalty", results_per_page=5)
+    ]
+    asyncio.run(afetch_case_document({"cases": cases, "case_law_source": "corpus"}))
+
+    assert graph.stats()["indexed_judgments"] == 2
+    assert [judgment.citation for judgment in corpus.iter_judgments(batch_size=1)] == [
+        "[2023] EWCA Civ 456", "[2024] EWHC 123 (Comm)"
+    ]
+    corpus.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,62 @@
+"""
+Tests for court level identification and authority ranking.
+"""
+
+import time
+
+import pytest
+
+from src.tools.court_hierarchy import (
+    CourtLevel,
+    NeutralCitation,
+    identify_court_level,
+    parse_neutral_citation,
+    rank_cases_by_authority,
+)
+
+
+@pytest.mark.parametrize("court, level", [
+    ("Court of Appeal (Criminal Division)", CourtLevel.COURT_OF_APPEAL_CRIMINAL),
+    ("High Court of Justice - King's Bench Division", CourtLevel.HIGH_COURT),
+    ("IN THE COURT OF APPEAL (CIVIL DIVISION) - ON APPEAL FROM THE HIGH COURT", CourtLevel.COURT_OF_APPEAL_CIVIL),
+    ("Employment Appeal Tribunal", CourtLevel.TRIBUNAL_UPPER),
+    ("Magistrates’ Court", CourtLevel.MAGISTRATES_COURT),
+    ("Great Yarmouth Theatre Licensing Committee", CourtLevel.UNKNOWN),
+    ("N/A", CourtLevel.UNKNOWN),
+])
+def test_court_names_match_on_word_boundaries(court, level):
+    assert identify_court_level(court) == level
+
+
+def test_neutral_citations_are_parsed():
+    assert parse_neutral_citation("Brown v Green [2023] EWCA Civ 456") == NeutralCitation(2023, "EWCA", "Civ", 456)
+    assert parse_neutral_citation("[2024] ewhc 45 (Comm)") == NeutralCitation(2024, "EWHC", "Comm", 45)
+    assert parse_neutral_citation("[2022] UKUT 12 (IAC)").court_level == CourtLevel.TRIBUNAL_UPPER
+    assert parse_neutral_citation("[2015] 1 WLR 123") is None
+
+
+def test_citation_takes_precedence_over_court_name():
+    ranked = rank_cases_by_authority([
+        {"name": "A", "court": "N/A", "citation": "[2023] EWHC 1 (Ch)"},
+        {"name": "B", "court": "Great Britain Theatre Board", "citation": "[2020] UKSC 9"},
+        {"name": "C", "court": "Court of Appeal", "citation": "N/A"},
+    ])
+
+    assert [case["name"] for case in ranked] == ["B", "C", "A"]
+    assert ranked[0]["court_level_name"] == "UK Supreme Court"
+
+
+def test_ranking_large_pools_is_cheap():
+    courts = ["High Court (Chancery Division)", "Court of Appeal (Civil Division)", "Upper Tribunal"]
+    pool = [{"name": f"Case {i}", "court": courts[i % 3], "citation": "N/A"} for i in range(10_000)]
+
+    started = time.perf_counter()
+    ranked = rank_cases_by_authority(pool)
+    per_case = (time.perf_counter() - started) / len(pool)
+
+    assert ranked[0]["court_level"] == CourtLevel.COURT_OF_APPEAL_CIVIL
+    assert per_case < 50e-6
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
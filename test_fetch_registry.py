@@ -0,0 +1,123 @@
+"""
+Tests for the run-scoped judgment fetch registry (single-flight coalescing).
+"""
+
+import asyncio
+
+import pytest
+
+from src.tools import case_law_search
+from src.tools.fetch_registry import FetchRegistry, current_fetch_registry, fetch_registry_scope
+from src.tools.judgment_parser import Judgment
+
+
+def test_concurrent_requests_share_one_fetch():
+    registry = FetchRegistry()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def run():
+        return await asyncio.gather(*[registry.get_or_fetch("/ewca/civ/2023/456", fetch) for _ in range(5)])
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert registry.stats()["coalesced"] == 4
+
+
+def test_failed_fetch_reaches_waiters_and_is_retried():
+    registry = FetchRegistry()
+    attempts = []
+
+    async def flaky_fetch():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return "judgment"
+
+    async def run():
+        first = await asyncio.gather(
+            *[registry.get_or_fetch("/uksc/2020/1", flaky_fetch) for _ in range(3)],
+            return_exceptions=True,
+        )
+        second = await registry.get_or_fetch("/uksc/2020/1", flaky_fetch)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in first)
+    assert second == "judgment"
+    assert len(attempts) == 2
+
+
+def test_cancelling_the_first_caller_leaves_the_fetch_to_the_others():
+    registry = FetchRegistry()
+    release = None
+
+    async def fetch():
+        await release.wait()
+        return "judgment"
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        owner = asyncio.create_task(registry.get_or_fetch("/uksc/2020/1", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(registry.get_or_fetch("/uksc/2020/1", fetch))
+        await asyncio.sleep(0)
+
+        owner.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return owner, await waiter
+
+    owner, result = asyncio.run(run())
+
+    assert owner.cancelled()
+    assert result == "judgment"
+    assert registry.stats() == {
+        "fetches": 1, "completed_hits": 0, "coalesced": 1, "failures": 0, "completed": 1, "in_flight": 0
+    }
+
+
+def test_afetch_judgment_coalesces_within_scope(monkeypatch):
+    downloads = []
+
+    async def fake_download(url, cached=None):
+        downloads.append(url)
+        await asyncio.sleep(0.01)
+        return Judgment(url=url, name="Brown v Green Ltd"), {}
+
+    monkeypatch.setenv("CASE_LAW_CACHE_DISABLED", "1")
+    monkeypatch.setattr(case_law_search, "_adownload_judgment", fake_download)
+
+    async def issue(uri):
+        return await case_law_search.afetch_judgment(uri)
+
+    async def run():
+        with fetch_registry_scope() as registry:
+            # Parallel issues asking for the same judgment under different spellings
+            results = await asyncio.gather(
+                issue("/ewca/civ/2023/456"),
+                issue("https://caselaw.nationalarchives.gov.uk/EWCA/Civ/2023/456"),
+            )
+            # A later iteration reuses the completed result
+            results.append(await issue("/ewca/civ/2023/456"))
+        return registry, results
+
+    registry, results = asyncio.run(run())
+
+    assert len(downloads) == 1
+    assert results[0] is results[1] is results[2]
+    assert registry.stats()["completed_hits"] == 1
+    assert current_fetch_registry() is None
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,79 @@
+"""
+Parity tests for the pluggable HTML parser backends.
+
+Every saved case law page under dataset/fixtures/case_law must produce
+identical search results and Judgment records with the fast (lxml) and the
+fallback (html.parser) backends.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.tools.case_law_search import _parse_html_results, format_case_judgment
+from src.tools.html_backend import FALLBACK_PARSER, FAST_PARSER, parser_available
+from src.tools.judgment_parser import parse_judgment_html
+
+FIXTURES_DIR = Path(__file__).parent / "dataset" / "fixtures" / "case_law"
+JUDGMENT_FIXTURES = sorted(FIXTURES_DIR.glob("judgment_*.html"))
+SEARCH_FIXTURES = sorted(FIXTURES_DIR.glob("search_*.html"))
+
+requires_fast_parser = pytest.mark.skipif(
+    not parser_available(FAST_PARSER), reason=f"{FAST_PARSER} is not installed"
+)
+
+
+@requires_fast_parser
+@pytest.mark.parametrize("fixture", JUDGMENT_FIXTURES, ids=lambda p: p.name)
+def test_judgment_parity(fixture: Path):
+    html = fixture.read_text(encoding="utf-8")
+    url = f"https://caselaw.nationalarchives.gov.uk/{fixture.stem}"
+
+    fast = parse_judgment_html(html, url, parser=FAST_PARSER)
+    fallback = parse_judgment_html(html, url, parser=FALLBACK_PARSER)
+
+    assert fast.to_dict() == fallback.to_dict()
+    assert format_case_judgment(fast) == format_case_judgment(fallback)
+
+
+@requires_fast_parser
+@pytest.mark.parametrize("fixture", SEARCH_FIXTURES, ids=lambda p: p.name)
+def test_search_results_parity(fixture: Path):
+    html = fixture.read_text(encoding="utf-8")
+
+    fast = _parse_html_results(html, "minimum commitment", parser=FAST_PARSER)
+    fallback = _parse_html_results(html, "minimum commitment", parser=FALLBACK_PARSER)
+
+    assert fast == fallback
+
+
+def test_judgment_fixture_extraction():
+    html = (FIXTURES_DIR / "judgment_ewhc_comm_2024_123.html").read_text(encoding="utf-8")
+    judgment = parse_judgment_html(html, "https://caselaw.nationalarchives.gov.uk/ewhc/comm/2024/123")
+
+    assert judgment.name == "Smith Logistics Ltd v Jones Consulting Ltd"
+    assert judgment.citation == "[2024] EWHC 123 (Comm)"
+    assert judgment.date == "10/01/2024"
+    assert judgment.case_number == "CL-2023-000456"
+    assert judgment.court.startswith("IN THE HIGH COURT OF JUSTICE")
+    assert judgment.judges == ["MRS JUSTICE O’BRIEN DBE"]
+    assert judgment.parties[0] == "SMITH LOGISTICS LIMITED"
+    numbers = [p.number for p in judgment.paragraphs if p.number]
+    assert numbers == ["1.", "2.", "3.", "4.", "5.", "(6)"]
+
+
+def test_search_fixture_extraction():
+    html = (FIXTURES_DIR / "search_results.html").read_text(encoding="utf-8")
+    results = _parse_html_results(html, "minimum commitment")
+
+    assert [r["citation"] for r in results] == [
+        "[2023] EWCA Civ 456",
+        "[2024] EWHC 123 (Comm)",
+        "[2022] EAT 77",
+    ]
+    assert results[0]["url"] == "https://caselaw.nationalarchives.gov.uk/ewca/civ/2023/456"
+    assert results[2]["court"] == "N/A"
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,103 @@
+"""
+Tests for the shared case law HTTP client: client reuse, pool limits and the
+request/connection counters, with a mocked transport.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.tools import http_client
+from src.tools.http_client import (
+    DEFAULT_HEADERS,
+    build_case_law_url,
+    close_http_client,
+    get_async_http_client,
+    get_http_client,
+    get_http_stats,
+    get_pool_limits,
+    http_get,
+)
+
+URL = "https://caselaw.nationalarchives.gov.uk/ewca/civ/2023/456"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(http_client, "_client", None)
+    yield
+    close_http_client()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, text="ok")
+
+    monkeypatch.setattr(http_client, "_client", httpx.Client(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(http_client, "_rate_limiters", {})
+    http_client.reset_http_stats()
+    return requests
+
+
+def test_one_client_is_shared_until_closed(client):
+    first = get_http_client()
+
+    assert get_http_client() is first
+    assert first.headers["User-Agent"] == DEFAULT_HEADERS["User-Agent"]
+
+    close_http_client()
+    assert first.is_closed
+    assert get_http_client() is not first
+
+
+def test_async_clients_are_shared_per_event_loop():
+    async def clients():
+        return get_async_http_client(), get_async_http_client()
+
+    first, same = asyncio.run(clients())
+    second, _ = asyncio.run(clients())
+
+    assert first is same
+    assert second is not first
+
+
+def test_pool_limits_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv(http_client.MAX_CONNECTIONS_ENV_KEY, "40")
+    monkeypatch.setenv(http_client.MAX_KEEPALIVE_ENV_KEY, "15")
+    monkeypatch.setenv(http_client.KEEPALIVE_EXPIRY_ENV_KEY, "60")
+    monkeypatch.setenv(http_client.HTTP2_ENV_KEY, "0")
+
+    limits = get_pool_limits()
+
+    assert (limits.max_connections, limits.max_keepalive_connections, limits.keepalive_expiry) == (40, 15, 60.0)
+    assert not http_client.http2_enabled()
+
+
+def test_stats_count_requests_versions_and_reused_connections(server):
+    http_get(URL, params={"query": "penalty"})
+    http_get(URL)
+    # httpcore reports a TCP connect only when the pool opens a new socket
+    http_client._trace("connection.connect_tcp.complete", {})
+
+    stats = get_http_stats()
+    assert (stats["requests"], stats["connections_opened"], stats["connections_reused"]) == (2, 1, 1)
+    assert stats["http_versions"] == {"HTTP/1.1": 2}
+    assert server[0].url.params["query"] == "penalty"
+
+    http_client.reset_http_stats()
+    assert get_http_stats()["requests"] == 0
+
+
+def test_build_case_law_url():
+    assert build_case_law_url("/ewca/civ/2023/456") == URL
+    assert build_case_law_url("ewca/civ/2023/456") == URL
+    assert build_case_law_url(URL) == URL
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,126 @@
+"""
+Tests for the content-addressed judgment cache: TTL expiry, LRU eviction
+under the size cap and hit/miss statistics.
+"""
+
+import os
+
+import pytest
+
+from src.tools import judgment_cache
+from src.tools.judgment_cache import JudgmentCache, normalize_case_uri
+
+DAY = 24 * 60 * 60
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(judgment_cache, "time", clock)
+    return clock
+
+
+def _cache(path, max_bytes=10 * 1024 * 1024):
+    return JudgmentCache(path, ttl_seconds=30 * DAY, max_bytes=max_bytes, revalidate_seconds=7 * DAY)
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = _cache(tmp_path)
+    yield cache
+    cache.close()
+
+
+def test_normalize_case_uri():
+    url = "https://caselaw.nationalarchives.gov.uk/EWCA/Civ/2023/456?query=x"
+    assert normalize_case_uri(url) == "/ewca/civ/2023/456"
+    assert normalize_case_uri("ewca/civ/2023/456/") == "/ewca/civ/2023/456"
+
+
+def test_entries_go_stale_then_expire(cache, clock):
+    cache.put("/ewca/civ/2023/456", "Judgment text", {"etag": '"v1"'}, fetch_seconds=2.0)
+
+    fresh = cache.get("https://caselaw.nationalarchives.gov.uk/EWCA/Civ/2023/456")
+    assert (fresh.text, fresh.metadata, fresh.stale) == ("Judgment text", {"etag": '"v1"'}, False)
+
+    clock.now += 8 * DAY
+    assert cache.get("/ewca/civ/2023/456").stale
+
+    # Revalidation restarts the TTL
+    cache.mark_validated("/ewca/civ/2023/456", {"etag": '"v2"'})
+    clock.now += 25 * DAY
+    assert cache.get("/ewca/civ/2023/456").metadata == {"etag": '"v2"'}
+
+    clock.now += 6 * DAY
+    assert cache.get("/ewca/civ/2023/456") is None
+    assert cache.stats()["session"]["expired"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    texts = {f"/ewhc/ch/2024/{i}": os.urandom(2000).hex() for i in range(3)}
+    # Room for two compressed judgments, not three
+    cache = _cache(tmp_path, max_bytes=5000)
+    try:
+        for uri in list(texts)[:2]:
+            cache.put(uri, texts[uri])
+            clock.now += 1
+        cache.get("/ewhc/ch/2024/0")
+        clock.now += 1
+        cache.put("/ewhc/ch/2024/2", texts["/ewhc/ch/2024/2"])
+
+        assert cache.get("/ewhc/ch/2024/1") is None
+        assert cache.get("/ewhc/ch/2024/0").text == texts["/ewhc/ch/2024/0"]
+        assert cache.stats()["entries"] == 2
+        assert cache.stats()["session"]["evictions"] == 1
+        assert len(list((tmp_path / "blobs").rglob("*.z"))) == 2
+    finally:
+        cache.close()
+
+
+def test_identical_texts_share_one_blob(cache, tmp_path):
+    cache.put("/ewca/civ/2023/456", "Same text")
+    cache.put("/ewca/civ/2023/457", "Same text")
+    cache.invalidate("/ewca/civ/2023/456")
+
+    assert cache.get("/ewca/civ/2023/457").text == "Same text"
+    assert len(list((tmp_path / "blobs").rglob("*.z"))) == 1
+
+
+def test_stats_per_session_and_lifetime(cache, tmp_path, clock):
+    cache.put("/ewca/civ/2023/456", "Judgment text", fetch_seconds=1.5)
+    cache.get("/ewca/civ/2023/456")
+    cache.get("/ewca/civ/2023/456")
+    cache.get("/uksc/2015/67")
+
+    session = cache.stats()["session"]
+    assert (session["hits"], session["misses"], session["stores"]) == (2, 1, 1)
+    assert session["hit_ratio"] == pytest.approx(2 / 3)
+    assert session["network_seconds_saved"] == pytest.approx(3.0)
+
+    # A stale lookup is a miss until the cached copy is served
+    clock.now += 8 * DAY
+    cache.get("/ewca/civ/2023/456")
+    assert cache.stats()["session"]["misses"] == 2
+    cache.mark_served("/ewca/civ/2023/456")
+    assert (cache.stats()["session"]["hits"], cache.stats()["session"]["misses"]) == (3, 1)
+
+    reopened = _cache(tmp_path)
+    try:
+        stats = reopened.stats()
+        assert stats["session"] == {"hit_ratio": 0.0}
+        assert (stats["lifetime"]["hits"], stats["lifetime"]["misses"]) == (3, 1)
+        assert stats["entries"] == 1
+    finally:
+        reopened.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
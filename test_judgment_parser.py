@@ -0,0 +1,137 @@
+"""
+Tests for the single-pass judgment page parser and the case law views
+formatted from its Judgment record.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.tools.case_law_search import format_case_details, format_case_judgment, format_case_metadata
+from src.tools.judgment_parser import Judgment, JudgmentParagraph, parse_judgment_html
+
+FIXTURES_DIR = Path(__file__).parent / "dataset" / "fixtures" / "case_law"
+URL = "https://caselaw.nationalarchives.gov.uk/ewhc/ch/2025/3107"
+
+PAGE = """
+<html><body>
+<h1>Acme Ltd v Widget plc</h1>
+<span class="ncn-nowrap">[2025] EWHC 3107 (Ch)</span>
+<div class="judgment-header__case-number">Case No: BL-2025-000123</div>
+<div class="judgment-header__date">Date: 03/12/2025</div>
+<p>IN THE HIGH COURT OF JUSTICE</p>
+<p>BUSINESS AND PROPERTY COURTS OF ENGLAND AND WALES</p>
+<p>Before :</p>
+<p>MR JUSTICE GREEN</p>
+<p>Between :</p>
+<table class="pr-two-column">
+  <tr><td><p>ACME LIMITED</p></td><td><p>Claimant</p></td></tr>
+  <tr><td><p>-and-</p></td><td><p></p></td></tr>
+  <tr><td><p>WIDGET PLC</p></td><td><p>Defendant</p></td></tr>
+</table>
+<section class="judgment-body">
+  <h2>Introduction</h2>
+  <div class="judgment-body__section">
+    <p><span class="judgment-body__number">1.</span>The claimant sues on a guarantee.</p>
+    <span class="judgment-body__number">2.</span><p>The guarantee was signed in 2019.</p>
+    <p>3. The defendant denies liability.</p>
+    <p>(4) It says the guarantee was discharged.</p>
+  </div>
+  <h3>The law</h3>
+  <p>Version 2.1 of the agreement applies.</p>
+  <p>   </p>
+</section>
+</body></html>
+"""
+
+
+@pytest.fixture
+def judgment() -> Judgment:
+    return parse_judgment_html(PAGE, URL)
+
+
+def test_header_metadata(judgment):
+    assert (judgment.url, judgment.name, judgment.citation) == (URL, "Acme Ltd v Widget plc", "[2025] EWHC 3107 (Ch)")
+    assert (judgment.date, judgment.case_number) == ("03/12/2025", "BL-2025-000123")
+    assert judgment.court == "IN THE HIGH COURT OF JUSTICE - BUSINESS AND PROPERTY COURTS OF ENGLAND AND WALES"
+    assert judgment.judges == ["MR JUSTICE GREEN"]
+    assert judgment.parties == ["ACME LIMITED", "Claimant", "WIDGET PLC", "Defendant"]
+
+
+def test_paragraph_numbers_and_headings(judgment):
+    assert [(paragraph.number, paragraph.text) for paragraph in judgment.paragraphs] == [
+        (None, "Introduction"),
+        # Number marker inside the paragraph
+        ("1.", "The claimant sues on a guarantee."),
+        # Number marker beside the paragraph it labels
+        ("2.", "The guarantee was signed in 2019."),
+        # Numbers typed into the text
+        ("3.", "The defendant denies liability."),
+        ("(4)", "It says the guarantee was discharged."),
+        (None, "The law"),
+        # "2.1" is not a paragraph number; empty blocks are dropped
+        (None, "Version 2.1 of the agreement applies."),
+    ]
+
+
+def test_missing_fields_fall_back_to_defaults():
+    judgment = parse_judgment_html("<html><body><p>Nothing here</p></body></html>", URL)
+
+    assert (judgment.name, judgment.citation, judgment.court, judgment.date) == (
+        "Unknown Case", "N/A", "N/A", "N/A"
+    )
+    assert judgment.paragraphs == []
+    assert judgment.body_text == "Unable to extract judgment text"
+
+
+def test_fixture_page_paragraphs_are_numbered_in_order():
+    html = (FIXTURES_DIR / "judgment_ewhc_comm_2024_123.html").read_text(encoding="utf-8")
+    judgment = parse_judgment_html(html, URL)
+
+    assert judgment.citation == "[2024] EWHC 123 (Comm)"
+    assert judgment.date == "10/01/2024"
+    assert [paragraph.number for paragraph in judgment.paragraphs if paragraph.number] == [
+        "1.", "2.", "3.", "4.", "5.", "(6)"
+    ]
+
+
+def test_record_round_trips_through_dict(judgment):
+    assert Judgment.from_dict(judgment.to_dict()) == judgment
+
+
+def test_format_case_judgment(judgment):
+    lines = format_case_judgment(judgment).split("\n")
+
+    assert lines[:5] == [
+        "Case: Acme Ltd v Widget plc",
+        "Citation: [2025] EWHC 3107 (Ch)",
+        "Court: IN THE HIGH COURT OF JUSTICE - BUSINESS AND PROPERTY COURTS OF ENGLAND AND WALES",
+        "Date: 03/12/2025",
+        f"URL: {URL}",
+    ]
+    assert "\n".join(lines[7:]) == judgment.body_text
+    assert "1. The claimant sues on a guarantee.\n\n2. The guarantee was signed in 2019." in judgment.body_text
+
+
+def test_format_case_details_truncates_long_judgments():
+    judgment = Judgment(url=URL, name="Long v Case", paragraphs=[JudgmentParagraph("1.", "x" * 6000)])
+
+    details = format_case_details(judgment)
+
+    assert details.startswith(f"Case: Long v Case\nCitation: N/A\nURL: {URL}\n")
+    assert details.endswith("x" * 4997 + "...")
+
+
+def test_format_case_metadata(judgment):
+    metadata = format_case_metadata(judgment)
+
+    assert "Case Number: BL-2025-000123" in metadata
+    assert "Judge(s):\n  - MR JUSTICE GREEN" in metadata
+    assert metadata.endswith("Parties:\n  1. ACME LIMITED\n  2. Claimant\n  3. WIDGET PLC\n  4. Defendant")
+    assert "The claimant sues" not in metadata
+
+    assert format_case_metadata(Judgment(url=URL)).endswith("Judge(s):\n  - N/A")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
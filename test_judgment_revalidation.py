@@ -0,0 +1,108 @@
+"""
+Tests for conditional GET revalidation of cached judgments, run against the
+recorded XML fixture with a mocked transport.
+"""
+
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+
+from src.tools import case_law_search, http_client, judgment_cache
+from src.tools.judgment_cache import JudgmentCache
+from src.tools.judgment_refresh import refresh_stale_judgments
+
+FIXTURES_DIR = Path(__file__).parent / "dataset" / "fixtures" / "case_law"
+XML_FIXTURE = FIXTURES_DIR / "judgment_ewca_civ_2023_456.xml"
+CASE_URI = "/ewca/civ/2023/456"
+ETAG = '"v1"'
+
+
+@pytest.fixture
+def server():
+    state = {"requests": [], "etag": ETAG}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        state["requests"].append(dict(request.headers))
+        if request.headers.get("If-None-Match") == state["etag"]:
+            return httpx.Response(304, headers={"ETag": state["etag"]})
+        return httpx.Response(
+            200,
+            content=XML_FIXTURE.read_bytes(),
+            headers={"ETag": state["etag"], "Last-Modified": "Fri, 15 Dec 2023 10:00:00 GMT"},
+        )
+
+    state["transport"] = httpx.MockTransport(handler)
+    return state
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch, server):
+    # Every entry is due for revalidation as soon as it is stored
+    cache = JudgmentCache(tmp_path, ttl_seconds=3600, max_bytes=10 * 1024 * 1024, revalidate_seconds=0)
+    monkeypatch.delenv(judgment_cache.CACHE_DISABLED_ENV_KEY, raising=False)
+    monkeypatch.delenv(case_law_search.JUDGMENT_SOURCE_ENV_KEY, raising=False)
+    monkeypatch.setattr(judgment_cache, "_cache", cache)
+    monkeypatch.setattr(http_client, "_client", httpx.Client(transport=server["transport"]))
+    monkeypatch.setattr(
+        http_client, "get_async_http_client", lambda: httpx.AsyncClient(transport=server["transport"])
+    )
+    yield cache
+    cache.close()
+
+
+def test_not_modified_counts_as_cache_hit(cache, server):
+    first = case_law_search.fetch_judgment(CASE_URI)
+    second = case_law_search.fetch_judgment(CASE_URI)
+
+    assert "if-none-match" not in server["requests"][0]
+    assert server["requests"][1]["if-none-match"] == ETAG
+    assert server["requests"][1]["if-modified-since"] == "Fri, 15 Dec 2023 10:00:00 GMT"
+    assert second.to_dict() == first.to_dict()
+    session = cache.stats()["session"]
+    assert (session["revalidated"], session["stores"]) == (1, 1)
+    # The 304 lookup is one hit, and its download time is saved once
+    assert (session["hits"], session["misses"]) == (1, 1)
+    assert session["network_seconds_saved"] == pytest.approx(cache.stale_entries()[0].fetch_seconds)
+
+
+def test_changed_judgment_replaces_cached_copy(cache, server):
+    asyncio.run(case_law_search.afetch_judgment(CASE_URI))
+    server["etag"] = '"v2"'
+
+    asyncio.run(case_law_search.afetch_judgment(CASE_URI))
+
+    session = cache.stats()["session"]
+    assert session["stores"] == 2
+    # Replacing a stale entry with a new download is a miss, not a hit
+    assert (session.get("hits", 0), session["misses"], session.get("network_seconds_saved", 0)) == (0, 2, 0)
+    assert cache.get(CASE_URI).metadata["etag"] == '"v2"'
+
+
+def test_refresh_job_revalidates_stale_entries(cache, server):
+    case_law_search.fetch_judgment(CASE_URI)
+
+    stats = asyncio.run(refresh_stale_judgments())
+
+    assert stats == {"checked": 1, "not_modified": 1, "updated": 0, "errors": 0}
+    assert server["requests"][-1]["if-none-match"] == ETAG
+    # Background revalidation serves nothing
+    assert cache.stats()["session"].get("hits", 0) == 0
+
+
+def test_stale_copy_served_when_revalidation_fails(cache, server, monkeypatch):
+    first = case_law_search.fetch_judgment(CASE_URI)
+
+    def offline(request):
+        raise httpx.ConnectError("offline", request=request)
+
+    monkeypatch.setenv(http_client.MAX_RETRIES_ENV_KEY, "0")
+    monkeypatch.setattr(http_client, "_client", httpx.Client(transport=httpx.MockTransport(offline)))
+
+    assert case_law_search.fetch_judgment(CASE_URI).to_dict() == first.to_dict()
+    assert cache.stats()["session"]["hits"] == 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,115 @@
+"""
+Tests for paragraph segmentation and paragraph-level snippet selection.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.tools.judgment_parser import Judgment, JudgmentParagraph, parse_judgment_xml
+from src.tools.judgment_segments import (
+    ParagraphIndex,
+    extract_paragraph_snippets,
+    judgment_snippets,
+    segment_judgment,
+)
+from src.utils.prompts import CASE_LAW_ISSUE_GUIDELINES_PROMPT
+
+FIXTURES_DIR = Path(__file__).parent / "dataset" / "fixtures" / "case_law"
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def _judgment(texts):
+    return Judgment(
+        url="https://caselaw.nationalarchives.gov.uk/ewca/civ/2023/1",
+        paragraphs=[JudgmentParagraph(number=f"{i}.", text=text) for i, text in enumerate(texts, 1)],
+    )
+
+
+def test_segments_carry_citable_paragraph_numbers():
+    judgment = parse_judgment_xml(
+        (FIXTURES_DIR / "judgment_ewca_civ_2023_456.xml").read_bytes(), url="https://example.test"
+    )
+    segments = segment_judgment(judgment)
+
+    assert [segment.index for segment in segments] == list(range(len(judgment.paragraphs)))
+    assert segments[0].label is None  # the "Lord Justice Smith:" heading
+    assert segments[1].label == "[1]"
+    assert segments[1].render().startswith("[1] This appeal concerns")
+
+
+def test_index_maps_keywords_to_paragraphs():
+    segments = segment_judgment(_judgment([
+        "The clause was a penalty.",
+        "Nothing relevant.",
+        "Liquidated damages are not a penalty.",
+    ]))
+    index = ParagraphIndex(segments, ["penalty", "liquidated damages"])
+
+    assert index.paragraphs_with("penalty") == [0, 2]
+    assert index.paragraphs_with("liquidated damages") == [2]
+    assert index.rank()[0][1] == 2
+
+
+def test_snippets_are_whole_paragraphs_grouped_when_consecutive():
+    segments = segment_judgment(_judgment([
+        "The clause was a penalty.",
+        "It was extravagant and unconscionable as a penalty.",
+        "Nothing relevant.",
+        "Costs follow the event; the penalty point fails.",
+    ]))
+
+    result = extract_paragraph_snippets(segments, "penalty", 1000, tokenizer=count_words)
+
+    assert result == (
+        "[SNIPPET 1]\n[1] The clause was a penalty.\n\n"
+        "[2] It was extravagant and unconscionable as a penalty.\n\n"
+        "[SNIPPET 2]\n[4] Costs follow the event; the penalty point fails."
+    )
+
+
+def test_paragraphs_beyond_the_budget_are_left_out():
+    segments = segment_judgment(_judgment([
+        "penalty " + "filler " * 200,
+        "The penalty clause and liquidated damages.",
+    ]))
+
+    result = extract_paragraph_snippets(
+        segments, '"liquidated damages" penalty', 50, tokenizer=count_words
+    )
+
+    assert result == "[SNIPPET 1]\n[2] The penalty clause and liquidated damages."
+
+
+def test_no_hits_selects_nothing():
+    segments = segment_judgment(_judgment(["Nothing relevant."]))
+
+    assert extract_paragraph_snippets(segments, "penalty", 1000) == ""
+
+
+def test_oversized_paragraphs_fall_back_to_unlabelled_windows():
+    judgment = _judgment(["filler " * 100 + "the penalty clause " + "filler " * 100])
+
+    result = judgment_snippets(judgment, "penalty", 50, tokenizer=count_words)
+
+    assert result.startswith("[SNIPPET 1]\n...")
+    assert "the penalty clause" in result
+    assert "[1]" not in result
+    # The prompt must not promise a paragraph label for every snippet
+    prompt = CASE_LAW_ISSUE_GUIDELINES_PROMPT.messages[1].prompt.template
+    assert "Snippets without labels" in prompt
+
+
+def test_judgments_without_hits_fall_back_to_their_opening_paragraphs():
+    judgment = _judgment(["This appeal concerns a guarantee.", "It was signed in 2019.", "filler " * 100])
+
+    result = judgment_snippets(judgment, "penalty", 50, tokenizer=count_words)
+
+    assert result == "[SNIPPET 1]\n[1] This appeal concerns a guarantee.\n\n[2] It was signed in 2019."
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
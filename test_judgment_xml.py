@@ -0,0 +1,156 @@
+"""
+Tests for the Akoma Ntoso (LegalDocML) judgment path, run against the
+recorded XML fixture in dataset/fixtures/case_law with no network access.
+"""
+
+import asyncio
+import tracemalloc
+from pathlib import Path
+
+import httpx
+import pytest
+
+from src.tools import case_law_search, http_client
+from src.tools.judgment_parser import parse_judgment_xml
+
+FIXTURES_DIR = Path(__file__).parent / "dataset" / "fixtures" / "case_law"
+XML_FIXTURE = FIXTURES_DIR / "judgment_ewca_civ_2023_456.xml"
+HTML_FIXTURE = FIXTURES_DIR / "judgment_ewca_civ_2023_456.html"
+CASE_URL = "https://caselaw.nationalarchives.gov.uk/ewca/civ/2023/456"
+
+
+def test_parse_judgment_xml_metadata():
+    judgment = parse_judgment_xml(XML_FIXTURE.read_bytes(), CASE_URL)
+
+    assert judgment.name == "Brown v Green Ltd"
+    assert judgment.citation == "[2023] EWCA Civ 456"
+    assert judgment.court_code == "EWCA-Civil"
+    assert judgment.court == "IN THE COURT OF APPEAL (CIVIL DIVISION)"
+    assert judgment.date == "2023-12-15"
+    assert judgment.case_number == "A2/2022/1234"
+    assert judgment.judges == ["LORD JUSTICE SMITH"]
+    assert judgment.parties == ["BROWN", "GREEN LIMITED"]
+
+
+def test_parse_judgment_xml_paragraphs():
+    judgment = parse_judgment_xml(XML_FIXTURE.read_bytes(), CASE_URL)
+
+    assert [p.number for p in judgment.paragraphs] == [None, "1.", "2.", "3.", "4."]
+    assert judgment.paragraphs[2].text == (
+        "The judge held that the clause was a penalty & unenforceable. "
+        "He relied on Cavendish Square Holding BV v Makdessi [2015] UKSC 67."
+    )
+    # Sub-paragraphs stay inside their parent paragraph
+    assert judgment.paragraphs[3].text.endswith("(a) Time was not of the essence.")
+
+
+def _chunks(data: bytes, size: int):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def test_parse_judgment_xml_from_chunks():
+    data = XML_FIXTURE.read_bytes()
+
+    assert parse_judgment_xml(_chunks(data, 64), CASE_URL) == parse_judgment_xml(data, CASE_URL)
+
+
+def test_parse_judgment_xml_drops_paragraph_elements_once_read():
+    paragraphs = "".join(
+        f'<paragraph eId="para_{i}"><num>{i}.</num><content><p>The court considered the penalty clause '
+        f"in <i>case {i}</i> and held it enforceable.</p></content></paragraph>"
+        for i in range(1, 5001)
+    )
+    data = (
+        '<akomaNtoso xmlns="http://docs.oasis-open.org/legaldocml/ns/akn/3.0"><judgment><judgmentBody>'
+        f"<decision><level>{paragraphs}</level></decision></judgmentBody></judgment></akomaNtoso>"
+    ).encode()
+    chunks = list(_chunks(data, 65536))
+
+    tracemalloc.start()
+    try:
+        judgment = parse_judgment_xml(iter(chunks), CASE_URL)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert len(judgment.paragraphs) == 5000
+    # Keeping every element read would take about 8x the document size
+    assert peak < 4 * len(data)
+
+
+@pytest.fixture
+def mock_client(monkeypatch):
+    requests_seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request.url.path)
+        if request.url.path.endswith("/data.xml"):
+            return httpx.Response(200, content=XML_FIXTURE.read_bytes())
+        return httpx.Response(200, text=HTML_FIXTURE.read_text(encoding="utf-8"))
+
+    monkeypatch.setenv("CASE_LAW_CACHE_DISABLED", "1")
+    monkeypatch.setattr(
+        http_client, "_client", httpx.Client(transport=httpx.MockTransport(handler))
+    )
+    return requests_seen
+
+
+def test_fetch_judgment_prefers_xml(mock_client, monkeypatch):
+    monkeypatch.delenv(case_law_search.JUDGMENT_SOURCE_ENV_KEY, raising=False)
+
+    judgment = case_law_search.fetch_judgment("/ewca/civ/2023/456")
+
+    assert mock_client == ["/ewca/civ/2023/456/data.xml"]
+    assert judgment.court_code == "EWCA-Civil"
+
+
+def test_fetch_judgment_html_source(mock_client, monkeypatch):
+    monkeypatch.setenv(case_law_search.JUDGMENT_SOURCE_ENV_KEY, "html")
+
+    judgment = case_law_search.fetch_judgment("/ewca/civ/2023/456")
+
+    assert mock_client == ["/ewca/civ/2023/456"]
+    assert judgment.citation == "[2023] EWCA Civ 456"
+
+
+EMPTY_XML = b'<akomaNtoso xmlns="http://docs.oasis-open.org/legaldocml/ns/akn/3.0"><judgment/></akomaNtoso>'
+
+
+@pytest.mark.parametrize("xml_response", [
+    (404, b""),
+    httpx.ConnectError("refused"),
+    (200, b"<akomaNtoso><unclosed>"),
+    (200, EMPTY_XML),
+], ids=["not-found", "transport-error", "malformed", "no-paragraphs"])
+@pytest.mark.parametrize("run_async", [False, True], ids=["sync", "async"])
+def test_fetch_judgment_falls_back_to_html(monkeypatch, xml_response, run_async):
+    requests_seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request.url.path)
+        if request.url.path.endswith("/data.xml"):
+            if isinstance(xml_response, Exception):
+                raise xml_response
+            status, content = xml_response
+            return httpx.Response(status, content=content)
+        return httpx.Response(200, text=HTML_FIXTURE.read_text(encoding="utf-8"))
+
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setenv("CASE_LAW_CACHE_DISABLED", "1")
+    monkeypatch.setenv(http_client.MAX_RETRIES_ENV_KEY, "0")
+    monkeypatch.delenv(case_law_search.JUDGMENT_SOURCE_ENV_KEY, raising=False)
+    monkeypatch.setattr(http_client, "_client", httpx.Client(transport=transport))
+    monkeypatch.setattr(http_client, "get_async_http_client", lambda: httpx.AsyncClient(transport=transport))
+
+    if run_async:
+        judgment = asyncio.run(case_law_search.afetch_judgment("/ewca/civ/2023/456"))
+    else:
+        judgment = case_law_search.fetch_judgment("/ewca/civ/2023/456")
+
+    assert requests_seen == ["/ewca/civ/2023/456/data.xml", "/ewca/civ/2023/456"]
+    assert judgment.citation == "[2023] EWCA Civ 456"
+    assert judgment.paragraphs
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,88 @@
+"""
+Tests for the persistent LLM response cache behind get_prompt(include_model=True).
+"""
+
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.utils import llm_cache, prompts
+from src.utils.llm_cache import LLMCache, cached_model, prompt_version
+from src.utils.prompts import get_prompt
+
+ISSUE = {"legal_issue": "Whether the clause is a penalty"}
+# Inputs of the case_law_precedent_analysis prompt
+ANALYSIS = {**ISSUE, "ranked_cases": "1. Brown v Green Ltd [2023] EWCA Civ 456", "citation_relationships": "None"}
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = FakeListChatModel(responses=["first answer", "second answer", "third answer"])
+    monkeypatch.setattr(prompts, "get_model", lambda **options: model)
+    return model
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = LLMCache(tmp_path / "responses.sqlite3", max_bytes=1024 * 1024)
+    monkeypatch.setenv(llm_cache.LLM_CACHE_ENABLED_ENV_KEY, "1")
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    yield cache
+    cache.close()
+
+
+def test_cache_is_opt_in(model, monkeypatch):
+    monkeypatch.delenv(llm_cache.LLM_CACHE_ENABLED_ENV_KEY, raising=False)
+
+    chain = get_prompt("case_law_precedent_analysis", include_model=True)
+
+    assert chain.invoke(ANALYSIS).content == "first answer"
+    assert chain.invoke(ANALYSIS).content == "second answer"
+
+
+def test_repeated_calls_are_answered_from_the_cache(model, cache):
+    chain = get_prompt("case_law_precedent_analysis", include_model=True)
+
+    assert chain.invoke(ANALYSIS).content == "first answer"
+    assert chain.invoke(ANALYSIS).content == "first answer"
+    assert asyncio.run(chain.ainvoke(ANALYSIS)).content == "first answer"
+    assert chain.invoke({**ANALYSIS, "legal_issue": "Whether time was of the essence"}).content == "second answer"
+
+    stats = cache.stats()["session"]["case_law_precedent_analysis"]
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (2, 2, 2)
+
+
+def test_entries_survive_restarts_and_are_versioned_by_prompt(model, cache):
+    prompt = ChatPromptTemplate.from_messages([("user", "Issue: {legal_issue}")])
+    edited = ChatPromptTemplate.from_messages([("user", "Legal issue: {legal_issue}")])
+    assert prompt_version(prompt) != prompt_version(edited)
+
+    assert (prompt | cached_model(cache, "custom", prompt, model)).invoke(ISSUE).content == "first answer"
+
+    reopened = LLMCache(cache.path, cache.max_bytes)
+    try:
+        assert (prompt | cached_model(reopened, "custom", prompt, model)).invoke(ISSUE).content == "first answer"
+        assert (edited | cached_model(reopened, "custom", edited, model)).invoke(ISSUE).content == "second answer"
+        assert reopened.stats()["lifetime"]["custom"]["hits"] == 1
+    finally:
+        reopened.close()
+
+
+def test_least_recently_used_responses_are_evicted(model, tmp_path):
+    cache = LLMCache(tmp_path / "responses.sqlite3", max_bytes=1)
+    prompt = ChatPromptTemplate.from_messages([("user", "{legal_issue}")])
+    chain = prompt | cached_model(cache, "custom", prompt, model)
+
+    chain.invoke({"legal_issue": "one"})
+    chain.invoke({"legal_issue": "two"})
+
+    stats = cache.stats()
+    assert stats["entries"] == 0
+    assert stats["lifetime"]["custom"]["evictions"] == 2
+    cache.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
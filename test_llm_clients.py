@@ -0,0 +1,91 @@
+"""
+Tests for the shared chat model registry and its pooled HTTP clients.
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils import llm_clients
+from src.utils.llm_clients import get_chat_model, get_llm_pool_limits
+from src.utils.prompts import GLOBAL_MODEL_ENV_KEY, get_model
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(llm_clients, "_models", {})
+    monkeypatch.setattr(llm_clients, "_http_client", None)
+    monkeypatch.setattr(llm_clients, "_async_http_client", None)
+
+
+def test_one_client_per_model_settings():
+    model = get_chat_model("gpt-4o-mini", temperature=0)
+
+    assert get_chat_model("gpt-4o-mini", temperature=0.0) is model
+    assert get_chat_model("gpt-4o-mini", temperature=0.7) is not model
+    assert get_chat_model("gpt-4o-mini", temperature=0, timeout=30) is not model
+    assert get_chat_model("gpt-4o-mini", temperature=0, max_retries=5).max_retries == 5
+    assert get_chat_model("gpt-4o-mini", temperature=0.7).temperature == 0.7
+
+
+def test_all_clients_share_one_connection_pool():
+    models = [
+        get_chat_model("gpt-4o-mini", temperature=0),
+        get_chat_model("gpt-4o-mini", temperature=0.7),
+        get_chat_model("gpt-5.1", temperature=None),
+    ]
+
+    assert len({id(model.http_async_client) for model in models}) == 1
+    assert len({id(model.http_client) for model in models}) == 1
+    assert models[0].http_async_client is llm_clients._async_http_client
+
+
+def test_pool_limits_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv(llm_clients.MAX_CONNECTIONS_ENV_KEY, "300")
+    monkeypatch.setenv(llm_clients.MAX_KEEPALIVE_ENV_KEY, "50")
+    monkeypatch.setenv(llm_clients.KEEPALIVE_EXPIRY_ENV_KEY, "90")
+
+    limits = get_llm_pool_limits()
+
+    assert (limits.max_connections, limits.max_keepalive_connections, limits.keepalive_expiry) == (300, 50, 90.0)
+
+
+def test_get_model_follows_global_model_and_temperature(monkeypatch):
+    monkeypatch.setenv(GLOBAL_MODEL_ENV_KEY, "gpt-4.1-mini")
+
+    assert get_model().model_name == "gpt-4.1-mini"
+    assert get_model(temperature=0.5).temperature == 0.5
+    assert get_model(model="gpt-5.1", temperature=None) is get_chat_model("gpt-5.1", temperature=None)
+
+
+def test_async_requests_use_a_pool_per_event_loop():
+    client = get_chat_model("gpt-4o-mini").http_async_client
+
+    async def pool():
+        assert client.for_running_loop() is client.for_running_loop()
+        return client.for_running_loop()
+
+    # A second asyncio.run must not reuse connections of the closed first loop
+    assert asyncio.run(pool()) is not asyncio.run(pool())
+
+
+def test_async_requests_are_sent_unchanged_through_the_loop_pool(monkeypatch):
+    client = get_chat_model("gpt-4o-mini").http_async_client
+    sent = []
+
+    class LoopPool:
+        async def send(self, request, **kwargs):
+            sent.append((request, kwargs))
+            return "response"
+
+    monkeypatch.setattr(client, "for_running_loop", lambda: LoopPool())
+    request = client.build_request("POST", "https://api.openai.com/v1/chat/completions", timeout=12)
+
+    assert asyncio.run(client.send(request, stream=True)) == "response"
+    assert sent == [(request, {"stream": True})]
+    assert request.extensions["timeout"]["read"] == 12
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
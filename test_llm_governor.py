@@ -0,0 +1,176 @@
+"""
+Tests for the process-wide LLM governor.
+"""
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.utils import llm_governor, prompts
+from src.utils.llm_governor import HIGH_PRIORITY, NORMAL_PRIORITY, LLMGovernor, governed_model
+from src.utils.prompts import get_prompt
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+async def _blocks(awaitable) -> bool:
+    try:
+        lease = await asyncio.wait_for(awaitable, 0.05)
+    except asyncio.TimeoutError:
+        return True
+    lease.complete()
+    return False
+
+
+def test_requests_per_minute_over_a_sliding_window():
+    clock = FakeClock()
+    governor = LLMGovernor(requests_per_minute=2, tokens_per_minute=0, max_concurrency=0, clock=clock)
+
+    async def scenario():
+        governor.acquire(10).complete()
+        clock.now += 30
+        governor.acquire(10).complete()
+        assert await _blocks(governor.aacquire(10))
+        # The first request leaves the window 60s after it was admitted
+        clock.now += 30
+        assert not await _blocks(governor.aacquire(10))
+
+    asyncio.run(scenario())
+    assert governor.stats()["waiting"] == 0
+
+
+def test_token_budget_is_corrected_by_reported_usage():
+    governor = LLMGovernor(requests_per_minute=0, tokens_per_minute=1000, max_concurrency=0, clock=FakeClock())
+
+    async def scenario():
+        lease = await governor.aacquire(800)
+        assert await _blocks(governor.aacquire(300))
+        lease.complete(used_tokens=100)
+        assert not await _blocks(governor.aacquire(300))
+
+    asyncio.run(scenario())
+    assert governor.stats()["window_tokens"] == 400
+
+
+def test_high_priority_calls_overtake_queued_calls():
+    governor = LLMGovernor(requests_per_minute=0, tokens_per_minute=0, max_concurrency=1)
+    admitted = []
+
+    async def call(label, priority):
+        lease = await governor.aacquire(10, priority)
+        admitted.append(label)
+        lease.complete()
+
+    async def scenario():
+        running = await governor.aacquire(10)
+        queued = [asyncio.create_task(call(f"verdict {i}", NORMAL_PRIORITY)) for i in range(3)]
+        await asyncio.sleep(0.01)
+        queued.append(asyncio.create_task(call("judgement", HIGH_PRIORITY)))
+        await asyncio.sleep(0.01)
+        running.complete()
+        await asyncio.gather(*queued)
+
+    asyncio.run(scenario())
+    assert admitted == ["judgement", "verdict 0", "verdict 1", "verdict 2"]
+
+
+def _rate_limit_error():
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers={"Retry-After": "0"}, request=request)
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def _connection_error():
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+
+
+class FlakyModel(FakeListChatModel):
+    failures: int = 1
+    error: object = _rate_limit_error
+
+    def _call(self, *args, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise self.error()
+        return super()._call(*args, **kwargs)
+
+
+def test_rate_limited_calls_back_off_and_retry():
+    governor = LLMGovernor(requests_per_minute=100, tokens_per_minute=0, max_concurrency=0)
+    prompt = ChatPromptTemplate.from_messages([("user", "{question}")])
+    chain = prompt | governed_model(governor, FlakyModel(responses=["answer"]))
+
+    assert asyncio.run(chain.ainvoke({"question": "Is the clause a penalty?"})).content == "answer"
+
+    stats = governor.stats()
+    assert (stats["rate_limited"], stats["retries"], stats["requests"]) == (1, 1, 2)
+    # Halved by the 429, then partly restored by the success
+    assert stats["budget_scale"] == pytest.approx(0.55)
+
+
+def test_rate_limit_errors_surface_once_retries_run_out():
+    governor = LLMGovernor(max_rate_limit_retries=0)
+    chain = ChatPromptTemplate.from_messages([("user", "{question}")]) | governed_model(
+        governor, FlakyModel(responses=["answer"])
+    )
+
+    with pytest.raises(openai.RateLimitError):
+        chain.invoke({"question": "Is the clause a penalty?"})
+    assert governor.stats()["in_flight"] == 0
+
+
+def test_connection_errors_are_retried_through_the_governor(monkeypatch):
+    monkeypatch.setattr(llm_governor.random, "uniform", lambda low, high: 0.0)
+    governor = LLMGovernor(max_error_retries=2)
+    chain = ChatPromptTemplate.from_messages([("user", "{question}")]) | governed_model(
+        governor, FlakyModel(responses=["answer"], failures=2, error=_connection_error)
+    )
+
+    assert asyncio.run(chain.ainvoke({"question": "Is the clause a penalty?"})).content == "answer"
+
+    stats = governor.stats()
+    # Every attempt is admitted and counted; the budgets are left alone
+    assert (stats["errors"], stats["retries"], stats["requests"]) == (2, 2, 3)
+    assert stats["budget_scale"] == 1.0
+
+    failing = ChatPromptTemplate.from_messages([("user", "{question}")]) | governed_model(
+        governor, FlakyModel(responses=["answer"], failures=3, error=_connection_error)
+    )
+    with pytest.raises(openai.APIConnectionError):
+        failing.invoke({"question": "Is the clause a penalty?"})
+    assert governor.stats()["in_flight"] == 0
+
+
+def test_registry_prompts_share_the_governor(monkeypatch):
+    governor = LLMGovernor()
+    monkeypatch.setattr(llm_governor, "_governor", governor)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    model = FakeListChatModel(responses=["{}"])
+    requested = {}
+
+    def get_model(**options):
+        requested.update(options)
+        return model
+
+    monkeypatch.setattr(prompts, "get_model", get_model)
+
+    chain = get_prompt("case_law_precedent_analysis", include_model=True)
+    chain.invoke({"legal_issue": "Penalty", "ranked_cases": "None", "citation_relationships": "None"})
+
+    assert governor.stats()["requests"] == 1
+    # The client's own retries would bypass the governor
+    assert requested == {"max_retries": 0}
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
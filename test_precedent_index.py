@@ -0,0 +1,107 @@
+"""
+Tests for the precedent index.
+"""
+
+import time
+from datetime import date
+
+import pytest
+
+from src.case_law.nodes.analyze_precedents import search_relevance
+from src.tools.court_hierarchy import CourtLevel
+from src.tools.precedent_index import PrecedentIndex, parse_case_date
+
+CASES = [
+    {"name": "Smith v Jones", "citation": "[2024] EWHC 123 (Comm)", "court": "High Court", "date": "2024-01-10"},
+    {"name": "Brown v Green", "citation": "[2023] EWCA Civ 456", "court": "Court of Appeal", "date": "15 December 2023"},
+    {"name": "White v Black", "citation": "[2015] UKSC 7", "court": "Supreme Court", "date": "N/A"},
+    {"name": "Grey v Blue", "citation": "[2010] EWCA Civ 9", "court": "Court of Appeal", "date": "1st March 2010"},
+]
+
+
+@pytest.fixture
+def index():
+    index = PrecedentIndex(reference_date=date(2025, 1, 1))
+    index.extend(CASES)
+    return index
+
+
+def test_dates_are_parsed_with_citation_year_fallback():
+    assert parse_case_date("15th December 2023") == date(2023, 12, 15)
+    assert parse_case_date("Date: 03/04/2022") == date(2022, 4, 3)
+    assert parse_case_date("N/A", "[2015] UKSC 7") == date(2015, 7, 1)
+    assert parse_case_date("soon") is None
+
+
+def test_ranking_by_authority_then_recency(index):
+    ranked = index.ranked()
+
+    assert [case["name"] for case in ranked] == ["White v Black", "Brown v Green", "Grey v Blue", "Smith v Jones"]
+    assert [case["precedent_rank"] for case in ranked] == [1, 2, 3, 4]
+    assert [case["name"] for case in index.controlling()] == ["White v Black"]
+
+
+def test_lookups_by_citation_level_and_date(index):
+    assert index.get("[2023]  ewca civ 456")["name"] == "Brown v Green"
+    assert "[2024] EWHC 123 (Comm)" in index
+    assert [case["name"] for case in index.by_court_level(CourtLevel.COURT_OF_APPEAL_CIVIL)] == [
+        "Brown v Green", "Grey v Blue",
+    ]
+    assert [case["name"] for case in index.decided_between(date(2015, 1, 1), date(2023, 12, 31))] == [
+        "White v Black", "Brown v Green",
+    ]
+
+
+def test_duplicates_only_raise_relevance(index):
+    before = index.score(CASES[0])
+
+    assert not index.add(dict(CASES[0]), relevance=1.0)
+    assert len(index) == 4
+    assert index.score(CASES[0]) > before
+
+
+def test_top_k_combines_authority_recency_and_relevance():
+    index = PrecedentIndex(reference_date=date(2025, 1, 1))
+    index.add(CASES[3], relevance=0.0)  # old Court of Appeal case
+    index.add(CASES[1], relevance=1.0)  # recent, top search result
+
+    assert [case["name"] for case in index.top_k(1)] == ["Brown v Green"]
+
+
+def test_top_k_sets_authority_rank_without_ranking_first(index):
+    top = index.top_k(2)
+
+    assert [(case["precedent_rank"], index.authority_rank(case)) for case in top] == [
+        (index.ranked().index(case) + 1,) * 2 for case in top
+    ]
+    assert index.authority_rank({"citation": "[1999] UKHL 1"}) is None
+
+
+def test_search_relevance_follows_rank_within_keyword_set():
+    cases = [{"keyword_set": "a"}, {"keyword_set": "a"}, {"keyword_set": "b"}]
+
+    assert search_relevance(cases) == [1.0, 0.5, 1.0]
+
+
+def test_incremental_inserts_stay_cheap_for_large_pools():
+    courts = ["Supreme Court", "Court of Appeal", "High Court", "Upper Tribunal"]
+    index = PrecedentIndex(reference_date=date(2025, 1, 1))
+
+    started = time.perf_counter()
+    for i in range(5000):
+        index.add({
+            "name": f"Case {i}",
+            "url": f"https://example.test/{i}",
+            "court": courts[i % 4],
+            "date": f"{1990 + i % 35}-0{1 + i % 9}-1{i % 10}",
+        }, relevance=(i % 7) / 7)
+    top = index.top_k(10)
+    elapsed = time.perf_counter() - started
+
+    assert len(index) == 5000
+    assert all(case["court_level"] == CourtLevel.SUPREME_COURT for case in top)
+    assert elapsed < 1.0
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,157 @@
+"""
+Tests for the case law rate limiter and retry policy, and for the retry
+loop in the shared HTTP client, with a fake clock and a mocked transport.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from src.tools import http_client, rate_limit
+from src.tools.http_client import ahttp_get, get_http_stats, http_get
+from src.tools.rate_limit import RetryPolicy, TokenBucket, parse_retry_after
+
+URL = "https://caselaw.nationalarchives.gov.uk/ewca/civ/2023/456"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_allows_a_burst_then_spaces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Each further request waits for its own slot at 2 per second
+    assert [bucket.reserve() for _ in range(2)] == [0.5, 1.0]
+
+
+def test_token_bucket_refills_up_to_the_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    for _ in range(3):
+        bucket.reserve()
+
+    clock.now += 0.5
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.5
+
+    # A long idle period refills no more than the burst
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.0, 0.5]
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(" 0 ") == 0.0
+
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=120)
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == pytest.approx(120, abs=2)
+    # A date in the past means retry now
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def _response(status, retry_after=None):
+    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    return httpx.Response(status, headers=headers, request=httpx.Request("GET", URL))
+
+
+def test_retry_delays_are_capped(monkeypatch):
+    # Take the top of every jitter range
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda low, high: high)
+    policy = RetryPolicy(max_retries=10, base_delay=0.5, max_delay=4.0)
+
+    assert [policy.backoff(attempt) for attempt in range(5)] == [0.5, 1.0, 2.0, 4.0, 4.0]
+    assert policy.delay_for(_response(503, retry_after="2"), attempt=0) == 2.0
+    assert policy.delay_for(_response(429, retry_after="3600"), attempt=0) == 4.0
+    assert policy.delay_for(_response(503), attempt=1) == 1.0
+
+
+def test_retry_policy_gives_up_after_max_retries():
+    policy = RetryPolicy(max_retries=2)
+    error = httpx.ConnectError("refused", request=httpx.Request("GET", URL))
+
+    assert [policy.should_retry_response(_response(503), attempt) for attempt in range(3)] == [True, True, False]
+    assert not policy.should_retry_response(_response(404), attempt=0)
+    assert [policy.should_retry_error(error, attempt) for attempt in range(3)] == [True, True, False]
+    assert not policy.should_retry_error(ValueError("not a transport error"), attempt=0)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """
+    Answers each request with the next scripted (status, Retry-After) step,
+    repeating the last one; exception steps are raised.
+    """
+    state = {"script": [], "requests": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        state["requests"] += 1
+        step = state["script"].pop(0) if len(state["script"]) > 1 else state["script"][0]
+        if isinstance(step, Exception):
+            raise step
+        status, retry_after = step
+        headers = {"Retry-After": retry_after} if retry_after is not None else {}
+        return httpx.Response(status, headers=headers, text="ok")
+
+    clock = FakeClock()
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setenv(http_client.MAX_RETRIES_ENV_KEY, "2")
+    monkeypatch.setenv(http_client.RETRY_BASE_DELAY_ENV_KEY, "0")
+    monkeypatch.setattr(http_client, "time", clock)
+    monkeypatch.setattr(http_client, "_rate_limiters", {})
+    monkeypatch.setattr(http_client, "_client", httpx.Client(transport=transport))
+    monkeypatch.setattr(http_client, "get_async_http_client", lambda: httpx.AsyncClient(transport=transport))
+    http_client.reset_http_stats()
+    state["clock"] = clock
+    return state
+
+
+def test_http_get_retries_and_honours_retry_after(server):
+    server["script"] = [(429, "3"), (503, None), (200, None)]
+
+    assert http_get(URL).status_code == 200
+
+    stats = get_http_stats()
+    assert (server["requests"], stats["retries"], stats["retries_exhausted"]) == (3, 2, 0)
+    assert stats["retry_statuses"] == {"429": 1, "503": 1}
+    assert server["clock"].sleeps == [3.0, 0.0]
+
+
+def test_http_get_returns_the_last_response_after_max_retries(server):
+    server["script"] = [(503, None)]
+
+    assert http_get(URL).status_code == 503
+    assert server["requests"] == 3
+    assert get_http_stats()["retries_exhausted"] == 1
+
+
+def test_ahttp_get_retries_transport_errors_then_raises(server):
+    server["script"] = [httpx.ConnectError("refused")]
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(ahttp_get(URL))
+
+    stats = get_http_stats()
+    assert (server["requests"], stats["errors"], stats["retries_exhausted"]) == (3, 3, 1)
+    assert stats["retry_statuses"] == {"error": 2}
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,119 @@
+"""
+Tests for the case law search cache: query normalization, the TTL
+read-through in search_case_law and the purging of expired entries.
+"""
+
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+
+from src.tools import case_law_search, http_client, judgment_cache, search_cache
+from src.tools.search_cache import SearchCache
+from src.tools.snippet_extractor import normalize_query
+
+FIXTURES_DIR = Path(__file__).parent / "dataset" / "fixtures" / "case_law"
+TTL_SECONDS = 3600
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(search_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch, clock):
+    cache = SearchCache(tmp_path / "search.sqlite3", ttl_seconds=TTL_SECONDS)
+    monkeypatch.delenv(judgment_cache.CACHE_DISABLED_ENV_KEY, raising=False)
+    monkeypatch.setattr(search_cache, "_cache", cache)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.params["query"])
+        return httpx.Response(200, text=(FIXTURES_DIR / "search_results.html").read_text(encoding="utf-8"))
+
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(http_client, "_client", httpx.Client(transport=transport))
+    monkeypatch.setattr(http_client, "get_async_http_client", lambda: httpx.AsyncClient(transport=transport))
+    return requests
+
+
+@pytest.mark.parametrize("query, normalized", [
+    (' "Environmental  Matters" subsidiary', '"environmental matters" subsidiary'),
+    ('"penalty clause" "Liquidated Damages"', '"liquidated damages" "penalty clause"'),
+    ('"liquidated damages" "penalty clause"', '"liquidated damages" "penalty clause"'),
+    ("Penalty  CLAUSE", "penalty clause"),
+])
+def test_normalize_query(query, normalized):
+    assert normalize_query(query) == normalized
+
+
+def test_equivalent_queries_share_an_entry(cache):
+    cache.put('"Penalty Clause" "liquidated damages"', 1, 10, "relevance", [{"name": "Brown v Green Ltd"}])
+
+    assert cache.get('"liquidated  damages" "penalty clause"', 1, 10, "relevance") == [{"name": "Brown v Green Ltd"}]
+    assert cache.get('"liquidated damages" "penalty clause"', 2, 10, "relevance") is None
+
+
+def test_search_reads_through_the_cache_until_entries_expire(cache, server, clock):
+    first = case_law_search.search_case_law.invoke({"query": '"Minimum Commitment"'})
+    # The same search, spelled differently, and async
+    second = asyncio.run(case_law_search.asearch_case_law.ainvoke({"query": '"minimum  commitment"'}))
+
+    assert first and second == first
+    assert len(server) == 1
+
+    clock.now += TTL_SECONDS + 1
+    case_law_search.search_case_law.invoke({"query": '"minimum commitment"'})
+
+    assert len(server) == 2
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+
+
+def test_expired_entries_are_purged_on_open(cache, clock):
+    cache.put("penalty", 1, 10, "relevance", [])
+    clock.now += TTL_SECONDS + 1
+    cache.put("forfeiture", 1, 10, "relevance", [])
+
+    reopened = SearchCache(cache.path, ttl_seconds=TTL_SECONDS)
+    try:
+        assert reopened.stats()["entries"] == 1
+        assert reopened.stats()["purged"] == 1
+    finally:
+        reopened.close()
+
+
+def test_expired_entries_are_purged_while_storing(cache, clock):
+    cache.put("penalty", 1, 10, "relevance", [])
+    clock.now += TTL_SECONDS + 1
+
+    pages = range(1, search_cache.PURGE_EVERY_PUTS)
+    for page in pages[:-1]:
+        cache.put("forfeiture", page, 10, "relevance", [])
+    assert cache.stats()["purged"] == 0
+
+    # The PURGE_EVERY_PUTS-th store purges the expired entry
+    cache.put("forfeiture", pages[-1], 10, "relevance", [])
+    assert cache.stats()["purged"] == 1
+    assert cache.stats()["entries"] == len(pages)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
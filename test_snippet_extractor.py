@@ -0,0 +1,275 @@
+"""
+Tests for keyword snippet extraction.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.bench_snippet_extractor import run
+from benchmarks.bench_snippet_memory import run as run_memory
+from src.tools import snippet_extractor
+from src.tools.keyword_matcher import get_keyword_matcher
+from src.tools.snippet_extractor import (
+    RangeSet,
+    aextract_snippets_batch,
+    extract_keyword_snippets,
+    extract_snippet,
+    extract_snippets_batch,
+    find_keyword_positions,
+    word_offsets,
+)
+
+
+def test_matcher_finds_nested_and_prefix_terms_in_one_pass():
+    text = "A Breach of Contract claim; the contracting party's breach."
+    hits = find_keyword_positions(text, ["breach of contract", "contract", "breach", "claim"])
+
+    assert hits == [
+        (2, 8, "breach"),
+        (2, 20, "breach of contract"),
+        (12, 20, "contract"),
+        (21, 26, "claim"),
+        (32, 40, "contract"),
+        (52, 58, "breach"),
+    ]
+
+
+def test_matcher_does_not_report_self_overlapping_hits():
+    assert find_keyword_positions("aaaa", ["aa"]) == [(0, 2, "aa"), (2, 4, "aa")]
+
+
+def test_matcher_whole_words():
+    text = "The contracting party's contract, not the subcontract."
+    hits = find_keyword_positions(text, ["contract"], whole_words=True)
+
+    assert hits == [(24, 32, "contract")]
+
+
+def test_matcher_offsets_survive_length_changing_lowercase():
+    # "İ".lower() is two characters long
+    text = "İstanbul penalty"
+
+    assert find_keyword_positions(text, ["penalty"]) == [(9, 16, "penalty")]
+
+
+@pytest.mark.parametrize("whole_words", [False, True])
+def test_matcher_gives_the_same_hits_whether_or_not_lowercasing_changes_lengths(whole_words):
+    text = "The Kelvin-rated STRASSE penalty; a penalty-clause and ſuch a Clause."
+    keywords = ["penalty", "clause", "penalty-clause", "strasse", "kelvin", "such"]
+    # "İ".lower() is two characters long, which switches to mapping offsets back
+    suffixed = text + " İ"
+
+    hits = find_keyword_positions(text, keywords, whole_words=whole_words)
+
+    assert hits
+    assert find_keyword_positions(suffixed, keywords, whole_words=whole_words) == hits
+    assert [text[start:end].lower() for start, end, _ in hits] == [keyword for _, _, keyword in hits]
+
+
+def test_matcher_maps_hits_inside_length_changing_characters_to_whole_characters():
+    # "İ" lowercases to "i" plus a combining dot; a hit on the "i" covers the whole "İ"
+    assert find_keyword_positions("İn re penalty", ["in", "penalty"]) == [(6, 13, "penalty")]
+    assert find_keyword_positions("İin", ["i"]) == [(0, 1, "i"), (1, 2, "i")]
+
+
+def test_matchers_are_cached_per_keyword_set():
+    assert get_keyword_matcher(["penalty", "clause"]) is get_keyword_matcher(["penalty", "clause"])
+    assert get_keyword_matcher(["penalty"], whole_words=True) is not get_keyword_matcher(["penalty"])
+
+
+def test_word_offsets_follow_real_whitespace():
+    text = "1. First  paragraph\n\n2. Second"
+
+    assert [text[i] for i in word_offsets(text)] == ["1", "F", "p", "2", "S"]
+
+
+def test_extract_snippet_centres_on_the_word_at_position():
+    text = "1.  The clause\n\n2. was a penalty at common law"
+
+    assert extract_snippet(text, text.index("penalty"), 2, 1) == "... was a penalty at ..."
+    assert extract_snippet(text, 0, 0, 2) == "1.  The clause ..."
+
+
+def test_range_set_rejects_overlaps():
+    ranges = RangeSet()
+
+    assert ranges.add_if_free(10, 20)
+    assert ranges.add_if_free(0, 10)
+    assert ranges.add_if_free(30, 40)
+    assert not ranges.add_if_free(15, 25)
+    assert not ranges.add_if_free(25, 31)
+    assert not ranges.add_if_free(10, 20)
+    assert ranges.add_if_free(20, 30)
+    assert list(ranges) == [(0, 10), (10, 20), (20, 30), (30, 40)]
+
+
+def test_snippets_are_non_overlapping_windows_in_document_order():
+    words = [f"w{i}" for i in range(100)]
+    words[10] = "penalty"
+    words[12] = "penalty"
+    words[60] = "damages"
+    text = " ".join(words)
+
+    result = extract_keyword_snippets(text, "penalty damages", words_before=2, words_after=2)
+
+    assert result == (
+        "[SNIPPET 1]\n... w8 w9 penalty w11 penalty ...\n\n"
+        "[SNIPPET 2]\n... w58 w59 damages w61 w62 ..."
+    )
+
+
+def test_snippet_windows_span_paragraph_breaks():
+    text = "1. The clause was a penalty.\n\n2. Damages were assessed at trial."
+
+    result = extract_keyword_snippets(text, "damages", words_before=1, words_after=1)
+
+    assert result == "[SNIPPET 1]\n... 2. Damages were ..."
+
+
+def _judgment_with_late_discussion():
+    # "penalty" is mentioned once per page throughout (like a party name);
+    # the real discussion of the issue sits near the end.
+    words = [f"w{i}" for i in range(2000)]
+    for i in range(5, 2000, 100):
+        words[i] = "penalty"
+    words[1800:1808] = ["liquidated", "damages", "penalty", "clause", "liquidated", "damages", "clause", "penalty"]
+    return " ".join(words)
+
+
+def test_relevance_ranking_prefers_dense_diverse_windows():
+    text = _judgment_with_late_discussion()
+    query = '"liquidated damages" penalty clause'
+
+    first = extract_keyword_snippets(text, query, words_before=10, words_after=10, max_snippets=1)
+    best = extract_keyword_snippets(
+        text, query, words_before=10, words_after=10, max_snippets=1, ranking="relevance"
+    )
+
+    assert "w0" in first and "liquidated damages" not in first
+    assert "liquidated damages penalty clause" in best
+
+
+def test_relevance_snippets_keep_document_order_and_do_not_overlap():
+    text = _judgment_with_late_discussion()
+    result = extract_keyword_snippets(
+        text, '"liquidated damages" penalty clause', words_before=10, words_after=10,
+        max_snippets=5, ranking="relevance",
+    )
+    snippets = result.split("\n\n")
+    word_ranges = [
+        [int(word[1:]) for word in snippet.split() if word.startswith("w")]
+        for snippet in snippets
+    ]
+
+    assert len(snippets) == 5
+    for earlier, later in zip(word_ranges, word_ranges[1:]):
+        assert max(earlier) < min(later)
+
+
+def test_unknown_ranking_is_rejected():
+    with pytest.raises(ValueError):
+        extract_keyword_snippets("penalty", "penalty", ranking="random")
+
+
+def test_no_hits_returns_full_text():
+    assert extract_keyword_snippets("nothing relevant here", "penalty") == "nothing relevant here"
+
+
+def _batch():
+    return [
+        (f"w0 w1 {keyword} w3 w4 " * 3, keyword)
+        for keyword in ["penalty", "clause", "damages", "forfeiture", "estoppel", "waiver"]
+    ]
+
+
+def test_batch_extraction_on_a_process_pool_keeps_input_order():
+    items = _batch()
+    expected = [extract_keyword_snippets(text, keywords, words_before=1, words_after=1) for text, keywords in items]
+
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = extract_snippets_batch(items, executor=pool, words_before=1, words_after=1)
+
+    assert results == expected
+
+
+def test_async_batch_extraction_keeps_input_order(monkeypatch):
+    monkeypatch.setenv("CASE_LAW_SNIPPET_WORKERS", "1")
+    items = _batch()
+
+    results = asyncio.run(aextract_snippets_batch(items, words_before=1, words_after=1))
+
+    assert [keyword in result for (_, keyword), result in zip(items, results)] == [True] * len(items)
+    assert results == extract_snippets_batch(items, words_before=1, words_after=1)
+
+
+@pytest.fixture
+def shared_executor(monkeypatch):
+    monkeypatch.setattr(snippet_extractor, "_executor", None)
+    monkeypatch.setenv(snippet_extractor.SNIPPET_WORKERS_ENV_KEY, "2")
+    yield
+    snippet_extractor.shutdown_snippet_executor()
+
+
+def test_shared_executor_uses_threads_unless_processes_are_opted_into(shared_executor, monkeypatch):
+    monkeypatch.delenv(snippet_extractor.SNIPPET_EXECUTOR_ENV_KEY, raising=False)
+    assert isinstance(snippet_extractor.get_snippet_executor(), ThreadPoolExecutor)
+
+    snippet_extractor.shutdown_snippet_executor()
+    monkeypatch.setenv(snippet_extractor.SNIPPET_EXECUTOR_ENV_KEY, "process")
+    monkeypatch.setattr(snippet_extractor, "free_threaded", lambda: False)
+    assert isinstance(snippet_extractor.get_snippet_executor(), ProcessPoolExecutor)
+
+    snippet_extractor.shutdown_snippet_executor()
+    monkeypatch.setenv(snippet_extractor.SNIPPET_EXECUTOR_ENV_KEY, "fork")
+    with pytest.raises(ValueError):
+        snippet_extractor.get_snippet_executor()
+
+
+class BrokenPool(Executor):
+    def __init__(self):
+        self.shut_down = False
+
+    def map(self, fn, *iterables, **kwargs):
+        raise BrokenExecutor("worker died")
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_broken_shared_pool_is_replaced_but_caller_pools_are_left_alone(monkeypatch):
+    items = _batch()
+    expected = extract_snippets_batch(items, words_before=1, words_after=1)
+
+    caller_pool = BrokenPool()
+    assert extract_snippets_batch(items, executor=caller_pool, words_before=1, words_after=1) == expected
+    assert not caller_pool.shut_down
+
+    shared_pool = BrokenPool()
+    monkeypatch.setattr(snippet_extractor, "_executor", shared_pool)
+    assert extract_snippets_batch(items, executor=shared_pool, words_before=1, words_after=1) == expected
+    assert shared_pool.shut_down
+    assert snippet_extractor._executor is None
+
+
+@pytest.mark.parametrize("path", ["paragraphs", "windows"])
+def test_extraction_scales_near_linearly(path):
+    # 8x the words may cost at most ~3x the per-word time; a per-hit scan
+    # of the judgment grows quadratically on the clustered profile.
+    rows = run([25_000, 200_000], profile="clustered", repeat=3, path=path)
+
+    assert rows[1]["us_per_1k_words"] < 3 * rows[0]["us_per_1k_words"]
+
+
+def test_extraction_peak_memory_stays_near_text_size():
+    # Word-window packing; the previous list of word offsets alone took ~36 bytes per word
+    row = run_memory([100_000], profile="clustered")[0]
+
+    assert row["peak"] < 2.5 * row["text_chars"]
+    assert row["peak"] < row["baseline_peak"] / 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
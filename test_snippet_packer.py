@@ -0,0 +1,58 @@
+"""
+Tests for token-budgeted snippet packing.
+"""
+
+import pytest
+
+from src.tools.snippet_packer import get_tokenizer, pack_snippets
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def _judgment(n_words: int, hits: dict) -> str:
+    words = [f"w{i}" for i in range(n_words)]
+    for index, word in hits.items():
+        words[index] = word
+    return " ".join(words)
+
+
+def test_packing_respects_the_token_budget():
+    text = _judgment(5000, {i: "penalty" for i in range(100, 5000, 400)})
+
+    for budget in (40, 120, 400):
+        packed = pack_snippets(text, "penalty", budget, tokenizer=count_words, words_before=20, words_after=20)
+        assert packed
+        assert count_words(packed) <= budget
+
+
+def test_nearby_windows_are_merged_into_one_passage():
+    text = _judgment(1000, {100: "penalty", 130: "clause"})
+
+    packed = pack_snippets(text, "penalty clause", 500, tokenizer=count_words, words_before=10, words_after=10)
+
+    assert packed.count("[SNIPPET") == 1
+    assert "w90 " in packed and " w140" in packed
+
+
+def test_windows_too_large_for_the_budget_are_trimmed():
+    text = _judgment(1000, {500: "penalty"})
+
+    packed = pack_snippets(text, "penalty", 60, tokenizer=count_words, words_before=100, words_after=100)
+
+    assert "penalty" in packed
+    assert count_words(packed) <= 60
+
+
+def test_no_hits_packs_nothing():
+    assert pack_snippets("nothing relevant here", "penalty", 1000) == ""
+
+
+def test_unknown_tokenizer_is_rejected():
+    with pytest.raises(ValueError):
+        get_tokenizer("words")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))